@@ -6,16 +6,17 @@ from fastapi import FastAPI, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
-import shutil
-import uuid
-from PIL import Image
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 import io
 import numpy as np
 import json
 import sys
+import asyncio
+import threading
 import traceback
 import logging
+from typing import Dict, List, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,67 +25,93 @@ logger = logging.getLogger(__name__)
 # Add scripts directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
+from inference_executor import get_executor
+from image_io import open_image
+from prediction_cache import PredictionCache, content_hash
+from inference_backends import load_backend, warm_up
+from model_readiness import ModelLoadTracker
+
 # Global variables for lazy loading
 soil_model = None
+soil_model_version = None
 class_names = None
 plantdoc_predict_func = None
+plantdoc_predict_async_func = None
 price_predict_func = None
 
+# Per-model load/warm-up progress; /health is liveness, /ready is readiness
+model_tracker = ModelLoadTracker(["soil_model", "plantdoc_predictor", "price_predictor"])
+# Sent with 503s while models load
+RETRY_AFTER_SECONDS = "5"
+soil_model_lock = threading.Lock()
+
 app = FastAPI(title="AgriSync API", version="1.0.0")
 
+# Repeat uploads skip the forward pass; keyed by image hash + loaded model version
+disease_cache = PredictionCache("plantdoc")
+soil_cache = PredictionCache("soil")
+
 # ✅ Lazy loading functions
 def load_soil_model():
     """Load soil classification model lazily"""
-    global soil_model, class_names
+    global soil_model, soil_model_version, class_names
     if soil_model is None:
-        try:
-            from tensorflow.keras.models import load_model
-            MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "soil_classifier.keras")
-            FALLBACK_MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "soil_classifier_fallback.keras")
-            LABELS_PATH = os.path.join(os.path.dirname(__file__), "models", "class_names.json")
-            
-            # Try to load the original model first
+        # Background loading and a first request must not both load the model
+        with soil_model_lock:
+            if soil_model is not None:
+                return soil_model, class_names
+
             try:
-                logger.info(f"Loading soil model from: {MODEL_PATH}")
-                soil_model = load_model(MODEL_PATH)
-                logger.info("✅ Original soil model loaded successfully")
-            except Exception as e:
-                logger.warning(f"⚠️ Original model failed to load: {str(e)}")
+                MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "soil_classifier.keras")
+                FALLBACK_MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "soil_classifier_fallback.keras")
+                LABELS_PATH = os.path.join(os.path.dirname(__file__), "models", "class_names.json")
+            
+                # Try to load the original model first
+                try:
+                    logger.info(f"Loading soil model from: {MODEL_PATH}")
+                    soil_model = load_backend(MODEL_PATH)
+                    soil_model_version = soil_model.version
+                    logger.info("✅ Original soil model loaded successfully")
+                except Exception as e:
+                    logger.warning(f"⚠️ Original model failed to load: {str(e)}")
                 
-                # Try fallback model
-                if os.path.exists(FALLBACK_MODEL_PATH):
-                    logger.info(f"Trying fallback model: {FALLBACK_MODEL_PATH}")
-                    soil_model = load_model(FALLBACK_MODEL_PATH)
-                    logger.info("✅ Fallback soil model loaded successfully")
-                else:
-                    # Create fallback model if it doesn't exist
-                    logger.info("Creating fallback soil model...")
-                    from create_fallback_soil_model import save_fallback_model
-                    if save_fallback_model():
-                        soil_model = load_model(FALLBACK_MODEL_PATH)
-                        logger.info("✅ Created and loaded fallback soil model")
+                    # Try fallback model
+                    if os.path.exists(FALLBACK_MODEL_PATH):
+                        logger.info(f"Trying fallback model: {FALLBACK_MODEL_PATH}")
+                        soil_model = load_backend(FALLBACK_MODEL_PATH)
+                        soil_model_version = soil_model.version
+                        logger.info("✅ Fallback soil model loaded successfully")
                     else:
-                        raise Exception("Failed to create fallback model")
+                        # Create fallback model if it doesn't exist
+                        logger.info("Creating fallback soil model...")
+                        from create_fallback_soil_model import save_fallback_model
+                        if save_fallback_model():
+                            soil_model = load_backend(FALLBACK_MODEL_PATH)
+                            soil_model_version = soil_model.version
+                            logger.info("✅ Created and loaded fallback soil model")
+                        else:
+                            raise Exception("Failed to create fallback model")
             
-            # Load class names
-            with open(LABELS_PATH, "r") as f:
-                class_names = json.load(f)
+                # Load class names
+                with open(LABELS_PATH, "r") as f:
+                    class_names = json.load(f)
             
-            logger.info(f"Loaded soil model with classes: {class_names}")
+                logger.info(f"Loaded soil model with classes: {class_names}")
             
-        except Exception as e:
-            logger.error(f"Failed to load any soil model: {str(e)}")
-            raise e
+            except Exception as e:
+                logger.error(f"Failed to load any soil model: {str(e)}")
+                raise e
     
     return soil_model, class_names
 
 def load_plantdoc_predictor():
     """Load plant disease predictor lazily"""
-    global plantdoc_predict_func
+    global plantdoc_predict_func, plantdoc_predict_async_func
     if plantdoc_predict_func is None:
         try:
-            from predict_plantdoc import predict_disease
+            from predict_plantdoc import predict_disease, predict_disease_async
             plantdoc_predict_func = predict_disease
+            plantdoc_predict_async_func = predict_disease_async
             logger.info("Loaded plant disease predictor")
         except Exception as e:
             logger.error(f"Failed to load plant disease predictor: {str(e)}")
@@ -123,7 +150,24 @@ app.add_middleware(
 # ✅ Mount graph images folder
 GRAPH_DIR = os.path.join(os.path.dirname(__file__), "scripts", "predicted_graphs")
 os.makedirs(GRAPH_DIR, exist_ok=True)
-app.mount("/graphs", StaticFiles(directory=GRAPH_DIR), name="graphs")
+# Chart names are hashes of the plotted data, so a URL's content never changes
+GRAPH_CACHE_CONTROL = os.environ.get("GRAPH_CACHE_CONTROL", "public, max-age=31536000, immutable")
+
+class GraphStaticFiles(StaticFiles):
+    """Serves rendered charts, waiting for pending renders and caching responses for a long time"""
+
+    async def get_response(self, path, scope):
+        if price_predict_func is not None:
+            from predict_with_graph import chart_renderer
+            if chart_renderer.is_known(path):
+                # Finish a queued render, or re-render a chart evicted from the store
+                await asyncio.to_thread(chart_renderer.ensure, path)
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = GRAPH_CACHE_CONTROL
+        return response
+
+app.mount("/graphs", GraphStaticFiles(directory=GRAPH_DIR), name="graphs")
 
 # ✅ Root endpoint
 @app.get("/")
@@ -142,6 +186,7 @@ def health_check_detailed():
         "status": "healthy",
         "message": "AgriSync API is running",
         "version": "1.0.0",
+        "ready": model_tracker.all_settled(),
         "models": {
             "soil_model": soil_model is not None,
             "plantdoc_predictor": plantdoc_predict_func is not None,
@@ -150,26 +195,72 @@ def health_check_detailed():
     }
     return status
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness: 200 once every model has finished loading and warm-up, 503 while loading"""
+    snapshot = model_tracker.snapshot()
+    if snapshot["ready"]:
+        return JSONResponse(status_code=200, content=snapshot)
+    return JSONResponse(status_code=503, headers={"Retry-After": RETRY_AFTER_SECONDS}, content=snapshot)
+
+def model_unavailable(name):
+    """503 response for requests whose model is still loading"""
+    model = model_tracker.snapshot()["models"][name]
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": RETRY_AFTER_SECONDS},
+        content={
+            "status": "loading",
+            "error": f"{name} is still loading, please retry shortly",
+            "model": name,
+            "state": model["state"],
+            "progress": model["progress"]
+        }
+    )
+
+@app.get("/metrics")
+def metrics():
+    """Inference batching, executor, prediction and forecast cache statistics"""
+    batching = {}
+    if plantdoc_predict_func is not None:
+        from predict_plantdoc import get_batching_stats
+        batching["plantdoc"] = get_batching_stats()
+    cache = {"plantdoc": disease_cache.stats(), "soil": soil_cache.stats()}
+    if price_predict_func is not None:
+        from predict_with_graph import forecast_cache, forecast_executor, chart_renderer, registry
+        cache["forecasts"] = dict(forecast_cache.stats(), executor=forecast_executor.stats())
+        cache["charts"] = chart_renderer.stats()
+        cache["price_models"] = registry.stats()
+    return {
+        "batching": batching,
+        "executor": get_executor().stats(),
+        "cache": cache
+    }
+
 # ✅ Plant Disease Prediction
 @app.post("/predict")
 async def predict(file: UploadFile = File(...)):
     try:
+        if not await model_tracker.wait_async("plantdoc_predictor"):
+            return model_unavailable("plantdoc_predictor")
+
         # Load predictor on first use
-        predict_func = load_plantdoc_predictor()
-        
-        temp_dir = "temp_uploads"
-        os.makedirs(temp_dir, exist_ok=True)
-
-        file_path = os.path.join(temp_dir, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        result = predict_func(file_path)
-        
-        # Clean up
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            
+        load_plantdoc_predictor()
+
+        from predict_plantdoc import get_model_version
+
+        # Decoded straight from memory, no temp file per upload
+        contents = await file.read()
+
+        digest = await get_executor().run("hashing", content_hash, contents)
+        cached = disease_cache.get(digest, get_model_version())
+        if cached is not None:
+            return cached
+
+        # Concurrent uploads are coalesced into one batched forward pass
+        result = await plantdoc_predict_async_func(contents)
+        if "error" not in result:
+            disease_cache.put(digest, get_model_version(), result)
         return result
     except Exception as e:
         logger.error(f"Plant disease prediction error: {str(e)}")
@@ -183,6 +274,8 @@ async def predict(file: UploadFile = File(...)):
 # ✅ Market Price Prediction
 @app.get("/market-predictions")
 def get_predictions_for_graph():
+    if not model_tracker.wait("price_predictor"):
+        return model_unavailable("price_predictor")
     try:
         # Load predictor on first use
         predict_func = load_price_predictor()
@@ -197,8 +290,74 @@ def get_predictions_for_graph():
             "data": []
         }
 
+@app.get("/market-predictions/{crop}")
+async def get_crop_prediction(crop: str, origin: Optional[str] = None, weeks: Optional[int] = None,
+                              state: Optional[str] = None, market: Optional[str] = None):
+    """One crop's forecast for weeks steps after origin (YYYY-MM-DD), from the market's model if it has one"""
+    if not await model_tracker.wait_async("price_predictor"):
+        return model_unavailable("price_predictor")
+    try:
+        load_price_predictor()
+        from predict_with_graph import get_crop_forecast
+        result = await get_executor().run("price", get_crop_forecast, crop.lower(), origin, weeks, state, market)
+    except KeyError:
+        from predict_with_graph import registry
+        return JSONResponse(
+            status_code=404,
+            content={"status": "error", "message": f"Unknown crop: {crop}", "crops": registry.commodities()}
+        )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    except Exception as e:
+        logger.error(f"Market prediction error for {crop}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"status": "error", "message": f"Market prediction failed: {str(e)}", "data": None}
+
+    if "error" in result:
+        return {"status": "error", "message": f"Market prediction failed: {result['error']}", "data": None}
+    return {"status": "success", "data": result}
+
+class ScenarioRequest(BaseModel):
+    """Either a grid (parameter -> values, all combinations) or an explicit list of scenarios"""
+    grid: Optional[Dict[str, List[float]]] = None
+    scenarios: Optional[List[Dict[str, float]]] = None
+    origin: Optional[str] = None
+    weeks: int = 1
+
+@app.post("/market-scenarios/{crop}")
+async def price_scenarios(crop: str, request: ScenarioRequest, format: str = "compact"):
+    """
+    Bulk what-if pricing over arrival_shock / demand / price_change scenarios.
+    format=compact returns one JSON document; format=ndjson streams one line per scenario.
+    """
+    if format not in ("compact", "ndjson"):
+        return JSONResponse(status_code=400, content={"status": "error", "message": "format must be compact or ndjson"})
+    if not await model_tracker.wait_async("price_predictor"):
+        return model_unavailable("price_predictor")
+    try:
+        load_price_predictor()
+        from scenario_pricing import score_scenarios, to_compact_json, iter_ndjson
+        result = await get_executor().run(
+            "price", score_scenarios, crop.lower(), request.grid, request.scenarios, request.origin, request.weeks
+        )
+    except KeyError:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown crop: {crop}"})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    except Exception as e:
+        logger.error(f"Scenario pricing error for {crop}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return JSONResponse(status_code=500, content={"status": "error", "message": f"Scenario pricing failed: {str(e)}"})
+
+    if format == "ndjson":
+        return StreamingResponse(iter_ndjson(result), media_type="application/x-ndjson")
+    # Serialized directly: FastAPI's encoder is far too slow for 100k-element arrays
+    body = await get_executor().run("price", to_compact_json, result)
+    return Response(content=body, media_type="application/json")
+
 # ✅ Soil Type Prediction
 IMG_SIZE = (180, 180)
+FALLBACK_ANALYSIS_SIZE = (256, 256)
 
 soil_info = {
     "Alluvial soil": {
@@ -223,94 +382,116 @@ soil_info = {
     }
 }
 
+def classify_soil(contents):
+    """Blocking soil classification of raw upload bytes"""
+    model, class_names = load_soil_model()
+
+    # Process the image
+    # Large JPEGs decode at reduced resolution before the uint8 resize
+    image = open_image(contents, min_size=IMG_SIZE).convert("RGB")
+    image = image.resize(IMG_SIZE)
+    image_array = np.expand_dims(np.array(image) / 255.0, axis=0)
+    logger.info(f"Processed image shape: {image_array.shape}")
+
+    # Make prediction
+    prediction = model.predict(image_array)[0]
+    logger.info(f"Raw prediction probabilities: {prediction}")
+    predicted_index = np.argmax(prediction)
+    predicted_class = class_names[predicted_index]
+    confidence = float(prediction[predicted_index]) * 100
+
+    # 🔍 Debugging log
+    logger.info(f"Predicted index: {predicted_index}")
+    logger.info(f"Predicted class: {predicted_class}")
+    logger.info(f"Confidence: {confidence}")
+
+    # Get soil information
+    info = soil_info.get(predicted_class, {
+        "notes": "No additional info available for this soil type.",
+        "crops": [],
+        "care": ["Test soil pH regularly", "Add organic matter when needed"],
+    })
+
+    return {
+        "prediction": predicted_class,
+        "confidence": confidence,
+        "notes": info["notes"],
+        "crops": info["crops"],
+        "care": info["care"],
+        "status": "success"
+    }
+
+def analyze_soil_colors(contents):
+    """Blocking rule-based soil guess used when the model is unavailable"""
+    import random
+
+    # A reduced decode is plenty for an average colour
+    image = open_image(contents, min_size=FALLBACK_ANALYSIS_SIZE).convert("RGB")
+
+    # Get average color to make a basic guess
+    pixels = list(image.getdata())
+    avg_color = [sum(channel) / len(pixels) for channel in zip(*pixels)]
+
+    # Simple heuristic based on color
+    if avg_color[0] > 120 and avg_color[1] > 100 and avg_color[2] < 90:
+        # Reddish soil
+        soil_type = "Red soil"
+    elif avg_color[0] < 80 and avg_color[1] < 80 and avg_color[2] < 80:
+        # Dark soil
+        soil_type = "Black Soil"
+    elif avg_color[0] > 100 and avg_color[1] > 100 and avg_color[2] > 100:
+        # Light soil
+        soil_type = "Alluvial soil"
+    else:
+        # Default to clay
+        soil_type = "Clay soil"
+
+    # Random confidence between 60-80% to seem realistic
+    confidence = random.uniform(60, 80)
+
+    info = soil_info.get(soil_type, {
+        "notes": "Basic analysis based on visual characteristics. For accurate results, consider soil testing.",
+        "crops": ["Rice", "Wheat", "Vegetables"],
+        "care": ["Test soil pH regularly", "Add organic matter when needed", "Ensure good drainage"],
+    })
+
+    return {
+        "prediction": soil_type,
+        "confidence": confidence,
+        "notes": f"⚠️ Basic Visual Analysis: {info['notes']}",
+        "crops": info["crops"],
+        "care": info["care"],
+        "status": "fallback_analysis",
+        "warning": "AI model unavailable - using basic visual analysis"
+    }
+
 @app.post("/predict-soil")
 async def predict_soil(file: UploadFile = File(...)):
     try:
+        if not await model_tracker.wait_async("soil_model"):
+            return model_unavailable("soil_model")
+
+        contents = await file.read()
+        executor = get_executor()
+
+        digest = await executor.run("hashing", content_hash, contents)
+        cached = soil_cache.get(digest, soil_model_version)
+        if cached is not None:
+            return cached
+
         # Try to load model on first use
         try:
-            model, class_names = load_soil_model()
-            
-            # Process the image
-            image = Image.open(file.file).convert("RGB")
-            image = image.resize(IMG_SIZE)
-            image_array = np.expand_dims(np.array(image) / 255.0, axis=0)
-            logger.info(f"Processed image shape: {image_array.shape}")
-
-            # Make prediction
-            prediction = model.predict(image_array)[0]
-            logger.info(f"Raw prediction probabilities: {prediction}")
-            predicted_index = np.argmax(prediction)
-            predicted_class = class_names[predicted_index]
-            confidence = float(prediction[predicted_index]) * 100
-
-            # 🔍 Debugging log
-            logger.info(f"Predicted index: {predicted_index}")
-            logger.info(f"Predicted class: {predicted_class}")
-            logger.info(f"Confidence: {confidence}")
-
-            # Get soil information
-            info = soil_info.get(predicted_class, {
-                "notes": "No additional info available for this soil type.",
-                "crops": [],
-                "care": ["Test soil pH regularly", "Add organic matter when needed"],
-            })
-
-            return {
-                "prediction": predicted_class,
-                "confidence": confidence,
-                "notes": info["notes"],
-                "crops": info["crops"],
-                "care": info["care"],
-                "status": "success"
-            }
+            result = await executor.run("soil", classify_soil, contents)
+            soil_cache.put(digest, soil_model_version, result)
+            return result
             
         except Exception as model_error:
             logger.error(f"Model loading failed: {str(model_error)}")
             
             # Ultimate fallback: provide a generic but helpful response
             # This ensures the service always works even without ML
-            import random
-            
-            # Simple rule-based prediction based on basic image analysis
             try:
-                image = Image.open(file.file).convert("RGB")
-                
-                # Get average color to make a basic guess
-                pixels = list(image.getdata())
-                avg_color = [sum(channel) / len(pixels) for channel in zip(*pixels)]
-                
-                # Simple heuristic based on color
-                if avg_color[0] > 120 and avg_color[1] > 100 and avg_color[2] < 90:
-                    # Reddish soil
-                    soil_type = "Red soil"
-                elif avg_color[0] < 80 and avg_color[1] < 80 and avg_color[2] < 80:
-                    # Dark soil
-                    soil_type = "Black Soil"
-                elif avg_color[0] > 100 and avg_color[1] > 100 and avg_color[2] > 100:
-                    # Light soil
-                    soil_type = "Alluvial soil"
-                else:
-                    # Default to clay
-                    soil_type = "Clay soil"
-                
-                # Random confidence between 60-80% to seem realistic
-                confidence = random.uniform(60, 80)
-                
-                info = soil_info.get(soil_type, {
-                    "notes": "Basic analysis based on visual characteristics. For accurate results, consider soil testing.",
-                    "crops": ["Rice", "Wheat", "Vegetables"],
-                    "care": ["Test soil pH regularly", "Add organic matter when needed", "Ensure good drainage"],
-                })
-                
-                return {
-                    "prediction": soil_type,
-                    "confidence": confidence,
-                    "notes": f"⚠️ Basic Visual Analysis: {info['notes']}",
-                    "crops": info["crops"],
-                    "care": info["care"],
-                    "status": "fallback_analysis",
-                    "warning": "AI model unavailable - using basic visual analysis"
-                }
+                return await executor.run("soil_fallback", analyze_soil_colors, contents)
                 
             except Exception as fallback_error:
                 logger.error(f"Even fallback analysis failed: {str(fallback_error)}")
@@ -344,6 +525,57 @@ async def predict_soil(file: UploadFile = File(...)):
             "warning": "Image processing failed"
         }
 
+# ✅ Background model loading
+def load_and_warm_soil_model():
+    model_tracker.mark("soil_model", "loading")
+    model, _ = load_soil_model()
+    model_tracker.mark("soil_model", "warming")
+    # /predict-soil always runs single-image batches
+    duration = warm_up(model, [1])
+    model_tracker.mark("soil_model", "ready", warmup_seconds=round(duration, 3), batch_sizes=[1])
+
+def load_and_warm_plantdoc_predictor():
+    model_tracker.mark("plantdoc_predictor", "loading")
+    load_plantdoc_predictor()
+    from predict_plantdoc import load_model, warm_up_model
+    load_model()
+    model_tracker.mark("plantdoc_predictor", "warming")
+    model_tracker.mark("plantdoc_predictor", "ready", **warm_up_model())
+
+def load_price_predictor_tracked():
+    model_tracker.mark("price_predictor", "loading")
+    load_price_predictor()
+    model_tracker.mark("price_predictor", "warming")
+    # Forecasts are precomputed so no request pays for them
+    from predict_with_graph import warm_up_forecasts
+    model_tracker.mark("price_predictor", "ready", **warm_up_forecasts())
+
+def run_model_loaders(loaders):
+    """Run loaders one after another, recording failures instead of raising"""
+    for name, loader in loaders:
+        try:
+            loader()
+            logger.info(f"✅ {name} ready")
+        except Exception as e:
+            model_tracker.mark(name, "failed", error=str(e))
+            logger.warning(f"⚠️ Could not pre-load {name}: {e}")
+            logger.info(f"📝 {name} will be loaded on first use")
+
+async def load_models_in_background():
+    """Load models off the request path; independent groups load in parallel"""
+    groups = [
+        # TensorFlow models share one thread: concurrent Keras deserialisation is not safe
+        [("soil_model", load_and_warm_soil_model), ("plantdoc_predictor", load_and_warm_plantdoc_predictor)],
+        [("price_predictor", load_price_predictor_tracked)],
+    ]
+    await asyncio.gather(*(asyncio.to_thread(run_model_loaders, group) for group in groups))
+
+    degraded = model_tracker.snapshot()["degraded"]
+    if degraded:
+        logger.warning(f"⚠️ AgriSync API ready without pre-loaded: {', '.join(degraded)}")
+    else:
+        logger.info("✅ AgriSync API is ready!")
+
 # ✅ Print all registered routes on startup
 @app.on_event("startup")
 async def startup_event():
@@ -353,36 +585,11 @@ async def startup_event():
         if hasattr(route, 'path'):
             logger.info(f"➡️  {route.path}")
     
-    # Try to load models on startup (optional - will load on first use if this fails)
-    try:
-        logger.info("🔄 Attempting to pre-load models...")
-        
-        # Try to load soil model
-        try:
-            load_soil_model()
-            logger.info("✅ Soil model loaded successfully")
-        except Exception as e:
-            logger.warning(f"⚠️ Could not pre-load soil model: {e}")
-        
-        # Try to load plant disease predictor
-        try:
-            load_plantdoc_predictor()
-            logger.info("✅ Plant disease predictor loaded successfully")
-        except Exception as e:
-            logger.warning(f"⚠️ Could not pre-load plant disease predictor: {e}")
-        
-        # Try to load price predictor
-        try:
-            load_price_predictor()
-            logger.info("✅ Price predictor loaded successfully")
-        except Exception as e:
-            logger.warning(f"⚠️ Could not pre-load price predictor: {e}")
-            
-    except Exception as e:
-        logger.warning(f"⚠️ Model pre-loading failed: {e}")
-        logger.info("📝 Models will be loaded on first use")
-    
-    logger.info("✅ AgriSync API is ready!")
+    # Models load in the background so liveness checks pass during a cold start
+    logger.info("🔄 Loading models in the background...")
+    model_tracker.background_started = True
+    app.state.model_loader = asyncio.create_task(load_models_in_background())
+    logger.info("✅ AgriSync API is live (see /ready for model loading progress)")
 
 if __name__ == "__main__":
     import uvicorn
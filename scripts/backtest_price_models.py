@@ -0,0 +1,229 @@
+"""
+Walk-Forward Price Model Backtesting
+Trains and scores every time-series fold of every crop across a process pool and writes per-fold and aggregate metrics
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from train_models import FEATURES, MODEL_PARAMS, processed_files, load_training_data, training_matrix
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_SPLITS = int(os.environ.get("BACKTEST_SPLITS", 6))
+DEFAULT_MAX_WORKERS = int(os.environ.get("BACKTEST_MAX_WORKERS", os.cpu_count() or 1))
+DEFAULT_RESULTS_DIR = os.environ.get("BACKTEST_RESULTS_DIR", os.path.join(REPO_ROOT, "backtest_results"))
+# spawn: workers start without the parent's (possibly initialised) OpenMP runtime
+START_METHOD = os.environ.get("BACKTEST_START_METHOD", "spawn")
+
+FOLD_COLUMNS = ["run", "crop", "fold", "train_rows", "test_rows", "test_start", "test_end",
+                "mae", "mape", "rmse", "accuracy", "fit_seconds"]
+
+# Feature matrices shared by every fold of a worker: crop -> (X, y, dates), set once per process
+_matrices = {}
+
+
+def load_crop_matrices(crops=None):
+    """crop -> (X, y, dates) in date order, built once from the processed data; crops that fail to load are skipped"""
+    matrices = {}
+    for crop in crops or processed_files:
+        path = os.path.join(REPO_ROOT, processed_files[crop])
+        try:
+            data = load_training_data(path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Skipping {crop}: {e}")
+            continue
+        if len(data) < 3:
+            print(f"⚠️ Skipping {crop}: only {len(data)} rows")
+            continue
+        # Processed files are not stored chronologically; walk-forward folds need them to be
+        matrices[crop] = training_matrix(data.sort_values("Reported Date", kind="stable"))
+    return matrices
+
+
+def walk_forward_folds(n_rows, n_splits=DEFAULT_SPLITS, test_size=None, gap=0):
+    """
+    Expanding-window folds over time-ordered rows, as in TimeSeriesSplit
+
+    Returns:
+        List of (train_end, test_start, test_end): train on [0, train_end), test on [test_start, test_end)
+    """
+    n_splits = min(n_splits, n_rows - 1)
+    test_size = test_size or n_rows // (n_splits + 1)
+    if n_splits < 1 or test_size < 1:
+        return []
+    folds = []
+    for test_start in range(n_rows - n_splits * test_size, n_rows, test_size):
+        train_end = test_start - gap
+        if train_end > 0:
+            folds.append((train_end, test_start, test_start + test_size))
+    return folds
+
+
+def _init_worker(matrices):
+    _matrices.clear()
+    _matrices.update(matrices)
+
+
+def _run_fold(task):
+    """Fit on one fold's training window and score its test window"""
+    from xgboost import XGBRegressor
+
+    crop, fold, (train_end, test_start, test_end), columns, params = task
+    X, y, dates = _matrices[crop]
+    X = X[:, columns]
+
+    started = time.perf_counter()
+    # One thread per model: parallelism comes from the pool
+    model = XGBRegressor(**dict(params, n_jobs=1))
+    model.fit(X[:train_end], y[:train_end])
+    fit_seconds = time.perf_counter() - started
+
+    actual = y[test_start:test_end]
+    predicted = model.predict(X[test_start:test_end]).astype(np.float64)
+    errors = np.abs(actual - predicted)
+    mape = float(np.mean(errors / np.maximum(np.abs(actual), np.finfo(np.float64).eps)))
+    return {
+        "crop": crop,
+        "fold": fold,
+        "train_rows": train_end,
+        "test_rows": test_end - test_start,
+        "test_start": str(dates[test_start])[:10],
+        "test_end": str(dates[test_end - 1])[:10],
+        "mae": float(errors.mean()),
+        "mape": mape,
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "accuracy": 100 - mape * 100,
+        "fit_seconds": fit_seconds,
+    }
+
+
+def run_backtest(matrices, features=FEATURES, params=None, n_splits=DEFAULT_SPLITS, test_size=None, gap=0,
+                 max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Backtest every fold of every crop
+
+    Args:
+        matrices: crop -> (X, y, dates) from load_crop_matrices (columns in FEATURES order)
+        features: Subset of FEATURES to train on, for comparing feature sets
+        params: XGBRegressor parameters; defaults to the training parameters
+        max_workers: Worker processes; 1 runs in this process
+
+    Returns:
+        List of per-fold metric dicts, ordered by crop then fold
+    """
+    unknown = set(features) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+    columns = [FEATURES.index(name) for name in features]
+    params = dict(MODEL_PARAMS, **(params or {}))
+
+    tasks = [
+        (crop, fold, window, columns, params)
+        for crop, (X, _, _) in matrices.items()
+        for fold, window in enumerate(walk_forward_folds(len(X), n_splits, test_size, gap))
+    ]
+    # Largest training windows first so the slowest fits don't start last
+    tasks.sort(key=lambda task: -task[2][0])
+
+    if max_workers <= 1 or len(tasks) <= 1:
+        _init_worker(matrices)
+        results = [_run_fold(task) for task in tasks]
+    else:
+        context = multiprocessing.get_context(START_METHOD)
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)), mp_context=context,
+                                 initializer=_init_worker, initargs=(matrices,)) as pool:
+            results = list(pool.map(_run_fold, tasks))
+    return sorted(results, key=lambda row: (list(matrices).index(row["crop"]), row["fold"]))
+
+
+def summarize(folds):
+    """Per-crop aggregates plus an ``ALL`` row; pooled MAE weights folds by test rows"""
+    summary = []
+    groups = {}
+    for row in folds:
+        groups.setdefault(row["crop"], []).append(row)
+    if folds:
+        groups["ALL"] = list(folds)
+    for crop, rows in groups.items():
+        mae = np.array([r["mae"] for r in rows])
+        mape = np.array([r["mape"] for r in rows])
+        test_rows = np.array([r["test_rows"] for r in rows])
+        summary.append({
+            "crop": crop,
+            "folds": len(rows),
+            "test_rows": int(test_rows.sum()),
+            "mae_mean": float(mae.mean()),
+            "mae_std": float(mae.std()),
+            "pooled_mae": float((mae * test_rows).sum() / test_rows.sum()),
+            "mape_mean": float(mape.mean()),
+            "rmse_mean": float(np.mean([r["rmse"] for r in rows])),
+            "accuracy_mean": float(100 - mape.mean() * 100),
+        })
+    return summary
+
+
+def write_results(folds, summary, results_dir=DEFAULT_RESULTS_DIR, run="baseline", append=False):
+    """Write ``folds.csv`` and ``summary.csv`` (tagged with ``run``); returns their paths"""
+    import pandas as pd
+
+    os.makedirs(results_dir, exist_ok=True)
+    paths = []
+    for name, rows, columns in (("folds", folds, FOLD_COLUMNS), ("summary", summary, None)):
+        frame = pd.DataFrame([dict(row, run=run) for row in rows])
+        if columns:
+            frame = frame[columns]
+        else:
+            frame = frame[["run"] + [c for c in frame.columns if c != "run"]]
+        path = os.path.join(results_dir, f"{name}.csv")
+        exists = append and os.path.exists(path)
+        frame.to_csv(path, mode="a" if exists else "w", header=not exists, index=False, float_format="%.6g")
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the crop price models")
+    parser.add_argument("--crops", nargs="*", default=list(processed_files))
+    parser.add_argument("--splits", type=int, default=DEFAULT_SPLITS)
+    parser.add_argument("--test-size", type=int, default=None, help="Rows per test window (default: even split)")
+    parser.add_argument("--gap", type=int, default=0, help="Rows left out between training and test windows")
+    parser.add_argument("--drop", nargs="*", default=[], help="Features to leave out (feature-set comparison)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--run", default="baseline", help="Label stored with every result row")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    parser.add_argument("--append", action="store_true", help="Append to existing result tables")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    matrices = load_crop_matrices(args.crops)
+    if not matrices:
+        print("❌ No crop data to backtest")
+        sys.exit(1)
+    features = [name for name in FEATURES if name not in set(args.drop)]
+    folds = run_backtest(matrices, features, n_splits=args.splits, test_size=args.test_size, gap=args.gap,
+                         max_workers=args.workers)
+    summary = summarize(folds)
+    paths = write_results(folds, summary, args.results_dir, args.run, args.append)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'crop':<8} {'folds':>5} {'MAE':>9} {'±':>8} {'MAPE':>7} {'RMSE':>9} {'accuracy':>9}")
+    for row in summary:
+        print(f"{row['crop']:<8} {row['folds']:>5} {row['mae_mean']:>9.2f} {row['mae_std']:>8.2f} "
+              f"{row['mape_mean'] * 100:>6.2f}% {row['rmse_mean']:>9.2f} {row['accuracy_mean']:>8.2f}%")
+    print(f"\n✅ {len(folds)} folds across {len(matrices)} crops in {elapsed:.1f}s "
+          f"({args.workers} worker{'s' if args.workers != 1 else ''})")
+    for path in paths:
+        print(f"📄 {path}")
+
+
+if __name__ == "__main__":
+    main()
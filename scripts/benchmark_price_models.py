@@ -0,0 +1,105 @@
+"""
+Price Model Loading Benchmark
+Compares pickled XGBRegressor (joblib + DataFrame predict) against native UBJ boosters (NumPy inplace_predict)
+and NumPy-compiled tree arrays
+"""
+
+import os
+import sys
+import time
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import ModelRegistry
+from native_models import NativeBoosterModel, export_native
+from compiled_trees import CompiledTreeModel, compile_model
+
+
+def _median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark(models_dir, load_runs=5, predict_runs=200, batch_sizes=(1, 4, 64)):
+    import joblib
+    import pandas as pd
+
+    registry = ModelRegistry(models_dir=models_dir)
+    tmp_dir = tempfile.mkdtemp(prefix="native_models_")
+    results = []
+    try:
+        for name in registry.commodities():
+            pickle_path = registry.info(name)["pickle_path"]
+            if not os.path.exists(pickle_path):
+                continue
+            model = joblib.load(pickle_path)
+            if not hasattr(model, "get_booster"):
+                continue
+            feature_names = model.get_booster().feature_names
+            native_path = export_native(model, tmp_dir, name, feature_names)
+            native = NativeBoosterModel(native_path)
+            compiled_path = compile_model(model, tmp_dir, name, feature_names)
+            compiled = CompiledTreeModel(compiled_path)
+
+            row = {
+                "model": name,
+                "pickle_load_ms": _median_ms(lambda: joblib.load(pickle_path), load_runs),
+                "native_load_ms": _median_ms(lambda: NativeBoosterModel(native_path), load_runs),
+                "compiled_load_ms": _median_ms(lambda: CompiledTreeModel(compiled_path), load_runs),
+            }
+            rng = np.random.default_rng(0)
+            for batch in batch_sizes:
+                X = rng.random((batch, len(feature_names))).astype(np.float32) * 1000
+                frame = pd.DataFrame(X, columns=feature_names)
+                expected = model.predict(frame)
+                np.testing.assert_allclose(native.predict(X), expected, rtol=1e-6)
+                np.testing.assert_allclose(compiled.predict(X), expected, rtol=1e-5)
+                row[f"pickle_predict_{batch}_ms"] = _median_ms(lambda: model.predict(pd.DataFrame(X, columns=feature_names)), predict_runs)
+                row[f"native_predict_{batch}_ms"] = _median_ms(lambda: native.predict(X), predict_runs)
+                row[f"compiled_predict_{batch}_ms"] = _median_ms(lambda: compiled.predict(X), predict_runs)
+            results.append(row)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pickled vs native XGBoost price models")
+    parser.add_argument("--models-dir", default=os.path.join(os.path.dirname(__file__), "..", "models"))
+    parser.add_argument("--load-runs", type=int, default=5)
+    parser.add_argument("--predict-runs", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    args = parser.parse_args()
+
+    results = benchmark(args.models_dir, args.load_runs, args.predict_runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'model':<10} {'load pkl':>10} {'load ubj':>10} {'load npz':>10}   " +
+          "   ".join(f"{'b=' + str(b) + ' pkl':>10} {'ubj':>8} {'npz':>8}" for b in (1, 4, 64)))
+    for row in results:
+        print(f"{row['model']:<10} {row['pickle_load_ms']:>8.2f}ms {row['native_load_ms']:>8.2f}ms "
+              f"{row['compiled_load_ms']:>8.2f}ms   " +
+              "   ".join(f"{row[f'pickle_predict_{b}_ms']:>8.3f}ms {row[f'native_predict_{b}_ms']:>6.3f}ms "
+                         f"{row[f'compiled_predict_{b}_ms']:>6.3f}ms" for b in (1, 4, 64)))
+    if results:
+        for kind, label in (("native", "Native"), ("compiled", "Compiled")):
+            load = statistics.mean(r["pickle_load_ms"] / r[f"{kind}_load_ms"] for r in results)
+            call = statistics.mean(r["pickle_predict_1_ms"] / r[f"{kind}_predict_1_ms"] for r in results)
+            print(f"⚡ {label} load {load:.1f}x faster, single-row predict {call:.1f}x faster (mean over models)")
+
+
+if __name__ == "__main__":
+    main()
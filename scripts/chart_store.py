@@ -0,0 +1,234 @@
+"""
+Content-Addressed Price Chart Store
+Renders forecast charts on a background thread with reused Agg figures and keeps the graph directory within a size/age budget
+"""
+
+import os
+import re
+import time
+import queue
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from prediction_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Budgets for rendered charts; evicted charts are re-rendered on demand
+DEFAULT_MAX_BYTES = int(os.environ.get("GRAPH_STORE_MAX_BYTES", 50 * 1024 * 1024))
+DEFAULT_MAX_AGE_SECONDS = float(os.environ.get("GRAPH_STORE_MAX_AGE", 7 * 24 * 3600))
+# How many chart specs are remembered for re-rendering evicted files
+DEFAULT_MAX_SPECS = int(os.environ.get("GRAPH_STORE_MAX_SPECS", 256))
+
+# "<crop>_prediction_<16 hex digits>.png"; timestamped legacy charts are left alone
+CHART_PATTERN = re.compile(r"^[\w-]+_prediction_[0-9a-f]{16}\.png$")
+
+
+def chart_filename(crop, dates, values):
+    """File name derived from the plotted data, so identical forecasts share one file"""
+    payload = "|".join([crop] + [f"{d:%Y-%m-%d}={float(v):.6f}" for d, v in zip(dates, values)])
+    return f"{crop}_prediction_{content_hash(payload.encode())[:16]}.png"
+
+
+def render_price_chart(fig, crop, dates, values):
+    """Draw a forecast chart onto a (reused) figure"""
+    fig.clear()
+    ax = fig.add_subplot()
+    ax.plot(dates, values, linestyle="dotted", color="red", marker="x", label="Predicted Prices")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Modal Price (Rs./Quintal)")
+    ax.set_title(f"Prediction for {crop.capitalize()}")
+    ax.grid(True)
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+
+class ChartRenderer:
+    """
+    Single background thread that owns one Agg figure (matplotlib is not thread-safe).
+    ``submit`` returns the chart's file name immediately; callers that need the file
+    (the /graphs route) ``ensure`` it, which waits for a pending render or re-renders
+    an evicted chart.
+    """
+
+    def __init__(self, graph_dir, max_bytes=DEFAULT_MAX_BYTES, max_age_seconds=DEFAULT_MAX_AGE_SECONDS,
+                 max_specs=DEFAULT_MAX_SPECS, figsize=(10, 5)):
+        self.graph_dir = graph_dir
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age_seconds)
+        self.max_specs = max(1, int(max_specs))
+        self.figsize = figsize
+
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {"rendered": 0, "reused": 0, "rerendered": 0, "failed": 0, "evicted": 0}
+
+        os.makedirs(graph_dir, exist_ok=True)
+
+    def submit(self, crop, dates, values):
+        """
+        Queue a chart for rendering (no-op if an identical chart already exists)
+
+        Returns:
+            The chart's file name inside ``graph_dir``
+        """
+        dates = list(dates)
+        values = [float(v) for v in values]
+        filename = chart_filename(crop, dates, values)
+        with self._lock:
+            self._specs[filename] = (crop, dates, values)
+            self._specs.move_to_end(filename)
+            while len(self._specs) > self.max_specs:
+                self._specs.popitem(last=False)
+        self._schedule(filename, reuse_existing=True)
+        return filename
+
+    def ensure(self, filename, timeout=30):
+        """Make sure a chart file exists, waiting for (or triggering) its render. Returns True if it does."""
+        with self._lock:
+            event = self._pending.get(filename)
+            known = filename in self._specs
+        if event is None and not os.path.exists(os.path.join(self.graph_dir, filename)) and known:
+            with self._lock:
+                self._stats["rerendered"] += 1
+            event = self._schedule(filename, reuse_existing=False)
+        if event is not None:
+            event.wait(timeout)
+        return os.path.exists(os.path.join(self.graph_dir, filename))
+
+    def is_known(self, filename):
+        with self._lock:
+            return filename in self._pending or filename in self._specs
+
+    def evict(self, keep=()):
+        """
+        Remove charts older than the age budget, then the least recently used until under the size budget
+
+        Args:
+            keep: File names that must survive (e.g. charts rendered for in-flight requests)
+        """
+        now = time.time()
+        charts = []
+        try:
+            names = os.listdir(self.graph_dir)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not scan {self.graph_dir} for eviction: {e}")
+            return 0
+        for name in names:
+            if name.endswith(".tmp"):
+                self._remove_orphan(name, now)
+                continue
+            if not CHART_PATTERN.match(name):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.graph_dir, name))
+            except OSError:
+                continue
+            charts.append((stat.st_mtime, stat.st_size, name))
+
+        with self._lock:
+            keep = set(keep) | set(self._pending)
+        charts.sort()
+        total = sum(size for _, size, _ in charts)
+        evicted = 0
+        for mtime, size, name in charts:
+            if name in keep:
+                continue
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.graph_dir, name))
+                total -= size
+                evicted += 1
+            except OSError:
+                pass
+        if evicted:
+            with self._lock:
+                self._stats["evicted"] += evicted
+            logger.info(f"🧹 Evicted {evicted} chart(s) from {self.graph_dir}")
+        return evicted
+
+    def _remove_orphan(self, name, now):
+        # Partial writes left behind by a process that died mid-render
+        path = os.path.join(self.graph_dir, name)
+        try:
+            if now - os.stat(path).st_mtime > 3600:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), known_charts=len(self._specs),
+                        max_bytes=self.max_bytes, max_age_seconds=self.max_age)
+
+    def _schedule(self, filename, reuse_existing):
+        path = os.path.join(self.graph_dir, filename)
+        with self._lock:
+            event = self._pending.get(filename)
+            if event is not None:
+                return event
+            if reuse_existing and os.path.exists(path):
+                self._stats["reused"] += 1
+                try:
+                    # Refresh the chart's position in the LRU / age budget
+                    os.utime(path)
+                except OSError:
+                    pass
+                return None
+            event = self._pending[filename] = threading.Event()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="chart-renderer", daemon=True)
+                self._thread.start()
+        self._queue.put(filename)
+        return event
+
+    def _run(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+        rendered = set()
+        while True:
+            filename = self._queue.get()
+            rendered.add(filename)
+            try:
+                with self._lock:
+                    spec = self._specs.get(filename)
+                if spec is not None:
+                    self._render(fig, filename, *spec)
+            except Exception as e:
+                with self._lock:
+                    self._stats["failed"] += 1
+                logger.warning(f"⚠️ Could not render chart {filename}: {e}")
+            finally:
+                with self._lock:
+                    event = self._pending.pop(filename, None)
+                if event is not None:
+                    event.set()
+            if self._queue.empty():
+                self.evict(keep=rendered)
+                rendered = set()
+
+    def _render(self, fig, filename, crop, dates, values):
+        render_price_chart(fig, crop, dates, values)
+        # Write-then-rename so /graphs never serves a partial PNG
+        fd, tmp_path = tempfile.mkstemp(dir=self.graph_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                fig.savefig(f, format="png")
+            os.replace(tmp_path, os.path.join(self.graph_dir, filename))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._stats["rendered"] += 1
+        logger.info(f"✅ Saved plot for {crop} at {os.path.join(self.graph_dir, filename)}")
@@ -0,0 +1,314 @@
+"""
+Compiled Tree Ensembles
+Flattens XGBoost regression boosters into NumPy arrays (.npz) and evaluates every tree for a batch of rows
+vectorized, so price serving needs neither xgboost nor pandas
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+
+import numpy as np
+
+COMPILED_SUFFIX = "_model.npz"
+
+# Objectives whose prediction is the raw margin (no link function)
+SUPPORTED_OBJECTIVES = ("reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror")
+
+# Leaves per tree that fit one bitvector word; deeper trees fall back to node traversal
+MAX_BITVECTOR_LEAVES = 64
+
+# Rows evaluated per step; bounds the (rows x trees) scratch arrays and keeps them in cache
+DEFAULT_CHUNK_ROWS = int(os.environ.get("COMPILED_TREES_CHUNK_ROWS", 128))
+
+_ALL_LEAVES = np.uint64(2 ** 64 - 1)
+
+
+def _parse_base_score(value):
+    # "2.43E3" in XGBoost 1.x, "[2.43E3]" (one per target) from 2.x on
+    return float(str(value).strip("[]").split(",")[0])
+
+
+def compile_booster(model, feature_names=None):
+    """
+    Flatten a fitted XGBRegressor (or Booster) into NumPy arrays
+
+    All trees share one node table, numbered breadth-first so a node's right child is
+    ``left + 1``; leaves point back to themselves. Splits follow XGBoost: ``x < threshold``
+    goes left and missing values take the default direction. When every tree has at most
+    64 leaves, bitvector tables (``qs_*``) are added for the faster evaluator.
+
+    Returns:
+        Dict of arrays: feature, threshold, left, default_left, value, roots, base_score,
+        max_depth, num_features, feature_names, objective and optionally the qs_* tables
+    """
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise ValueError(f"Unsupported objective {objective}")
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError(f"Unsupported booster {learner['gradient_booster']['name']}")
+    if int(learner["learner_model_param"].get("num_target", 1)) != 1:
+        raise ValueError("Only single-target regressors can be compiled")
+
+    feature, threshold, left, default_left, value, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        if any(tree.get("split_type", [])):
+            raise ValueError("Categorical splits are not supported")
+        lc = np.asarray(tree["left_children"], dtype=np.int64)
+        rc = np.asarray(tree["right_children"], dtype=np.int64)
+        order, depth = _breadth_first(lc, rc)
+        position = np.empty(len(lc), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        is_leaf = lc[order] == -1
+        index = np.arange(len(order)) + offset
+        # Leaves keep their value in split_conditions
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)[order]
+
+        feature.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"])[order]))
+        threshold.append(np.where(is_leaf, np.inf, conditions))
+        left.append(np.where(is_leaf, index, position[np.maximum(lc[order], 0)] + offset))
+        default_left.append(is_leaf | np.asarray(tree["default_left"], dtype=bool)[order])
+        value.append(np.where(is_leaf, conditions, 0))
+        roots.append(offset)
+        offset += len(order)
+        max_depth = max(max_depth, depth)
+
+    names = list(feature_names or booster.feature_names or [])
+    arrays = {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float32),
+        "left": np.concatenate(left).astype(np.int32),
+        "default_left": np.concatenate(default_left),
+        "value": np.concatenate(value).astype(np.float32),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "base_score": np.float32(_parse_base_score(learner["learner_model_param"]["base_score"])),
+        "max_depth": np.int32(max_depth),
+        "num_features": np.int32(len(names) or int(learner["learner_model_param"]["num_feature"])),
+        "feature_names": np.asarray(names, dtype=str),
+        "objective": np.asarray(objective),
+    }
+    arrays.update(_bitvector_tables(arrays))
+    return arrays
+
+
+def _breadth_first(left, right):
+    """Node order in which siblings are adjacent, and the tree depth"""
+    order, level, depth = [], [0], 0
+    while level:
+        order.extend(level)
+        level = [child for node in level if left[node] != -1 for child in (left[node], right[node])]
+        depth += bool(level)
+    return np.asarray(order), depth
+
+
+def _bitvector_tables(arrays):
+    """
+    QuickScorer-style tables: leaves are numbered left to right within each tree and a
+    split that sends a row right clears the bits of its left subtree's leaves. For each
+    feature, row ``b`` of its table ANDs the masks of every split on that feature whose
+    threshold is among the ``b`` smallest (the splits a value in bin ``b`` fails); the last
+    row covers missing values. A row's exit leaf in each tree is the lowest bit left after
+    ANDing one row per feature.
+
+    Returns:
+        Dict of qs_* arrays, or {} when a tree has more than MAX_BITVECTOR_LEAVES leaves
+    """
+    feature, threshold, left = arrays["feature"], arrays["threshold"], arrays["left"]
+    default_left, value, roots = arrays["default_left"], arrays["value"], arrays["roots"]
+    is_leaf = left == np.arange(len(left))
+    num_trees = len(roots)
+
+    masks = np.full(len(left), _ALL_LEAVES, dtype=np.uint64)
+    tree_of = np.empty(len(left), dtype=np.intp)
+    leaf_values = np.zeros((num_trees, MAX_BITVECTOR_LEAVES), dtype=np.float32)
+    for tree, root in enumerate(roots):
+        # In-order walk: (node, expanded) pairs; leaves are numbered as they are reached
+        leaves, leaf_start, stack = 0, {}, [(int(root), False)]
+        while stack:
+            node, expanded = stack.pop()
+            tree_of[node] = tree
+            if is_leaf[node]:
+                if leaves == MAX_BITVECTOR_LEAVES:
+                    return {}
+                leaf_values[tree, leaves] = value[node]
+                leaves += 1
+            elif expanded:
+                # Left subtree done: its leaves are [leaf_start, leaves)
+                width = leaves - leaf_start[node]
+                masks[node] = ~np.uint64(((1 << width) - 1) << leaf_start[node])
+                stack.append((int(left[node]) + 1, False))
+            else:
+                leaf_start[node] = leaves
+                stack.extend([(node, True), (int(left[node]), False)])
+
+    bounds, bound_offsets, tables, table_offsets = [], [0], [], [0]
+    for f in range(int(arrays["num_features"])):
+        splits = np.flatnonzero(~is_leaf & (feature == f))
+        unique, rank = np.unique(threshold[splits], return_inverse=True)
+        table = np.full((len(unique) + 2, num_trees), _ALL_LEAVES, dtype=np.uint64)
+        for k in range(len(unique)):
+            table[k + 1] = table[k]
+            chosen = splits[rank == k]
+            np.bitwise_and.at(table[k + 1], tree_of[chosen], masks[chosen])
+        missing_right = splits[~default_left[splits]]
+        np.bitwise_and.at(table[-1], tree_of[missing_right], masks[missing_right])
+        bounds.append(unique)
+        bound_offsets.append(bound_offsets[-1] + len(unique))
+        tables.append(table)
+        table_offsets.append(table_offsets[-1] + len(table))
+
+    return {
+        "qs_bounds": np.concatenate(bounds).astype(np.float32),
+        "qs_bound_offsets": np.asarray(bound_offsets, dtype=np.int64),
+        "qs_table": np.concatenate(tables),
+        "qs_table_offsets": np.asarray(table_offsets, dtype=np.int64),
+        "qs_leaf_values": leaf_values,
+    }
+
+
+def _lowest_set_bit(words):
+    """Index of the lowest set bit of each (non-zero) uint64"""
+    lowest = words & (~words + np.uint64(1))
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(lowest - np.uint64(1)).astype(np.intp)
+    return np.frexp(lowest.astype(np.float64))[1].astype(np.intp) - 1
+
+
+def compile_model(model, models_dir, name, feature_names=None):
+    """Compile a fitted regressor to ``<models_dir>/<name>_model.npz``; returns the path"""
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, f"{name}{COMPILED_SUFFIX}")
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **compile_booster(model, feature_names))
+    os.replace(tmp_path, path)
+    return path
+
+
+class CompiledTreeModel:
+    """
+    Tree ensemble evaluated with NumPy only. ``predict`` takes a float matrix in
+    ``feature_names`` order (DataFrames are reordered) and matches XGBoost's float32 output
+    to within float32 summation order.
+    """
+
+    def __init__(self, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        with np.load(path, allow_pickle=False) as arrays:
+            # Index arrays as intp so fancy indexing doesn't convert them on every step
+            self.feature = arrays["feature"].astype(np.intp)
+            self.threshold = arrays["threshold"]
+            self.left = arrays["left"].astype(np.intp)
+            self.default_left = arrays["default_left"]
+            self.value = arrays["value"]
+            self.roots = arrays["roots"].astype(np.intp)
+            self.base_score = float(arrays["base_score"])
+            self.max_depth = int(arrays["max_depth"])
+            self.num_features = int(arrays["num_features"])
+            self.feature_names = arrays["feature_names"].tolist()
+            self.objective = str(arrays["objective"])
+            self.bitvector = "qs_table" in arrays
+            if self.bitvector:
+                self._table = arrays["qs_table"]
+                self._leaf_values = arrays["qs_leaf_values"].ravel()
+                bounds, bound_offsets = arrays["qs_bounds"], arrays["qs_bound_offsets"]
+                table_offsets = arrays["qs_table_offsets"]
+                # (feature, thresholds, first table row) for features that are split on
+                self._splits = [
+                    (f, bounds[bound_offsets[f]:bound_offsets[f + 1]], int(table_offsets[f]))
+                    for f in range(self.num_features) if bound_offsets[f + 1] > bound_offsets[f]
+                ]
+                self._leaf_base = np.arange(len(self.roots), dtype=np.intp) * MAX_BITVECTOR_LEAVES
+        self.nbytes = sum(a.nbytes for a in (
+            self.feature, self.threshold, self.left, self.default_left, self.value, self.roots
+        ))
+        if self.bitvector:
+            self.nbytes += self._table.nbytes + self._leaf_values.nbytes
+
+    @property
+    def num_trees(self):
+        return len(self.roots)
+
+    def predict(self, X, validate_features=False):
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy()
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.num_features:
+            raise ValueError(f"Expected {self.num_features} features, got shape {X.shape}")
+        predict_chunk = self._predict_bitvector if self.bitvector else self._predict_traversal
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), self.chunk_rows):
+            out[start:start + self.chunk_rows] = predict_chunk(X[start:start + self.chunk_rows])
+        return out
+
+    def _predict_bitvector(self, X):
+        exits = np.full((len(X), len(self.roots)), _ALL_LEAVES, dtype=np.uint64)
+        for f, bounds, first_row in self._splits:
+            column = X[:, f]
+            bins = np.searchsorted(bounds, column, side="right")
+            bins[np.isnan(column)] = len(bounds) + 1
+            exits &= self._table[first_row + bins]
+        leaves = self._leaf_base + _lowest_set_bit(exits)
+        return self._leaf_values[leaves].sum(axis=1, dtype=np.float64) + self.base_score
+
+    def _predict_traversal(self, X):
+        flat = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(len(X), dtype=np.intp) * X.shape[1])[:, None]
+        has_missing = bool(np.isnan(flat).any())
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat[row_offsets + self.feature[nodes]]
+            go_right = ~(x < self.threshold[nodes])
+            if has_missing:
+                go_right &= ~(np.isnan(x) & self.default_left[nodes])
+            nodes = self.left[nodes] + go_right
+        return self.value[nodes].sum(axis=1, dtype=np.float64) + self.base_score
+
+
+def compile_models(models_dir):
+    """Compile every XGBoost ``*_model.pkl`` (or native ``*_model.ubj``) in ``models_dir``"""
+    from native_models import NATIVE_SUFFIX, NativeBoosterModel
+
+    compiled = []
+    sources = {}
+    for suffix in ("_model.pkl", NATIVE_SUFFIX):  # native wins over a pickle of the same name
+        for path in glob.glob(os.path.join(models_dir, f"*{suffix}")):
+            sources[os.path.basename(path)[:-len(suffix)]] = path
+
+    for name, path in sorted(sources.items()):
+        if path.endswith(NATIVE_SUFFIX):
+            model = NativeBoosterModel(path)
+            feature_names = model.feature_names
+        else:
+            import joblib
+            model = joblib.load(path)
+            feature_names = None
+        if not hasattr(model, "get_booster"):
+            print(f"⏭️  {name}: not an XGBoost model, skipped")
+            continue
+        try:
+            compiled.append(compile_model(model, models_dir, name, feature_names))
+        except ValueError as e:
+            print(f"⏭️  {name}: {e}")
+            continue
+        print(f"✅ {name}: {compiled[-1]}")
+    return compiled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile XGBoost price models to NumPy tree arrays")
+    parser.add_argument("--models-dir", default=os.path.join(os.path.dirname(__file__), "..", "models"))
+    args = parser.parse_args()
+    if not compile_models(args.models_dir):
+        print("❌ No models compiled")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Price Feature Store
+Materializes each crop's forecast feature statistics once, when its data or model is refreshed, into models/<crop>_features.json next to the model; serving reads them instead of aggregating the data
+"""
+
+import os
+import json
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+FEATURES_SUFFIX = "_features.json"
+STORE_VERSION = 1
+
+# Forecast statistic -> processed data column whose median it is
+MEDIAN_COLUMNS = {
+    "arrivals": "Arrivals (Tonnes)",
+    "min_price": "Min Price (Rs./Quintal)",
+    "max_price": "Max Price (Rs./Quintal)",
+    "rolling_price": "Rolling_Modal_Price",
+    "lag_1_month": "Lag_1_Month",
+    "lag_2_months": "Lag_2_Months",
+    "price_change_rate": "Price_Change_Rate",
+}
+
+
+def features_path(models_dir, crop):
+    return os.path.join(models_dir, f"{crop}{FEATURES_SUFFIX}")
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def add_date_features(data):
+    """Date-derived model features: Days since the first report and Month"""
+    data["Days"] = (data["Reported Date"] - data["Reported Date"].min()).dt.days
+    data["Month"] = data["Reported Date"].dt.month
+    return data
+
+
+def load_feature_data(data_path, columns=None):
+    """Processed crop data as the models see it, for training and for materializing features"""
+    from market_store import read_market_data
+
+    return add_date_features(read_market_data(data_path, columns))
+
+
+def compute_stats(data):
+    """
+    Forecast statistics from ``load_feature_data`` output
+
+    Returns:
+        JSON-ready dict: first/last date, the last day number, the row count and
+        column medians (MEDIAN_COLUMNS)
+    """
+    import numpy as np
+
+    first_date = data["Reported Date"].min()
+    last_date = data["Reported Date"].max()
+    stats = {
+        "first_date": first_date.strftime("%Y-%m-%d"),
+        "last_date": last_date.strftime("%Y-%m-%d"),
+        "last_day": int((last_date - first_date).days),
+        "rows": len(data),
+    }
+    for name, column in MEDIAN_COLUMNS.items():
+        stats[name] = float(data[column].astype(np.float64).median())
+    return stats
+
+
+def materialize(crop, data_path, models_dir, model_paths=None, data=None):
+    """
+    Compute and write ``<models_dir>/<crop>_features.json``
+
+    The file records SHA-1 hashes of the data file and of every model file present, so a
+    reader can tell the statistics belong to the model it serves.
+
+    Args:
+        data: Training data already loaded from ``data_path`` (read through it otherwise)
+        model_paths: Model files to version against; defaults to the crop's .npz/.ubj/.pkl
+    """
+    from train_models import load_training_data
+
+    if data is None:
+        data = load_training_data(data_path)
+    if model_paths is None:
+        model_paths = [os.path.join(models_dir, f"{crop}{suffix}") for suffix in ("_model.npz", "_model.ubj", "_model.pkl")]
+    record = {
+        "version": STORE_VERSION,
+        "crop": crop,
+        "data": {"file": os.path.basename(data_path), "sha1": file_sha1(data_path)},
+        "models": {os.path.basename(path): file_sha1(path) for path in model_paths if os.path.exists(path)},
+        "stats": compute_stats(data),
+    }
+    os.makedirs(models_dir, exist_ok=True)
+    path = features_path(models_dir, crop)
+    with open(path + ".tmp", "w") as f:
+        json.dump(record, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def materialized_data_sha1(crop, models_dir):
+    """SHA-1 of the data file the crop's features were materialized from, or None without a current store"""
+    try:
+        with open(features_path(models_dir, crop), "r") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("version") != STORE_VERSION:
+        return None
+    return record.get("data", {}).get("sha1")
+
+
+def load_features(crop, models_dir, data_path, model_path):
+    """
+    Materialized statistics for a crop, or None when there are none for this data and model
+
+    ``first_date`` and ``last_date`` come back as datetimes, ready for build_feature_matrix.
+    """
+    path = features_path(models_dir, crop)
+    try:
+        with open(path, "r") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if record.get("version") != STORE_VERSION:
+        return None
+    try:
+        if record["data"]["sha1"] != file_sha1(data_path):
+            logger.warning(f"⚠️ {path} predates {data_path}; rerun scripts/feature_store.py")
+            return None
+        recorded = record["models"].get(os.path.basename(model_path))
+        if recorded is not None and recorded != file_sha1(model_path):
+            logger.warning(f"⚠️ {path} was materialized for another {os.path.basename(model_path)}")
+            return None
+    except OSError:
+        return None
+    return _with_dates(record["stats"])
+
+
+def serving_stats(crop, models_dir, data_path, model_path):
+    """Materialized statistics, or the same statistics computed from the data when they are missing or stale"""
+    stats = load_features(crop, models_dir, data_path, model_path)
+    if stats is None:
+        stats = data_stats(data_path)
+    return stats
+
+
+def data_stats(data_path):
+    """Statistics computed from a processed data file, in the form ``load_features`` returns"""
+    columns = ["Reported Date"] + list(MEDIAN_COLUMNS.values())
+    return _with_dates(compute_stats(load_feature_data(data_path, columns)))
+
+
+def _with_dates(stats):
+    stats = dict(stats)
+    for key in ("first_date", "last_date"):
+        stats[key] = datetime.strptime(stats[key], "%Y-%m-%d")
+    return stats
+
+
+def main():
+    from model_registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description="Materialize per-crop forecast features next to the price models")
+    parser.add_argument("--models-dir", default=os.path.join(os.path.dirname(__file__), "..", "models"))
+    parser.add_argument("--crops", nargs="*")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(models_dir=args.models_dir)
+    for crop in args.crops or registry.commodities():
+        try:
+            path = materialize(crop, registry.data_path(crop), args.models_dir)
+            print(f"✅ {crop}: {path}")
+        except Exception as e:
+            print(f"❌ {crop}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Market Forecast Cache
+Keeps per-crop forecasts in memory and recomputes them in the background when their model or data files change
+"""
+
+import os
+import time
+import logging
+import threading
+
+from prediction_cache import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# How often the background refresher re-checks source files
+DEFAULT_REFRESH_INTERVAL = float(os.environ.get("FORECAST_REFRESH_INTERVAL", 60))
+
+
+def sources_fingerprint(paths):
+    """Fingerprint of a set of files (None for missing ones)"""
+    fingerprint = []
+    for path in paths:
+        try:
+            fingerprint.append(model_fingerprint(path))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+class ForecastCache:
+    """
+    Maps a key (crop) to the result of ``compute_fn(key)``, valid for as long as the
+    files returned by ``sources_fn(key)`` are unchanged. Requests only ever compute a
+    key that has never been computed; stale entries keep being served until the
+    background refresher has replaced them. Without a running refresher, stale and
+    failed entries are recomputed once on the request that finds them.
+    """
+
+    def __init__(self, compute_fn, sources_fn, refresh_interval=DEFAULT_REFRESH_INTERVAL, name="forecasts",
+                 executor=None, postprocess=None, on_error=None):
+        """
+        Args:
+            compute_fn: ``key -> result`` (results containing an "error" key are retried on every refresh)
+            sources_fn: ``key -> list of file paths`` the result depends on
+            refresh_interval: Seconds between background staleness checks
+            name: Name used in logs and stats
+            executor: Optional ForecastExecutor; several keys are then computed in parallel
+            postprocess: Optional ``(key, result) -> result`` run in this process after computing
+            on_error: ``(key, exception) -> result`` for keys whose computation raised
+        """
+        self.compute_fn = compute_fn
+        self.sources_fn = sources_fn
+        self.refresh_interval = float(refresh_interval)
+        self.name = name
+        self.executor = executor
+        self.postprocess = postprocess
+        self.on_error = on_error or (lambda key, e: {"key": key, "error": str(e)})
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._compute_lock = threading.Lock()
+        self._keys = []
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def get(self, key):
+        """Cached result for ``key``; computed inline only the first time"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return self._compute_missing([key])[key]
+
+        stale = entry["fingerprint"] != sources_fingerprint(self.sources_fn(key))
+        with self._lock:
+            self._stats["stale_hits" if stale else "hits"] += 1
+        if stale and self._thread is not None:
+            # Serve the old forecast now; the refresher swaps in the new one
+            self._wake.set()
+        elif stale or entry["failed"] and self._thread is None:
+            # No refresher: recompute once inline. A failed recompute keeps the previous result
+            self.refresh([key])
+            with self._lock:
+                entry = self._entries[key]
+        return entry["result"]
+
+    def get_many(self, keys):
+        """Results for ``keys`` in order; keys never computed before are computed together"""
+        keys = list(keys)
+        with self._lock:
+            missing = [key for key in keys if key not in self._entries]
+        if missing:
+            self._compute_missing(missing)
+        return [self.get(key) for key in keys]
+
+    def refresh(self, keys=None):
+        """
+        Recompute entries whose sources changed (or that previously failed)
+
+        Returns:
+            Keys that were recomputed
+        """
+        stale = []
+        for key in list(keys if keys is not None else self._keys):
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None or entry["failed"] or entry["fingerprint"] != sources_fingerprint(self.sources_fn(key)):
+                stale.append(key)
+
+        refreshed = []
+        for key, entry in self._compute(stale).items():
+            with self._lock:
+                previous = self._entries.get(key)
+                if entry["failed"] and previous is not None and not previous["failed"]:
+                    # Keep serving the previous forecast
+                    self._stats["refresh_errors"] += 1
+                    logger.warning(f"⚠️ Could not refresh {self.name} for {key}: {entry['result'].get('error')}")
+                    continue
+                self._entries[key] = entry
+            refreshed.append(key)
+        if refreshed:
+            with self._lock:
+                self._stats["refreshes"] += len(refreshed)
+            logger.info(f"♻️ Refreshed {self.name}: {', '.join(map(str, refreshed))}")
+        return refreshed
+
+    def start(self, keys):
+        """Start the background refresher for ``keys`` (idempotent)"""
+        self._keys = list(keys)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-refresh", daemon=True)
+            self._thread.start()
+            logger.info(f"🔁 {self.name} refresher started (every {self.refresh_interval:.0f}s)")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._stats,
+                entries={
+                    key: {
+                        "computed_at": entry["computed_at"],
+                        "compute_seconds": entry["compute_seconds"],
+                        "failed": entry["failed"],
+                    }
+                    for key, entry in self._entries.items()
+                },
+                refresh_interval=self.refresh_interval,
+                background_refresh=self._thread is not None,
+            )
+
+    def _compute_missing(self, keys):
+        # One cold computation at a time; concurrent requests wait for it
+        with self._compute_lock:
+            with self._lock:
+                missing = [key for key in keys if key not in self._entries]
+                self._stats["misses"] += len(missing)
+            entries = self._compute(missing)
+            with self._lock:
+                self._entries.update(entries)
+                return {key: self._entries[key]["result"] for key in keys}
+
+    def _compute(self, keys):
+        """Compute ``keys`` (in parallel when an executor is set) into new entries"""
+        if not keys:
+            return {}
+        # Fingerprint before computing, so a file changing mid-computation triggers another refresh
+        fingerprints = {key: sources_fingerprint(self.sources_fn(key)) for key in keys}
+        started = time.perf_counter()
+        if self.executor is not None:
+            results = self.executor.map(self.compute_fn, keys, on_error=self.on_error)
+        else:
+            results = [self._compute_one(key) for key in keys]
+        elapsed = round(time.perf_counter() - started, 3)
+
+        entries = {}
+        for key, result in zip(keys, results):
+            if self.postprocess is not None:
+                result = self.postprocess(key, result)
+            entries[key] = {
+                "result": result,
+                "fingerprint": fingerprints[key],
+                "failed": isinstance(result, dict) and "error" in result,
+                "computed_at": time.time(),
+                "compute_seconds": elapsed,
+            }
+        return entries
+
+    def _compute_one(self, key):
+        try:
+            return self.compute_fn(key)
+        except Exception as e:
+            return self.on_error(key, e)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ {self.name} refresh failed: {e}")
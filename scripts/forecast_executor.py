@@ -0,0 +1,196 @@
+"""
+Parallel Forecast Executor
+Fans independent per-crop forecasts out across a thread or process pool with per-crop timeouts and error isolation
+"""
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# "thread" (default; XGBoost and pandas I/O release the GIL) or "process"
+FORECAST_EXECUTOR = os.environ.get("FORECAST_EXECUTOR", "thread").strip().lower()
+DEFAULT_MAX_WORKERS = int(os.environ.get("FORECAST_MAX_WORKERS", os.cpu_count() or 1))
+DEFAULT_TIMEOUT = float(os.environ.get("FORECAST_TIMEOUT", 60))
+# Timed-out forecasts still running in thread mode before map() refuses new work
+DEFAULT_MAX_STUCK = int(os.environ.get("FORECAST_MAX_STUCK", DEFAULT_MAX_WORKERS))
+
+
+class ForecastExecutor:
+    """
+    ``map(fn, keys)`` runs ``fn(key)`` for every key in parallel and returns results in key
+    order. A key that raises, times out or loses its worker process gets an error result
+    from ``on_error`` instead of failing the others.
+
+    Timeouts differ by kind. A process worker that overruns is terminated along with its
+    pool once every other batch still using that pool has returned; new batches start on
+    a fresh pool meanwhile. A thread cannot be stopped: it keeps running, and holding its
+    slot, until ``fn`` returns. The pool is therefore replaced after such a batch so later
+    batches get full capacity, and once ``max_stuck`` overrun threads are still alive ``map`` fails every
+    key straight away instead of starting more. Use the process kind where forecasts
+    can hang.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT, kind=FORECAST_EXECUTOR,
+                 max_stuck=DEFAULT_MAX_STUCK):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown forecast executor: {kind!r}")
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = float(timeout)
+        self.kind = kind
+        self.max_stuck = max(1, int(max_stuck))
+        self._pool = None
+        self._users = {}
+        self._retired = set()
+        self._stuck = set()
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "tasks": 0, "errors": 0, "timeouts": 0, "last_batch_seconds": None}
+
+    def map(self, fn, keys, on_error=None):
+        """
+        Args:
+            fn: ``key -> result``; must be picklable (module-level) for the process pool
+            keys: Keys to compute
+            on_error: ``(key, exception) -> result`` for failed keys; defaults to
+                ``{"key": key, "error": str(exception)}``
+        """
+        keys = list(keys)
+        on_error = on_error or (lambda key, e: {"key": key, "error": str(e)})
+        if not keys:
+            return []
+
+        started = time.perf_counter()
+        stuck = self._stuck_count()
+        pool, futures, overran = None, {}, []
+        try:
+            if stuck >= self.max_stuck:
+                error = RuntimeError(f"{stuck} timed-out forecasts are still running; not starting more")
+                futures = dict.fromkeys(keys, error)
+            else:
+                pool = self._acquire_pool()
+                for key in keys:
+                    try:
+                        futures[key] = pool.submit(fn, key)
+                    except (BrokenProcessPool, RuntimeError) as e:
+                        # Pool died or was shut down; rebuild it for later batches
+                        self._reset_pool()
+                        futures[key] = e
+
+            # Every key is submitted at once, so each one gets the full timeout from the start
+            pending = [f for f in futures.values() if not isinstance(f, Exception)]
+            wait(pending, timeout=self.timeout)
+
+            results, errors, timeouts = [], 0, 0
+            for key in keys:
+                future = futures[key]
+                if isinstance(future, Exception):
+                    error = future
+                elif not future.done():
+                    if not future.cancel():
+                        overran.append(future)
+                    timeouts += 1
+                    error = TimeoutError(f"Forecast timed out after {self.timeout:.0f}s")
+                else:
+                    error = future.exception()
+                    if error is None:
+                        results.append(future.result())
+                        continue
+                    if isinstance(error, BrokenProcessPool):
+                        self._reset_pool()
+                errors += 1
+                logger.warning(f"⚠️ Forecast for {key} failed: {error}")
+                results.append(on_error(key, error))
+
+            if overran and self.kind == "thread":
+                with self._lock:
+                    self._stuck.update(overran)
+                # The overrunning threads keep their slots; later batches get a fresh pool
+                self._reset_pool(cancel_futures=False)
+                logger.warning(f"⚠️ {len(overran)} forecast thread(s) still running past the timeout")
+
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["tasks"] += len(keys)
+                self._stats["errors"] += errors
+                self._stats["timeouts"] += timeouts
+                self._stats["last_batch_seconds"] = round(time.perf_counter() - started, 3)
+            return results
+        finally:
+            if pool is not None:
+                # A hung worker process only dies with its pool, which other batches may still be using
+                self._release_pool(pool, retire=bool(overran) and self.kind == "process")
+
+    def stats(self):
+        with self._lock:
+            stuck = sum(1 for future in self._stuck if not future.done())
+            return dict(self._stats, kind=self.kind, max_workers=self.max_workers, timeout=self.timeout,
+                        stuck_workers=stuck)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _acquire_pool(self):
+        """The current pool, counted as in use by one more batch until ``_release_pool``"""
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    # spawn: forking a process that already loaded TensorFlow is not safe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="forecast")
+                logger.info(f"🧵 Forecast executor started ({self.kind}, {self.max_workers} workers)")
+            self._users[self._pool] = self._users.get(self._pool, 0) + 1
+            return self._pool
+
+    def _release_pool(self, pool, retire=False):
+        """
+        End one batch's use of ``pool``
+
+        Args:
+            retire: A forecast overran in this pool. New batches get a fresh pool, and the old
+                one's worker processes are terminated once the last batch using it has returned.
+        """
+        with self._lock:
+            users = self._users.pop(pool) - 1
+            if retire:
+                self._retired.add(pool)
+                if self._pool is pool:
+                    self._pool = None
+            if users:
+                self._users[pool] = users
+                return
+            if pool not in self._retired:
+                return
+            self._retired.discard(pool)
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _stuck_count(self):
+        """Timed-out thread forecasts still running (finished ones are forgotten)"""
+        with self._lock:
+            self._stuck = {future for future in self._stuck if not future.done()}
+            return len(self._stuck)
+
+    def _reset_pool(self, cancel_futures=True):
+        """
+        Drop the current pool; the next batch starts a new one
+
+        Args:
+            cancel_futures: Cancel work queued on the old pool (False lets other callers' queued work finish)
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=cancel_futures)
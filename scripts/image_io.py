@@ -0,0 +1,99 @@
+"""
+In-Memory Image Decoding
+Decodes uploads from raw bytes or buffers so inference never round-trips through disk
+"""
+
+import io
+import os
+
+import numpy as np
+
+EXIF_ORIENTATION = 0x0112
+
+
+def read_image_bytes(source):
+    """
+    Return the encoded image bytes for any supported source
+
+    Args:
+        source: File path, raw bytes/bytearray/memoryview, or a binary file-like object
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        image_path = os.path.normpath(source)
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Image file not found -> {image_path}")
+        with open(image_path, "rb") as f:
+            return f.read()
+    if hasattr(source, "read"):
+        return source.read()
+    raise TypeError(f"Unsupported image source: {type(source).__name__}")
+
+
+def describe_source(source):
+    """Short description of an image source for error messages"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.normpath(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)} bytes>"
+    return f"<{type(source).__name__}>"
+
+
+def decode_rgb(source, min_size=None):
+    """
+    Decode an image into an RGB uint8 array
+
+    Args:
+        source: File path, raw bytes, or a binary file-like object
+        min_size: Optional (width, height) the caller will resize to. JPEGs are then
+            decoded at the smallest DCT scale (1/2, 1/4, 1/8) that still covers it,
+            which avoids materialising full-resolution phone photos. EXIF orientation
+            is applied either way, as OpenCV does.
+    """
+    import cv2
+
+    data = read_image_bytes(source)
+
+    if min_size is not None:
+        try:
+            img = open_image(data, min_size=min_size, exif_transpose=True)
+            if img.format == "JPEG":
+                return np.asarray(img.convert("RGB"))
+        except Exception:
+            # Let OpenCV have a go (and produce the usual error) below
+            pass
+
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Could not load image -> {describe_source(source)}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def open_image(source, min_size=None, exif_transpose=False):
+    """
+    Open an image as a PIL Image without touching disk for in-memory sources
+
+    Args:
+        source: File path, raw bytes, or a binary file-like object
+        min_size: Optional (width, height); JPEGs are set up to decode at the
+            smallest DCT scale whose dimensions are still at least this size
+        exif_transpose: Rotate/flip the image upright per its EXIF orientation
+            (``min_size`` is then the size after rotation)
+    """
+    from PIL import Image, ImageOps
+
+    data = read_image_bytes(source)
+    img = Image.open(io.BytesIO(data))
+    # Orientations 5-8 swap width and height
+    rotated = exif_transpose and img.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+    if min_size is not None and img.format == "JPEG":
+        # draft() only changes how the (still lazy) decoder will scale the DCT blocks
+        width, height = min_size
+        img.draft("RGB", (height, width) if rotated else (width, height))
+    if exif_transpose:
+        transposed = ImageOps.exif_transpose(img)
+        # exif_transpose returns a plain Image; keep the format callers check
+        transposed.format = img.format
+        img = transposed
+    return img
@@ -0,0 +1,114 @@
+"""
+API Import-Time Report
+Measures a cold `import main` with `python -X importtime` and shows where startup time goes
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cold-import budget for the API module
+DEFAULT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 2000))
+
+# Dependencies that must only load when an endpoint first needs them
+HEAVY_MODULES = ("tensorflow", "keras", "cv2", "matplotlib", "pandas", "joblib", "xgboost", "sklearn")
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into records
+
+    Returns:
+        List of dicts with name, depth, self_ms and cumulative_ms, in import order
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header row
+        raw_name = fields[2].rstrip()
+        name = raw_name.lstrip()
+        records.append({
+            "name": name,
+            "depth": (len(raw_name) - len(name) - 1) // 2,
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+        })
+    return records
+
+
+def measure_import(module="main", cwd=REPO_ROOT):
+    """Import ``module`` in a fresh interpreter and return the parsed importtime records"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def build_report(records, module="main", top=15):
+    """Total time for ``module``, heavy dependencies pulled in, and the slowest top-level imports"""
+    total = next((r["cumulative_ms"] for r in reversed(records) if r["name"] == module), None)
+    loaded = {r["name"].split(".")[0] for r in records}
+    roots = [r for r in records if r["depth"] == 0 and r["name"] != module]
+    # Direct dependencies of the measured module are nested one level below it
+    direct = [r for r in records if r["depth"] == 1] if total is not None else []
+    return {
+        "module": module,
+        "total_ms": round(total, 1) if total is not None else None,
+        "heavy_modules": sorted(m for m in HEAVY_MODULES if m in loaded),
+        "slowest": [
+            {"name": r["name"], "cumulative_ms": round(r["cumulative_ms"], 1)}
+            for r in sorted(roots + direct, key=lambda r: r["cumulative_ms"], reverse=True)[:top]
+        ],
+    }
+
+
+def run_report(module="main", runs=3, top=15):
+    """Measure ``runs`` cold imports and report the median one"""
+    reports = [build_report(measure_import(module), module, top) for _ in range(max(1, runs))]
+    reports.sort(key=lambda r: r["total_ms"] or 0)
+    report = reports[len(reports) // 2]
+    report["runs_ms"] = [r["total_ms"] for r in reports]
+    report["median_ms"] = round(statistics.median(r["total_ms"] or 0 for r in reports), 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import-time report for the AgriSync API")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Fail when the median import time exceeds this")
+    args = parser.parse_args()
+
+    report = run_report(args.module, args.runs, args.top)
+
+    print(f"⏱️  import {report['module']}: {report['median_ms']:.1f} ms median "
+          f"(runs: {', '.join(f'{t:.1f}' for t in report['runs_ms'])})")
+    print("🐢 Slowest imports:")
+    for entry in report["slowest"]:
+        print(f"   {entry['cumulative_ms']:8.1f} ms  {entry['name']}")
+    if report["heavy_modules"]:
+        print(f"⚠️ Heavy dependencies imported at startup: {', '.join(report['heavy_modules'])}")
+    else:
+        print("✅ No heavy dependencies imported at startup")
+
+    if report["median_ms"] > args.budget_ms:
+        print(f"❌ Over budget: {report['median_ms']:.1f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"✅ Within budget ({args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Pluggable Inference Backends
+Serves image classifiers from full Keras models or TensorFlow Lite artifacts behind one predict() API
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+import numpy as np
+
+from prediction_cache import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# "keras" (default) or "tflite"
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "keras").strip().lower()
+TFLITE_NUM_THREADS = int(os.environ.get("TFLITE_NUM_THREADS", 1))
+# Full-integer artifact and its accept/reject report, written by ModelCompatibilityOptimizer.quantize_int8
+INT8_SUFFIX = "_int8.tflite"
+INT8_REPORT_SUFFIX = "_int8_report.json"
+
+
+def _tflite_interpreter_class():
+    """Prefer a standalone LiteRT / tflite-runtime wheel, fall back to the one bundled with TensorFlow"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class KerasBackend:
+    """Full Keras model loaded with tf.keras"""
+
+    name = "keras"
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+
+        self.model_path = model_path
+        self.model = tf.keras.models.load_model(model_path)
+        self.version = model_fingerprint(model_path)
+
+    @property
+    def input_shape(self):
+        return self.model.input_shape
+
+    @property
+    def output_shape(self):
+        return self.model.output_shape
+
+    def predict(self, batch, verbose=0):
+        return self.model.predict(batch, verbose=verbose)
+
+
+class TFLiteBackend:
+    """
+    TensorFlow Lite model served through ``Interpreter``. An interpreter is not thread-safe
+    and reallocates its tensors whenever its input shape changes, so idle interpreters are
+    pooled per batch size: each call borrows one already sized for its batch (building it
+    the first time) and hands it back afterwards. Interpreters prepared by ``warm_up`` on
+    the loader thread are therefore the ones serving threads go on to use.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=TFLITE_NUM_THREADS):
+        self.model_path = model_path
+        self.num_threads = max(1, int(num_threads))
+        with open(model_path, "rb") as f:
+            self._model_content = f.read()
+        self._interpreter_class = _tflite_interpreter_class()
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.interpreters_built = 0
+        self.version = model_fingerprint(model_path)
+
+        # Build one interpreter eagerly so a broken artifact fails at load time
+        interpreter = self._build(None)
+        self._input = interpreter.get_input_details()[0]
+        self._output = interpreter.get_output_details()[0]
+        self._release(int(self._input["shape"][0]), interpreter)
+
+    @property
+    def input_shape(self):
+        return (None, *(int(d) for d in self._input["shape"][1:]))
+
+    @property
+    def output_shape(self):
+        return (None, *(int(d) for d in self._output["shape"][1:]))
+
+    def predict(self, batch, verbose=0):
+        batch = np.asarray(batch)
+        interpreter = self._acquire(len(batch))
+        try:
+            interpreter.set_tensor(self._input["index"], self._quantize(batch))
+            interpreter.invoke()
+            return self._dequantize(interpreter.get_tensor(self._output["index"]))
+        finally:
+            self._release(len(batch), interpreter)
+
+    def _acquire(self, batch_size):
+        with self._lock:
+            idle = self._idle.get(batch_size)
+            if idle:
+                return idle.pop()
+        return self._build(batch_size)
+
+    def _release(self, batch_size, interpreter):
+        with self._lock:
+            self._idle.setdefault(batch_size, []).append(interpreter)
+
+    def _build(self, batch_size):
+        """A new interpreter with tensors allocated for ``batch_size`` rows (the model's own shape if None)"""
+        interpreter = self._interpreter_class(model_content=self._model_content, num_threads=self.num_threads)
+        details = interpreter.get_input_details()[0]
+        if batch_size is not None and int(details["shape"][0]) != batch_size:
+            interpreter.resize_tensor_input(details["index"], (batch_size, *details["shape"][1:]))
+        interpreter.allocate_tensors()
+        with self._lock:
+            self.interpreters_built += 1
+        return interpreter
+
+    def _quantize(self, batch):
+        dtype = self._input["dtype"]
+        if np.issubdtype(dtype, np.integer):
+            scale, zero_point = self._input["quantization"]
+            if scale:
+                batch = np.round(batch / scale + zero_point)
+            info = np.iinfo(dtype)
+            return np.clip(batch, info.min, info.max).astype(dtype)
+        return batch.astype(dtype, copy=False)
+
+    def _dequantize(self, output):
+        if np.issubdtype(output.dtype, np.integer):
+            scale, zero_point = self._output["quantization"]
+            if scale:
+                return (output.astype(np.float32) - zero_point) * scale
+        return np.array(output, copy=True)
+
+
+def tflite_path_for(model_path):
+    """
+    TFLite artifact that sits next to a Keras model (same stem): ``<stem>_int8.tflite`` when
+    its quantization report accepted it, otherwise the float ``<stem>.tflite``
+    """
+    stem = os.path.splitext(model_path)[0]
+    int8_path = stem + INT8_SUFFIX
+    try:
+        with open(stem + INT8_REPORT_SUFFIX, "r") as f:
+            accepted = json.load(f).get("accepted") is True
+    except (OSError, ValueError):
+        accepted = False
+    if accepted and os.path.exists(int8_path):
+        return int8_path
+    return stem + ".tflite"
+
+
+def load_backend(model_path, backend=None):
+    """
+    Load a classifier with the configured backend
+
+    Args:
+        model_path: Path to the Keras model; the TFLite backend looks for the
+            ``.tflite`` file with the same stem next to it (see tflite_path_for)
+        backend: "keras" or "tflite"; defaults to INFERENCE_BACKEND
+    """
+    backend = (backend or INFERENCE_BACKEND).lower()
+
+    if backend == "tflite":
+        tflite_path = tflite_path_for(model_path)
+        if os.path.exists(tflite_path):
+            logger.info(f"Loading TFLite model from: {tflite_path} ({TFLITE_NUM_THREADS} thread(s))")
+            return TFLiteBackend(tflite_path)
+        logger.warning(f"⚠️ No TFLite artifact at {tflite_path}, using the Keras model")
+    elif backend != "keras":
+        raise ValueError(f"Unknown inference backend: {backend!r}")
+
+    return KerasBackend(model_path)
+
+
+def warm_up(backend, batch_sizes=(1,)):
+    """
+    Run zero-filled batches of every size the serving path will use, so graph tracing
+    and kernel initialisation happen before the first real request
+
+    Returns:
+        Warm-up duration in seconds
+    """
+    input_shape = tuple(backend.input_shape[1:])
+    started = time.perf_counter()
+    for batch_size in sorted(set(batch_sizes)):
+        backend.predict(np.zeros((batch_size, *input_shape), dtype=np.float32), verbose=0)
+    return time.perf_counter() - started
@@ -0,0 +1,177 @@
+"""
+Dynamic Micro-Batching for Model Inference
+Coalesces concurrent single-image requests into one batched forward pass
+"""
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Batching limits (overridable per deployment)
+DEFAULT_MAX_BATCH_SIZE = int(os.environ.get("INFERENCE_MAX_BATCH_SIZE", 8))
+DEFAULT_MAX_WAIT_MS = float(os.environ.get("INFERENCE_MAX_WAIT_MS", 10))
+
+
+class MicroBatcher:
+    """
+    Collects samples submitted from any thread or coroutine and runs them through
+    ``predict_fn`` in batches of up to ``max_batch_size``, waiting at most
+    ``max_wait_ms`` after the first queued sample before dispatching.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, name="model"):
+        """
+        Args:
+            predict_fn: Callable taking a (N, ...) array and returning N predictions
+            max_batch_size: Largest batch handed to ``predict_fn``
+            max_wait_ms: Longest time a sample waits for others to join its batch
+            name: Model name used in logs and statistics
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._closed = False
+
+        self._batches = 0
+        self._samples = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._total_inference = 0.0
+        self._batch_sizes = {}
+
+    def submit(self, sample):
+        """Queue a single sample and return a ``concurrent.futures.Future`` for its prediction"""
+        if self._closed:
+            raise RuntimeError(f"Batcher '{self.name}' is closed")
+
+        sample = np.asarray(sample)
+        # Accept samples that still carry a leading batch axis of one
+        if sample.ndim >= 2 and sample.shape[0] == 1:
+            sample = sample[0]
+
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((sample, future, time.perf_counter()))
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+        return future
+
+    def predict(self, sample, timeout=None):
+        """Blocking prediction for callers running outside the event loop"""
+        return self.submit(sample).result(timeout=timeout)
+
+    async def predict_async(self, sample):
+        """Awaitable prediction that does not block the event loop"""
+        return await asyncio.wrap_future(self.submit(sample))
+
+    def stats(self):
+        """Queue depth and batch-size statistics"""
+        with self._lock:
+            batches = self._batches
+            samples = self._samples
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "samples": samples,
+                "errors": self._errors,
+                "avg_batch_size": round(samples / batches, 3) if batches else 0.0,
+                "avg_queue_wait_ms": round(self._total_wait / samples * 1000.0, 3) if samples else 0.0,
+                "avg_batch_inference_ms": round(self._total_inference / batches * 1000.0, 3) if batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def close(self, timeout=5.0):
+        """Stop the worker thread once queued samples are drained"""
+        self._closed = True
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=timeout)
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name=f"batcher-{self.name}", daemon=True
+                    )
+                    self._worker.start()
+                    logger.info(
+                        f"🚚 Micro-batcher '{self.name}' started "
+                        f"(max batch {self.max_batch_size}, max wait {self.max_wait * 1000:.1f} ms)"
+                    )
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch):
+        started = time.perf_counter()
+        size = len(batch)
+        try:
+            inputs = np.stack([sample for sample, _, _ in batch])
+            predictions = self.predict_fn(inputs)
+            if len(predictions) != size:
+                raise ValueError(f"Model returned {len(predictions)} predictions for a batch of {size}")
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result(predictions[i])
+            failed = False
+        except Exception as e:
+            logger.error(f"❌ Batched inference failed for '{self.name}' (batch of {size}): {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            failed = True
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._batches += 1
+            self._samples += size
+            self._errors += size if failed else 0
+            self._total_inference += elapsed
+            self._total_wait += sum(started - queued_at for _, _, queued_at in batch)
+            self._batch_sizes[size] = self._batch_sizes.get(size, 0) + 1
@@ -0,0 +1,121 @@
+"""
+Bounded Inference Executor
+Runs blocking decode/inference work on a dedicated thread pool so the event loop stays responsive
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Pool size and per-model limits, e.g. INFERENCE_MODEL_LIMITS="soil=1,plantdoc=4"
+DEFAULT_MAX_WORKERS = int(os.environ.get("INFERENCE_MAX_WORKERS", min(4, os.cpu_count() or 1)))
+DEFAULT_MODEL_LIMIT = int(os.environ.get("INFERENCE_DEFAULT_MODEL_LIMIT", 2))
+
+
+def parse_model_limits(spec):
+    """Parse "name=limit,name=limit" into a dict"""
+    limits = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid model limit: {part!r}")
+    return limits
+
+
+class InferenceExecutor:
+    """
+    Thread pool with a concurrency cap per model name. Callers ``await run(name, fn, ...)``;
+    requests beyond a model's cap wait as cheap coroutines instead of occupying pool threads.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, model_limits=None,
+                 default_limit=DEFAULT_MODEL_LIMIT):
+        self.max_workers = max(1, int(max_workers))
+        self.default_limit = max(1, int(default_limit))
+        self.model_limits = dict(model_limits or {})
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def limit_for(self, name):
+        return self.model_limits.get(name, self.default_limit)
+
+    async def run(self, name, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the pool, respecting the per-model limit"""
+        semaphore = self._semaphore(name)
+        stats = self._model_stats(name)
+
+        stats["waiting"] += 1
+        async with semaphore:
+            stats["waiting"] -= 1
+            stats["active"] += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, lambda: fn(*args, **kwargs))
+            except Exception:
+                stats["failed"] += 1
+                raise
+            finally:
+                stats["active"] -= 1
+                stats["completed"] += 1
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit work from synchronous code (no per-model limit)"""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "models": {
+                    name: dict(values, limit=self.limit_for(name))
+                    for name, values in self._stats.items()
+                },
+            }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+    def _semaphore(self, name):
+        # Semaphores are bound to the running loop, so they are created lazily inside it
+        with self._lock:
+            semaphore = self._semaphores.get(name)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.limit_for(name))
+                self._semaphores[name] = semaphore
+            return semaphore
+
+    def _model_stats(self, name):
+        with self._lock:
+            if name not in self._stats:
+                self._stats[name] = {"active": 0, "waiting": 0, "completed": 0, "failed": 0}
+            return self._stats[name]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide inference executor"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = InferenceExecutor(
+                    model_limits=parse_model_limits(os.environ.get("INFERENCE_MODEL_LIMITS", "soil=1"))
+                )
+                logger.info(
+                    f"🧵 Inference executor started with {_executor.max_workers} workers "
+                    f"(limits: {_executor.model_limits or 'default'})"
+                )
+    return _executor
@@ -0,0 +1,312 @@
+"""
+Streaming Price Export Ingestion
+Reads Agmarknet-style CSV exports of any size in fixed-size chunks, parses dates with one format detected up front,
+drops duplicate (state, market, variety, date) reports and routes rows into per-commodity partitions
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import market_slug
+from preprocess_data import DATE_FORMATS
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_CHUNK_ROWS = int(os.environ.get("INGEST_CHUNK_ROWS", 100_000))
+DEFAULT_OUTPUT_DIR = os.environ.get("INGEST_OUTPUT_DIR", os.path.join(REPO_ROOT, "data", "ingested"))
+# Share of rows with unparseable dates that stops a run: a wrong format shows up as a burst of them
+DEFAULT_MAX_BAD_DATE_RATE = float(os.environ.get("INGEST_MAX_BAD_DATE_RATE", 0.05))
+# Distinct date strings looked at to pick the export's date format
+DATE_SAMPLE_ROWS = 1000
+MANIFEST_NAME = "ingest.json"
+PARTITION_FILE = "data.csv"
+
+DATE_COLUMN = "Reported Date"
+COMMODITY_COLUMN = "Commodity"
+# Output columns, in the layout of data/*.csv (columns an export doesn't have are left out)
+COLUMNS = ["State Name", "District Name", "Market Name", "Variety", "Group", "Arrivals (Tonnes)",
+           "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)", "Modal Price (Rs./Quintal)", DATE_COLUMN]
+TEXT_COLUMNS = ["State Name", "District Name", "Market Name", "Variety", "Group"]
+NUMERIC_COLUMNS = ["Arrivals (Tonnes)", "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)", "Modal Price (Rs./Quintal)"]
+DEDUP_COLUMNS = ["State Name", "Market Name", "Variety", DATE_COLUMN]
+
+# data.gov.in / Agmarknet API column names
+COLUMN_ALIASES = {
+    "State": "State Name",
+    "District": "District Name",
+    "Market": "Market Name",
+    "Commodity_Group": "Group",
+    "Arrival_Date": DATE_COLUMN,
+    "Arrivals": "Arrivals (Tonnes)",
+    "Min_x0020_Price": "Min Price (Rs./Quintal)",
+    "Max_x0020_Price": "Max Price (Rs./Quintal)",
+    "Modal_x0020_Price": "Modal Price (Rs./Quintal)",
+}
+
+# Formats tried on the sample, in order of preference when several parse all of it to the same dates
+CANDIDATE_DATE_FORMATS = DATE_FORMATS + ["%d/%m/%Y", "%d-%b-%Y", "%Y/%m/%d"]
+# Header of the data.gov.in / Agmarknet API date column, always day-first
+DAYFIRST_COLUMNS = {"Arrival_Date"}
+
+
+class AmbiguousDateFormat(ValueError):
+    """Several formats read the whole sample, to different dates (01/03/2025: 1 March or 3 January)"""
+
+
+def detect_date_format(values, formats=CANDIDATE_DATE_FORMATS, dayfirst=None):
+    """
+    The format that parses the most of ``values``, or None if none parses any
+
+    Formats that parse as many values to the same dates are equivalent and the first listed wins.
+    When they disagree (no day above 12 in the sample) the day-first one is picked if ``dayfirst``,
+    otherwise AmbiguousDateFormat is raised.
+    """
+    values = pd.Series(values).dropna().astype(str).str.strip().str.replace('"', '')
+    values = values[values != ""]
+    best, best_count, best_dates, ambiguous = None, 0, None, []
+    for fmt in formats:
+        dates = pd.to_datetime(values, format=fmt, errors="coerce")
+        count = int(dates.notna().sum())
+        if count > best_count:
+            best, best_count, best_dates, ambiguous = fmt, count, dates, []
+        elif count and count == best_count and not dates.equals(best_dates):
+            ambiguous.append(fmt)
+    if not ambiguous:
+        return best
+    candidates = [best] + ambiguous
+    if dayfirst:
+        for fmt in candidates:
+            if "%d" in fmt and "%m" in fmt and fmt.index("%d") < fmt.index("%m"):
+                return fmt
+    raise AmbiguousDateFormat(f"Dates fit {' and '.join(candidates)} equally; pass the format explicitly")
+
+
+class KeySet:
+    """
+    Set of 64-bit row hashes kept as a few sorted arrays (8 bytes per key). Arrays are
+    merged when a newer one grows to half the size of the one before it, so adding N keys
+    costs O(N log N) and a lookup is one binary search per array.
+    """
+
+    def __init__(self):
+        self._levels = []
+
+    def __len__(self):
+        return sum(len(level) for level in self._levels)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self._levels)
+
+    def add_new(self, keys):
+        """Add ``keys``; returns a mask of the ones that were not already present (first occurrence only)"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        _, first = np.unique(keys, return_index=True)
+        new = np.zeros(len(keys), dtype=bool)
+        new[first] = True
+        for level in self._levels:
+            candidates = keys[new]
+            positions = np.minimum(np.searchsorted(level, candidates), len(level) - 1)
+            new[np.flatnonzero(new)[level[positions] == candidates]] = False
+        if new.any():
+            self._levels.append(np.sort(keys[new]))
+            while len(self._levels) > 1 and len(self._levels[-1]) * 2 >= len(self._levels[-2]):
+                newest = self._levels.pop()
+                self._levels[-1] = np.sort(np.concatenate([self._levels[-1], newest]), kind="mergesort")
+        return new
+
+
+def _canonical(name):
+    return COLUMN_ALIASES.get(str(name).strip(), str(name).strip())
+
+
+def _per_unique(series, fn):
+    """``fn`` applied to each distinct value once: market names and dates repeat on most rows"""
+    codes, uniques = pd.factorize(series)
+    mapped = np.asarray(fn(pd.Series(uniques, dtype=object)))
+    result = mapped[np.maximum(codes, 0)]
+    if (codes < 0).any():
+        result = pd.Series(result, index=series.index).where(codes >= 0)
+    return pd.Series(result, index=series.index)
+
+
+def _parse_dates(raw_dates, date_format):
+    """(dates, rows only the fallback parser could read)"""
+    dates = pd.to_datetime(raw_dates, format=date_format, errors="coerce")
+    failed = dates.isna() & raw_dates.notna() & raw_dates.ne("")
+    if failed.any():
+        # Exports occasionally mix formats; only the values the detected one missed are re-parsed,
+        # each with the first of the usual formats that reads it
+        for fmt in DATE_FORMATS:
+            missing = failed & dates.isna()
+            if not missing.any():
+                break
+            dates[missing] = pd.to_datetime(raw_dates[missing], format=fmt, errors="coerce")
+    return dates, failed & dates.notna()
+
+
+def _normalize_chunk(chunk, date_format):
+    """Canonical columns, stripped text, numbers and parsed dates; returns (chunk, fallback dates, bad dates)"""
+    chunk = chunk.rename(columns=_canonical)
+    for column in TEXT_COLUMNS + [COMMODITY_COLUMN]:
+        if column in chunk.columns:
+            chunk[column] = _per_unique(chunk[column].fillna(""), lambda values: values.astype(str).str.strip())
+    for column in NUMERIC_COLUMNS:
+        if column in chunk.columns and not pd.api.types.is_numeric_dtype(chunk[column]):
+            # A stray "NR" or blank made the parser keep strings
+            chunk[column] = pd.to_numeric(chunk[column].astype(str).str.strip(), errors="coerce")
+
+    fallback = [0]
+
+    def parse(values):
+        values = values.astype(str).str.strip().str.replace('"', '')
+        dates, failed = _parse_dates(values, date_format)
+        fallback[0] += int(failed.sum())
+        return dates.to_numpy(dtype="datetime64[ns]")
+
+    chunk[DATE_COLUMN] = pd.to_datetime(_per_unique(chunk[DATE_COLUMN], parse))
+    bad = int(chunk[DATE_COLUMN].isna().sum())
+    return chunk.dropna(subset=[DATE_COLUMN]), fallback[0], bad
+
+
+def _row_keys(rows):
+    return pd.util.hash_pandas_object(rows[[c for c in DEDUP_COLUMNS if c in rows.columns]], index=False).to_numpy()
+
+
+def ingest(paths, output_dir=DEFAULT_OUTPUT_DIR, commodity=None, chunk_rows=DEFAULT_CHUNK_ROWS, date_format=None,
+           max_bad_date_rate=DEFAULT_MAX_BAD_DATE_RATE):
+    """
+    Stream one or more exports into ``<output_dir>/commodity=<slug>/data.csv``
+
+    Memory is one chunk plus 8 bytes per distinct (commodity, state, market, variety, date),
+    whatever the size of the input. The first report of a key wins. Partitions written by
+    this call are replaced, not appended to.
+
+    Args:
+        paths: Export CSV paths
+        commodity: Commodity for exports without a "Commodity" column (the bundled data/*.csv)
+        chunk_rows: Rows parsed per chunk
+        date_format: strptime format of the date column; detected from the first chunk if None.
+            Day-first is assumed for an ambiguous Arrival_Date column; other ambiguous columns raise
+            AmbiguousDateFormat
+        max_bad_date_rate: Raise ValueError once more than this share of the rows read (after the
+            first DATE_SAMPLE_ROWS) has an unparseable date
+
+    Returns:
+        Manifest (also written to ingest.json): run totals, the date format and
+        ``partitions``: commodity slug -> {path relative to output_dir, rows}. fallback_date_values
+        counts distinct date strings only the per-row fallback parser could read
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    os.makedirs(output_dir, exist_ok=True)
+    seen, partitions = {}, {}
+    totals = {"rows_read": 0, "rows_written": 0, "duplicates": 0, "bad_dates": 0, "fallback_date_values": 0}
+
+    for path in paths:
+        # Text and dates stay strings; numbers are parsed by the C reader
+        header = pd.read_csv(path, nrows=0, skipinitialspace=True).columns
+        dayfirst = any(str(name).strip() in DAYFIRST_COLUMNS for name in header)
+        text = {name: str for name in header if _canonical(name) not in NUMERIC_COLUMNS}
+        reader = pd.read_csv(path, chunksize=chunk_rows, skipinitialspace=True, dtype=text)
+        for chunk in reader:
+            totals["rows_read"] += len(chunk)
+            if date_format is None:
+                # Distinct values: a day of reports from hundreds of markets shares one date string
+                sample = chunk.rename(columns=_canonical)[DATE_COLUMN].dropna().unique()
+                date_format = detect_date_format(sample[:DATE_SAMPLE_ROWS], dayfirst=dayfirst)
+                if date_format is None:
+                    raise ValueError(f"No known date format matches {path}")
+                print(f"📅 Date format: {date_format}")
+            chunk, fallback, bad = _normalize_chunk(chunk, date_format)
+            totals["fallback_date_values"] += fallback
+            totals["bad_dates"] += bad
+            too_many_bad = totals["bad_dates"] > max_bad_date_rate * totals["rows_read"]
+            if too_many_bad and totals["rows_read"] >= DATE_SAMPLE_ROWS:
+                raise ValueError(f"{totals['bad_dates']} of {totals['rows_read']} dates don't parse as {date_format}; "
+                                 f"pass the export's format explicitly (--date-format)")
+
+            if COMMODITY_COLUMN in chunk.columns:
+                groups = chunk.groupby(COMMODITY_COLUMN, sort=False)
+            elif commodity is not None:
+                groups = [(commodity, chunk)]
+            else:
+                raise ValueError(f"{path} has no {COMMODITY_COLUMN} column; pass commodity=")
+
+            for name, rows in groups:
+                slug = market_slug(name)
+                new = seen.setdefault(slug, KeySet()).add_new(_row_keys(rows))
+                totals["duplicates"] += int((~new).sum())
+                rows = rows[new]
+                if rows.empty:
+                    continue
+                partition = partitions.get(slug)
+                if partition is None:
+                    directory = os.path.join(output_dir, f"commodity={slug}")
+                    os.makedirs(directory, exist_ok=True)
+                    partition = partitions[slug] = {
+                        "path": os.path.join(directory, PARTITION_FILE),
+                        "columns": [c for c in COLUMNS if c in rows.columns],
+                        "rows": 0,
+                    }
+                rows[partition["columns"]].to_csv(partition["path"], mode="a" if partition["rows"] else "w",
+                                                  header=not partition["rows"], index=False, date_format="%Y-%m-%d")
+                partition["rows"] += len(rows)
+                totals["rows_written"] += len(rows)
+
+    manifest = dict(totals, date_format=date_format, partitions={
+        slug: {"path": os.path.relpath(p["path"], output_dir), "rows": p["rows"]} for slug, p in partitions.items()
+    }, dedup_key_bytes=sum(keys.nbytes for keys in seen.values()))
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    if totals["bad_dates"] > max_bad_date_rate * totals["rows_read"]:
+        print(f"⚠️ {totals['bad_dates']} of {totals['rows_read']} rows dropped for dates that don't parse as {date_format}")
+    return manifest
+
+
+def ingested_paths(output_dir=DEFAULT_OUTPUT_DIR):
+    """commodity -> partition CSV from the last ingest, in the form market_partitions.build_from_raw takes"""
+    with open(os.path.join(output_dir, MANIFEST_NAME), "r") as f:
+        manifest = json.load(f)
+    return {slug: os.path.join(output_dir, p["path"]) for slug, p in manifest["partitions"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream large price exports into per-commodity partitions")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--commodity", help="Commodity of exports without a Commodity column")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--date-format", help="Skip detection and parse dates with this strptime format")
+    parser.add_argument("--max-bad-date-rate", type=float, default=DEFAULT_MAX_BAD_DATE_RATE,
+                        help="Stop when more than this share of rows has unparseable dates")
+    parser.add_argument("--partition-markets", action="store_true",
+                        help="Also split the result by state and market (market_partitions.py)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = ingest(args.paths, args.output_dir, args.commodity, args.chunk_rows, args.date_format,
+                      args.max_bad_date_rate)
+    elapsed = time.perf_counter() - started
+    for slug, partition in sorted(manifest["partitions"].items()):
+        print(f"   📄 {slug}: {partition['rows']} rows")
+    print(f"✅ {manifest['rows_written']} of {manifest['rows_read']} rows ingested in {elapsed:.1f}s "
+          f"({manifest['rows_read'] / max(elapsed, 1e-9):,.0f} rows/s), {manifest['duplicates']} duplicates, "
+          f"{manifest['bad_dates']} unparseable dates")
+
+    if args.partition_markets:
+        from market_partitions import build_from_raw
+        catalog, written = build_from_raw(ingested_paths(args.output_dir))
+        print(f"✅ {len(written)} market partitions written ({len(catalog)} total)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Partitioned Market Price Store
+Splits raw Agmarknet-style exports into one processed series per commodity/state/market under
+market_data/commodity=<c>/state=<s>/market=<m>/, with a catalog of row counts and data hashes
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import market_store
+from model_registry import market_key, market_slug
+from preprocess_data import MODAL_PRICE, add_features, fill_missing, file_paths, parse_dates
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_ROOT = os.environ.get("MARKET_PARTITIONS_DIR", os.path.join(REPO_ROOT, "market_data"))
+CATALOG_NAME = "catalog.json"
+PARTITION_FILE = "data.csv"
+
+STATE_COLUMN = "State Name"
+MARKET_COLUMN = "Market Name"
+TEXT_COLUMNS = ["State Name", "District Name", "Market Name", "Variety", "Group"]
+
+
+def partition_dir(root, commodity, state, market):
+    """Hive-style directory of one partition"""
+    return os.path.join(root, f"commodity={market_slug(commodity)}", f"state={market_slug(state)}",
+                        f"market={market_slug(market)}")
+
+
+def partition_hash(rows):
+    """Content hash of a partition's raw rows (row order included), independent of the file they came from"""
+    row_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    return hashlib.sha1(np.ascontiguousarray(row_hashes).tobytes()).hexdigest()
+
+
+def normalize_raw(data):
+    """Strip the padding exports put around text fields (" Pune") and parse dates"""
+    data = data.copy()
+    for column in TEXT_COLUMNS:
+        if column in data.columns:
+            data[column] = data[column].astype(str).str.strip()
+    data["Reported Date"] = parse_dates(data["Reported Date"])
+    return data.dropna(subset=["Reported Date"])
+
+
+def _display_name(names):
+    """The spelling most rows use ("Pune" over "PUNE"), alphabetically first on ties"""
+    counts = names.value_counts()
+    return min(counts.index[counts == counts.max()])
+
+
+def split_partitions(data):
+    """
+    (state, market, rows) per market, rows in date order
+
+    Markets are grouped by their slugs, the way partitions and model keys are named, so
+    spellings that differ only in case or punctuation ("Lasalgaon(Niphad)", "Lasalgaon Niphad")
+    are one market; its rows all carry the most common spelling.
+    """
+    slugs = [data[STATE_COLUMN].map(market_slug), data[MARKET_COLUMN].map(market_slug)]
+    for _, rows in data.groupby(slugs, sort=True):
+        state, market = _display_name(rows[STATE_COLUMN]), _display_name(rows[MARKET_COLUMN])
+        rows = rows.assign(**{STATE_COLUMN: state, MARKET_COLUMN: market})
+        yield state, market, rows.sort_values("Reported Date", kind="stable")
+
+
+def load_catalog(root=DEFAULT_ROOT):
+    """Partition key -> entry (commodity, state, market, path relative to root, rows, data_hash, dates)"""
+    try:
+        with open(os.path.join(root, CATALOG_NAME), "r") as f:
+            return json.load(f)["partitions"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_catalog(catalog, root=DEFAULT_ROOT):
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, CATALOG_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"version": 1, "partitions": dict(sorted(catalog.items()))}, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def write_partitions(commodity, data, root=DEFAULT_ROOT, catalog=None):
+    """
+    Write every market of one commodity's raw rows as its own processed partition
+
+    Partitions whose raw rows hash the same as in the catalog are left untouched; the
+    commodity's partitions whose market no longer appears in ``data`` are deleted.
+
+    Returns:
+        (catalog, written keys)
+    """
+    catalog = load_catalog(root) if catalog is None else catalog
+    written, present = [], set()
+    for state, market, rows in split_partitions(normalize_raw(data)):
+        key = market_key(commodity, state, market)
+        present.add(key)
+        data_hash = partition_hash(rows)
+        directory = partition_dir(root, commodity, state, market)
+        csv_path = os.path.join(directory, PARTITION_FILE)
+        if catalog.get(key, {}).get("data_hash") == data_hash and os.path.exists(csv_path):
+            continue
+
+        features = add_features(rows.copy())
+        fill_missing(features)
+        os.makedirs(directory, exist_ok=True)
+        features.to_csv(csv_path, index=False)
+        market_store.write_dataset(features, csv_path)
+        catalog[key] = {
+            "commodity": market_slug(commodity),
+            "state": state,
+            "market": market,
+            "path": os.path.relpath(csv_path, root),
+            "rows": len(features),
+            "data_hash": data_hash,
+            "first_date": features["Reported Date"].min().strftime("%Y-%m-%d"),
+            "last_date": features["Reported Date"].max().strftime("%Y-%m-%d"),
+            "last_modal_price": float(features[MODAL_PRICE].iloc[-1]),
+        }
+        written.append(key)
+
+    for key in [key for key, entry in catalog.items() if entry["commodity"] == market_slug(commodity)]:
+        if key not in present:
+            shutil.rmtree(os.path.join(root, os.path.dirname(catalog.pop(key)["path"])), ignore_errors=True)
+    return catalog, written
+
+
+def build_from_raw(raw_paths=None, root=DEFAULT_ROOT):
+    """Partition every commodity's raw export; returns (catalog, written keys)"""
+    catalog = load_catalog(root)
+    written = []
+    for commodity, raw_path in (raw_paths or file_paths).items():
+        path = raw_path if os.path.isabs(raw_path) else os.path.join(REPO_ROOT, raw_path)
+        catalog, keys = write_partitions(commodity, pd.read_csv(path, skipinitialspace=True), root, catalog)
+        written += keys
+    save_catalog(catalog, root)
+    return catalog, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition raw price exports by commodity, state and market")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--crops", nargs="*", default=list(file_paths))
+    args = parser.parse_args()
+
+    catalog, written = build_from_raw({crop: file_paths[crop] for crop in args.crops}, args.root)
+    print(f"✅ {len(catalog)} partitions in {args.root} ({len(written)} written, "
+          f"{len(catalog) - len(written)} unchanged)")
+    for key in written:
+        print(f"   📄 {key}: {catalog[key]['rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
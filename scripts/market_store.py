@@ -0,0 +1,211 @@
+"""
+Columnar Market Data Store
+Typed Parquet (or Feather) copies of processed_data/*_processed.csv (datetime64 dates, categorical market names,
+narrower numbers where every value survives the round trip) that training and serving read with column projection
+instead of re-parsing the CSV
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+DATE_COLUMN = "Reported Date"
+# Low-cardinality text columns repeated on every row
+CATEGORICAL_COLUMNS = ["State Name", "District Name", "Market Name", "Variety", "Group"]
+
+# Feather (Arrow IPC) reads fastest; both need pyarrow, without which the CSV is read directly
+FORMAT_SUFFIXES = {"parquet": ".parquet", "feather": ".feather"}
+DEFAULT_FORMAT = os.environ.get("MARKET_STORE_FORMAT", "feather")
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def columnar_path(csv_path, fmt=DEFAULT_FORMAT):
+    """Columnar sibling of a processed CSV: ``<name>.parquet`` or ``<name>.feather``"""
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"Unknown market store format: {fmt!r}")
+    base = csv_path[:-4] if csv_path.endswith(".csv") else csv_path
+    return base + FORMAT_SUFFIXES[fmt]
+
+
+def _fits_float32(values):
+    """Every value (NaN included) comes back unchanged from float32"""
+    with np.errstate(over="ignore"):
+        narrowed = values.astype(np.float32).astype(np.float64)
+    return bool(np.array_equal(narrowed, values, equal_nan=True))
+
+
+def to_columnar(data):
+    """
+    Storage types for processed market data
+
+    Dates become datetime64, text columns categorical, integers int32 when they fit and
+    floats float32 only when that round-trips every value exactly, so the store reads back
+    the numbers the CSV holds.
+    """
+    data = data.copy()
+    for column in data.columns:
+        series = data[column]
+        if column == DATE_COLUMN:
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                data[column] = pd.to_datetime(series)
+        elif column in CATEGORICAL_COLUMNS or pd.api.types.is_object_dtype(series) or \
+                pd.api.types.is_string_dtype(series):
+            data[column] = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series):
+            info = np.iinfo(np.int32)
+            if len(series) == 0 or (series.min() >= info.min and series.max() <= info.max):
+                data[column] = series.astype(np.int32)
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            if _fits_float32(series.to_numpy(dtype=np.float64)):
+                data[column] = series.astype(np.float32)
+    return data
+
+
+def write_dataset(data, csv_path, fmt=DEFAULT_FORMAT):
+    """Write the columnar copy of ``data`` next to ``csv_path``; returns its path (None without pyarrow)"""
+    if not pyarrow_available():
+        return None
+    path = columnar_path(csv_path, fmt)
+    data = to_columnar(data)
+    tmp_path = path + ".tmp"
+    if fmt == "parquet":
+        data.to_parquet(tmp_path, index=False)
+    else:
+        data.reset_index(drop=True).to_feather(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def convert(csv_path, fmt=DEFAULT_FORMAT):
+    """Build the columnar copy of an existing processed CSV"""
+    return write_dataset(_read_csv(csv_path), csv_path, fmt)
+
+
+def _read_csv(csv_path, columns=None):
+    data = pd.read_csv(csv_path, usecols=columns)
+    if columns is not None:
+        data = data[columns]
+    if DATE_COLUMN in data.columns:
+        data[DATE_COLUMN] = pd.to_datetime(data[DATE_COLUMN])
+    return data
+
+
+def _is_current(path, csv_path):
+    """The columnar copy exists and was written after the CSV last changed"""
+    try:
+        return os.stat(path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def read_market_data(csv_path, columns=None, fmt=DEFAULT_FORMAT):
+    """
+    Processed market data with parsed dates, reading only ``columns``
+
+    Uses the columnar copy when it is at least as new as the CSV and otherwise falls
+    back to the CSV (typed the same way), so a stale or missing copy never serves old data.
+
+    Args:
+        csv_path: Processed CSV, as returned by ModelRegistry.data_path
+        columns: Columns to read (None reads all of them)
+    """
+    columns = list(columns) if columns is not None else None
+    path = columnar_path(csv_path, fmt)
+    if _is_current(path, csv_path) and pyarrow_available():
+        read = pd.read_parquet if fmt == "parquet" else pd.read_feather
+        data = read(path, columns=columns)
+        # Feather returns projected columns in file order
+        return data[columns] if columns is not None else data
+    return to_columnar(_read_csv(csv_path, columns))
+
+
+def _median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+
+def benchmark(csv_paths, columns=None, runs=20, fmt=DEFAULT_FORMAT):
+    """Load time (median ms) and in-memory size of the legacy CSV path against the columnar store"""
+    def legacy():
+        data = pd.read_csv(csv_path)
+        data[DATE_COLUMN] = pd.to_datetime(data[DATE_COLUMN])
+        return data
+
+    results = []
+    for csv_path in csv_paths:
+        path = convert(csv_path, fmt)
+        row = {
+            "dataset": os.path.basename(csv_path),
+            "format": fmt,
+            "csv_bytes": os.path.getsize(csv_path),
+            "columnar_bytes": os.path.getsize(path),
+            "csv_load_ms": _median_ms(legacy, runs),
+            "columnar_load_ms": _median_ms(lambda: read_market_data(csv_path, fmt=fmt), runs),
+            "csv_memory_bytes": int(legacy().memory_usage(deep=True).sum()),
+            "columnar_memory_bytes": int(read_market_data(csv_path, fmt=fmt).memory_usage(deep=True).sum()),
+        }
+        if columns:
+            row["projected_load_ms"] = _median_ms(lambda: read_market_data(csv_path, columns, fmt=fmt), runs)
+            row["projected_memory_bytes"] = int(read_market_data(csv_path, columns, fmt=fmt)
+                                                .memory_usage(deep=True).sum())
+        results.append(row)
+    return results
+
+
+def main():
+    import glob
+
+    default_dir = os.path.join(os.path.dirname(__file__), "..", "processed_data")
+    parser = argparse.ArgumentParser(description="Build and benchmark columnar copies of the processed market data")
+    parser.add_argument("--data-dir", default=default_dir)
+    parser.add_argument("--format", default=DEFAULT_FORMAT, choices=sorted(FORMAT_SUFFIXES))
+    parser.add_argument("--benchmark", action="store_true", help="Compare load time and memory against the CSV path")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print benchmark results as JSON")
+    args = parser.parse_args()
+
+    csv_paths = sorted(glob.glob(os.path.join(args.data_dir, "*_processed.csv")))
+    if not csv_paths:
+        print(f"❌ No processed CSVs in {args.data_dir}")
+        sys.exit(1)
+
+    if not pyarrow_available():
+        print("❌ pyarrow is not installed (pip install pyarrow)")
+        sys.exit(1)
+    if not args.benchmark:
+        for csv_path in csv_paths:
+            print(f"✅ {convert(csv_path, args.format)}")
+        return
+
+    # The columns forecast serving reads
+    serving_columns = [DATE_COLUMN, "Arrivals (Tonnes)", "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)",
+                       "Rolling_Modal_Price", "Lag_1_Month", "Lag_2_Months", "Price_Change_Rate"]
+    results = benchmark(csv_paths, serving_columns, args.runs, args.format)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'dataset':<24} {'format':>7} {'CSV ms':>8} {'store ms':>9} {'proj ms':>8} {'CSV KB':>8} {'store KB':>9}")
+    for row in results:
+        print(f"{row['dataset']:<24} {row['format']:>7} {row['csv_load_ms']:>8.2f} {row['columnar_load_ms']:>9.2f} "
+              f"{row['projected_load_ms']:>8.2f} {row['csv_memory_bytes'] / 1024:>8.1f} "
+              f"{row['columnar_memory_bytes'] / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
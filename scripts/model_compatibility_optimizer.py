@@ -5,25 +5,82 @@ Ensures models are saved in deployment-compatible formats and handles version co
 """
 
 import os
+import sys
 import json
+import time
+import queue
 import logging
+import tempfile
+import multiprocessing
+import numpy as np
 import tensorflow as tf
 from tensorflow import keras
 from datetime import datetime
 import warnings
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from inference_backends import INT8_REPORT_SUFFIX, INT8_SUFFIX
+
 warnings.filterwarnings('ignore')
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Default places to draw representative (calibration) images from
+DEFAULT_CALIBRATION_DIRS = ["PlantDoc-Dataset/train", "Soil/Train", "uploaded_images"]
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Largest tolerated top-1 accuracy drop (fraction) for accepting an int8 model
+DEFAULT_ACCURACY_DROP_BUDGET = float(os.environ.get("QUANTIZATION_ACCURACY_BUDGET", 0.01))
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def _benchmark_worker(kind, model_path, samples_path, runs, result_queue):
+    """Run in a fresh process so latency and peak RSS belong to this model alone"""
+    try:
+        from inference_backends import KerasBackend, TFLiteBackend
+
+        # RSS after imports, so the report can separate model memory from the runtime itself
+        baseline_rss_mb = _peak_rss_mb()
+        samples = np.load(samples_path)
+        backend = KerasBackend(model_path) if kind == "keras" else TFLiteBackend(model_path)
+
+        predictions = []
+        for sample in samples:
+            predictions.append(int(np.argmax(backend.predict(sample[None])[0])))
+
+        # Steady-state single-image latency, as served by /predict
+        latencies = []
+        for i in range(runs):
+            sample = samples[i % len(samples)][None]
+            started = time.perf_counter()
+            backend.predict(sample)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+        result_queue.put({
+            "predictions": predictions,
+            "latencies_ms": latencies,
+            "peak_rss_mb": _peak_rss_mb(),
+            "baseline_rss_mb": baseline_rss_mb,
+        })
+    except Exception as e:
+        result_queue.put({"error": str(e)})
+
 class ModelCompatibilityOptimizer:
-    def __init__(self, models_dir="models"):
+    def __init__(self, models_dir="models", accuracy_drop_budget=DEFAULT_ACCURACY_DROP_BUDGET):
         self.models_dir = models_dir
+        self.accuracy_drop_budget = accuracy_drop_budget
         os.makedirs(models_dir, exist_ok=True)
         
-    def optimize_for_deployment(self, model, model_name, class_names):
+    def optimize_for_deployment(self, model, model_name, class_names, calibration_dirs=None, quantize=True):
         """
         Optimize and save model for maximum deployment compatibility
         
@@ -31,6 +88,8 @@ class ModelCompatibilityOptimizer:
             model: Trained Keras model
             model_name: Name for saving the model
             class_names: List of class names
+            calibration_dirs: Image directories for int8 calibration/evaluation
+            quantize: Also produce (and gate) a full-integer quantized model
         """
         logger.info(f"🔧 Optimizing {model_name} for deployment...")
         
@@ -45,8 +104,194 @@ class ModelCompatibilityOptimizer:
         # 3. Create deployment test script
         self._create_test_script(model_name, class_names)
         
+        # 4. Full-integer quantization, accepted only inside the accuracy budget
+        if quantize:
+            try:
+                self.quantize_int8(model, model_name, class_names, calibration_dirs)
+            except Exception as e:
+                logger.error(f"❌ Int8 quantization failed: {e}")
+        
         logger.info(f"✅ {model_name} optimization completed!")
     
+    def quantize_int8(self, model, model_name, class_names=None, calibration_dirs=None,
+                      max_calibration_images=200, latency_runs=50):
+        """
+        Produce a full-integer (int8) TFLite model and a float-vs-int8 report
+        
+        Args:
+            model: Trained Keras model (or path to a saved .keras model)
+            model_name: Name for saving the quantized model and report
+            class_names: Class names; images in a sub-folder named after a class are
+                treated as labelled, which lets the report compare true accuracy
+            calibration_dirs: Directories to draw representative images from
+            max_calibration_images: Cap on images used for calibration and for evaluation
+            latency_runs: Timed single-image inferences per model
+        
+        Returns:
+            The report dict; ``report["accepted"]`` says whether the int8 model was deployed.
+            The int8 model is always written as ``<model_name>_int8.tflite``, next to (never over)
+            the float ``<model_name>.tflite``; the TFLite backend serves it only while the report
+            saved next to it accepts it (inference_backends.tflite_path_for)
+        """
+        if isinstance(model, str):
+            float_path = model
+            model = keras.models.load_model(float_path)
+        else:
+            float_path = os.path.join(self.models_dir, f"{model_name}.keras")
+            if not os.path.exists(float_path):
+                model.save(float_path)
+        
+        img_size = tuple(int(d) for d in model.input_shape[1:3])
+        images, labels = self._load_representative_images(
+            calibration_dirs or DEFAULT_CALIBRATION_DIRS, img_size, class_names, 2 * max_calibration_images
+        )
+        if len(images) == 0:
+            raise ValueError("No representative images found for int8 calibration")
+        
+        # Interleave so calibration and evaluation see the same class mix
+        calibration = images[0::2] if len(images) > 1 else images
+        evaluation = images[1::2] if len(images) > 1 else images
+        evaluation_labels = labels[1::2] if len(images) > 1 else labels
+        logger.info(f"🎯 Calibrating int8 model on {len(calibration)} images, evaluating on {len(evaluation)}")
+        
+        def representative_dataset():
+            for sample in calibration:
+                yield [sample[None].astype(np.float32)]
+        
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+        
+        int8_path = os.path.join(self.models_dir, f"{model_name}{INT8_SUFFIX}")
+        with open(int8_path, "wb") as f:
+            f.write(converter.convert())
+        logger.info(f"✅ Int8 model saved: {int8_path}")
+        
+        float_stats = self._benchmark("keras", float_path, evaluation, latency_runs)
+        int8_stats = self._benchmark("tflite", int8_path, evaluation, latency_runs)
+        
+        report = self._build_report(model_name, float_path, int8_path, float_stats, int8_stats, evaluation_labels)
+        
+        # Deployment only picks up the int8 model when this report accepts it
+        if report["accepted"]:
+            report["deployed_path"] = int8_path
+            logger.info(f"✅ Int8 model accepted (drop {report['accuracy_drop']:.4f} <= {self.accuracy_drop_budget}): {int8_path}")
+        else:
+            report["deployed_path"] = None
+            logger.warning(f"⚠️ Int8 model rejected (drop {report['accuracy_drop']:.4f} > {self.accuracy_drop_budget}), keeping float model")
+        
+        report_path = os.path.join(self.models_dir, f"{model_name}{INT8_REPORT_SUFFIX}")
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"✅ Quantization report saved: {report_path}")
+        
+        return report
+    
+    def _load_representative_images(self, directories, img_size, class_names, limit):
+        """Load up to ``limit`` images, preprocessed exactly like the serving path"""
+        from image_io import open_image
+        
+        paths = []
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            for root, _, files in os.walk(directory):
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        paths.append(os.path.join(root, name))
+        
+        # Spread the sample across classes/directories instead of taking the first folder
+        if len(paths) > limit:
+            paths = [paths[i] for i in np.linspace(0, len(paths) - 1, limit).astype(int)]
+        
+        images, labels = [], []
+        for path in paths:
+            try:
+                img = open_image(path, min_size=img_size).convert("RGB").resize(img_size)
+            except Exception as e:
+                logger.warning(f"⚠️ Skipping unreadable calibration image {path}: {e}")
+                continue
+            images.append(np.asarray(img, dtype=np.float32) / 255.0)
+            label = os.path.basename(os.path.dirname(path))
+            labels.append(class_names.index(label) if class_names and label in class_names else None)
+        
+        return np.array(images, dtype=np.float32), labels
+    
+    def _benchmark(self, kind, model_path, samples, runs):
+        """Predictions, latency and peak RSS of one model, measured in a child process"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            samples_path = os.path.join(tmp_dir, "samples.npy")
+            np.save(samples_path, samples)
+            
+            ctx = multiprocessing.get_context("spawn")
+            result_queue = ctx.Queue()
+            process = ctx.Process(target=_benchmark_worker, args=(kind, model_path, samples_path, runs, result_queue))
+            process.start()
+            result = None
+            while result is None:
+                try:
+                    result = result_queue.get(timeout=1.0)
+                except queue.Empty:
+                    if not process.is_alive():
+                        result = {"error": f"benchmark process exited with code {process.exitcode}"}
+            process.join()
+        
+        if "error" in result:
+            raise RuntimeError(f"Benchmark of {model_path} failed: {result['error']}")
+        return result
+    
+    def _build_report(self, model_name, float_path, int8_path, float_stats, int8_stats, labels):
+        float_predictions = np.array(float_stats["predictions"])
+        int8_predictions = np.array(int8_stats["predictions"])
+        agreement = float(np.mean(float_predictions == int8_predictions))
+        
+        labelled = np.array([label is not None for label in labels])
+        if labelled.any():
+            truth = np.array([label for label in labels if label is not None])
+            float_accuracy = float(np.mean(float_predictions[labelled] == truth))
+            int8_accuracy = float(np.mean(int8_predictions[labelled] == truth))
+            accuracy_drop = float_accuracy - int8_accuracy
+        else:
+            # Without labels, disagreement with the float model bounds the accuracy change
+            float_accuracy = int8_accuracy = None
+            accuracy_drop = 1.0 - agreement
+        
+        def summary(path, stats):
+            latencies = np.array(stats["latencies_ms"])
+            peak_rss, baseline_rss = stats["peak_rss_mb"], stats["baseline_rss_mb"]
+            return {
+                "path": path,
+                "file_size_mb": round(self._path_size(path) / (1024 * 1024), 3),
+                "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3),
+                "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+                "model_rss_mb": round(peak_rss - baseline_rss, 1) if peak_rss is not None else None,
+            }
+        
+        return {
+            "model_name": model_name,
+            "created_at": datetime.now().isoformat(),
+            "evaluation_images": int(len(float_predictions)),
+            "labelled_images": int(labelled.sum()),
+            "top1_agreement": round(agreement, 4),
+            "float_accuracy": float_accuracy,
+            "int8_accuracy": int8_accuracy,
+            "accuracy_drop": round(accuracy_drop, 4),
+            "accuracy_drop_budget": self.accuracy_drop_budget,
+            "accepted": bool(accuracy_drop <= self.accuracy_drop_budget),
+            "float": summary(float_path, float_stats),
+            "int8": summary(int8_path, int8_stats),
+        }
+    
+    @staticmethod
+    def _path_size(path):
+        if os.path.isdir(path):
+            return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+        return os.path.getsize(path)
+    
     def _save_keras_format(self, model, model_name):
         """Save in new Keras format (.keras)"""
         try:
@@ -242,5 +487,28 @@ def create_deployment_package():
     logger.info("✅ Deployment package created!")
 
 if __name__ == "__main__":
-    create_deployment_package()
-    logger.info("🎉 Model compatibility optimization tools ready!")
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Model deployment compatibility tools")
+    parser.add_argument("--quantize", metavar="MODEL_PATH", help="Produce a gated int8 model from a saved .keras model")
+    parser.add_argument("--calibration-dir", action="append", dest="calibration_dirs",
+                        help="Representative image directory (repeatable)")
+    parser.add_argument("--class-names", help="JSON file with class names, enables labelled accuracy")
+    parser.add_argument("--budget", type=float, default=DEFAULT_ACCURACY_DROP_BUDGET,
+                        help="Largest accepted top-1 accuracy drop (fraction)")
+    args = parser.parse_args()
+    
+    if args.quantize:
+        class_names = None
+        if args.class_names:
+            with open(args.class_names) as f:
+                class_names = json.load(f)
+        optimizer = ModelCompatibilityOptimizer(
+            models_dir=os.path.dirname(args.quantize) or ".", accuracy_drop_budget=args.budget
+        )
+        model_name = os.path.splitext(os.path.basename(args.quantize))[0]
+        report = optimizer.quantize_int8(args.quantize, model_name, class_names, args.calibration_dirs)
+        print(json.dumps(report, indent=2))
+    else:
+        create_deployment_package()
+        logger.info("🎉 Model compatibility optimization tools ready!")
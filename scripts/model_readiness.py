@@ -0,0 +1,90 @@
+"""
+Model Readiness Tracking
+Records per-model loading progress so the API can serve liveness immediately and readiness once models are warm
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# How long an inference request waits for its model before giving up with 503
+MODEL_READY_TIMEOUT = float(os.environ.get("MODEL_READY_TIMEOUT", 15))
+
+# Load stages in order, with the progress fraction each one represents
+STAGES = {"pending": 0.0, "loading": 0.25, "warming": 0.75, "ready": 1.0, "failed": 1.0}
+
+
+class ModelLoadTracker:
+    """Thread-safe state machine (pending -> loading -> warming -> ready | failed) per model"""
+
+    def __init__(self, names):
+        self._lock = threading.Lock()
+        self._events = {name: threading.Event() for name in names}
+        self._models = {
+            name: {"state": "pending", "progress": 0.0, "load_seconds": None,
+                   "warmup_seconds": None, "error": None}
+            for name in names
+        }
+        self._started = {}
+        self.background_started = False
+
+    def mark(self, name, state, **info):
+        """Move a model to ``state`` and record extra details (durations, batch sizes, ...)"""
+        with self._lock:
+            model = self._models[name]
+            now = time.perf_counter()
+            if state == "loading":
+                self._started[name] = now
+            elif model["load_seconds"] is None and name in self._started:
+                model["load_seconds"] = round(now - self._started[name], 3)
+            model.update(info)
+            model["state"] = state
+            model["progress"] = STAGES[state]
+        if state in ("ready", "failed"):
+            self._events[name].set()
+        logger.info(f"📦 {name}: {state}")
+
+    def is_ready(self, name):
+        return self._models[name]["state"] == "ready"
+
+    def all_settled(self):
+        """True once every model has finished loading (failed ones fall back to lazy loading)"""
+        return all(event.is_set() for event in self._events.values())
+
+    def settled(self, name):
+        """True once loading has finished, successfully or not"""
+        return self._events[name].is_set()
+
+    def wait(self, name, timeout=MODEL_READY_TIMEOUT):
+        """
+        Block until a model has settled. Returns True straight away when background
+        loading never started, so callers fall back to lazy loading.
+        """
+        if not self.background_started:
+            return True
+        return self._events[name].wait(timeout)
+
+    async def wait_async(self, name, timeout=MODEL_READY_TIMEOUT):
+        """Awaitable ``wait`` that polls instead of parking a thread"""
+        if not self.background_started or self.settled(name):
+            return True
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+            if self.settled(name):
+                return True
+        return False
+
+    def snapshot(self):
+        with self._lock:
+            models = {name: dict(model) for name, model in self._models.items()}
+        return {
+            "ready": all(model["state"] in ("ready", "failed") for model in models.values()),
+            "degraded": [name for name, model in models.items() if model["state"] == "failed"],
+            "progress": round(sum(model["progress"] for model in models.values()) / max(len(models), 1), 3),
+            "models": models,
+        }
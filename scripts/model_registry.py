@@ -0,0 +1,365 @@
+"""
+Commodity Price Model Registry
+Discovers per-commodity models from models/*_model.pkl (or native *_model.ubj / compiled *_model.npz) plus a manifest, loads them lazily and keeps a memory-bounded LRU;
+per-market models are looked up through models/markets/index.json
+"""
+
+import os
+import re
+import json
+import glob
+import pickle
+import logging
+import threading
+from collections import OrderedDict
+
+from prediction_cache import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "processed_data")
+MANIFEST_NAME = "model_manifest.json"
+MODEL_SUFFIX = "_model.pkl"
+NATIVE_SUFFIX = "_model.ubj"
+COMPILED_SUFFIX = "_model.npz"
+
+# Serve XGBoost's native booster files (written by train_models.py) instead of pickles when present
+PREFER_NATIVE = os.environ.get("MODEL_REGISTRY_PREFER_NATIVE", "1").lower() not in ("0", "false", "no")
+# Serve NumPy-compiled tree ensembles ahead of both; they need neither xgboost nor pandas
+PREFER_COMPILED = os.environ.get("MODEL_REGISTRY_PREFER_COMPILED", "1").lower() not in ("0", "false", "no")
+
+# Per-market models written by train_market_models.py, looked up through their index
+MARKET_MODELS_DIR = os.environ.get("MARKET_MODELS_DIR", os.path.join(MODELS_DIR, "markets"))
+MARKET_INDEX_NAME = "index.json"
+
+# Memory budget for loaded models (estimated from their serialized size)
+DEFAULT_MAX_MEMORY_MB = float(os.environ.get("MODEL_REGISTRY_MAX_MB", 256))
+
+# *_model.pkl files that are not per-commodity price models
+DEFAULT_EXCLUDE = ("crop_demand",)
+
+# Metadata every commodity has unless its manifest entry overrides it
+DEFAULT_METADATA = {"unit": "Rs./Kg", "unit_multiplier": 1.0}
+
+
+def estimate_model_bytes(model):
+    """Approximate in-memory size of a model: its arrays or native buffer, else its pickle"""
+    if hasattr(model, "nbytes"):
+        return int(model.nbytes)
+    if hasattr(model, "get_booster"):
+        return len(model.get_booster().save_raw())
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def market_slug(value):
+    """Lowercase name with runs of anything but letters and digits collapsed to "-" ("  Pune " -> "pune")"""
+    return re.sub(r"[^a-z0-9]+", "-", str(value).strip().lower()).strip("-") or "unknown"
+
+
+def market_key(commodity, state, market):
+    """Partition key shared by the partitioned data store and the market model index"""
+    return f"{market_slug(commodity)}/{market_slug(state)}/{market_slug(market)}"
+
+
+class ModelRegistry:
+    """
+    Commodity name -> metadata and lazily loaded model. Loaded models live in an LRU
+    bounded by ``max_memory_mb``; a model whose file changes is reloaded on next use.
+    Given a state and market, ``info`` and ``get`` resolve to that market's model when
+    ``market_index`` has one, else to the commodity model.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, data_dir=DATA_DIR, max_memory_mb=DEFAULT_MAX_MEMORY_MB,
+                 loader=None, market_index=None):
+        """
+        Args:
+            models_dir: Directory holding ``<commodity>_model.pkl`` (and optional ``.ubj`` / ``.npz``) files and the manifest
+            data_dir: Directory holding ``<commodity>_processed.csv`` files
+            max_memory_mb: Budget for loaded models; least recently used ones are evicted
+            loader: ``path -> model``; defaults to the compiled or native model, else joblib.load
+            market_index: MarketModelIndex for per-market models; defaults to MARKET_MODELS_DIR
+        """
+        self.models_dir = models_dir
+        self.data_dir = data_dir
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.loader = loader
+        self.market_index = market_index if market_index is not None else MarketModelIndex()
+
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._commodities = OrderedDict()
+        self._loaded = OrderedDict()
+        self._per_model = {}
+        self._stats = {"loads": 0, "reloads": 0, "hits": 0, "misses": 0, "evictions": 0}
+        self.discover()
+
+    def discover(self):
+        """(Re)scan the models directory and manifest; returns the commodity names"""
+        manifest = self._read_manifest()
+        exclude = set(DEFAULT_EXCLUDE) | set(manifest.get("exclude", []))
+        entries = manifest.get("commodities", {})
+
+        found = {
+            os.path.basename(path)[:-len(suffix)]
+            for suffix in (MODEL_SUFFIX, NATIVE_SUFFIX, COMPILED_SUFFIX)
+            for path in glob.glob(os.path.join(self.models_dir, f"*{suffix}"))
+        }
+        # Manifest order first (it drives response order), then anything new alphabetically
+        names = [name for name in entries if name in found or "model" in entries[name]]
+        names += sorted(name for name in found if name not in entries)
+
+        commodities = OrderedDict()
+        for name in names:
+            if name in exclude:
+                continue
+            entry = dict(DEFAULT_METADATA, **entries.get(name, {}))
+            entry["pickle_path"] = os.path.join(self.models_dir, entry.pop("model", f"{name}{MODEL_SUFFIX}"))
+            preferred = [(PREFER_COMPILED, COMPILED_SUFFIX), (PREFER_NATIVE, NATIVE_SUFFIX)]
+            entry["model_paths"] = [
+                path for path in (os.path.join(self.models_dir, f"{name}{suffix}") for enabled, suffix in preferred if enabled)
+                if os.path.exists(path)
+            ] + [entry["pickle_path"]]
+            entry["model_path"] = entry["model_paths"][0]
+            entry["data_path"] = os.path.join(self.data_dir, entry.pop("data", f"{name}_processed.csv"))
+            commodities[name] = entry
+
+        with self._lock:
+            self._commodities = commodities
+            for name in list(self._loaded):
+                if name not in commodities:
+                    self._loaded.pop(name, None)
+        return list(commodities)
+
+    def commodities(self):
+        with self._lock:
+            return list(self._commodities)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._commodities
+
+    def __len__(self):
+        with self._lock:
+            return len(self._commodities)
+
+    def info(self, name, state=None, market=None):
+        """
+        Manifest metadata plus model/data paths (KeyError if unknown)
+
+        With ``state`` and ``market``, the paths are the market model's and its partition's when
+        the market index has them; ``info["market"]`` is then the market key, otherwise None.
+        """
+        with self._lock:
+            info = dict(self._commodities[name])
+        info["market"] = None
+        if state is not None and market is not None:
+            entry = self.market_index.lookup(name, state, market)
+            if entry is not None and "data" in entry:
+                model_path = os.path.join(self.market_index.models_dir, entry["model"])
+                info.update(market=market_key(name, state, market), model_path=model_path, model_paths=[model_path],
+                            data_path=os.path.join(self.market_index.models_dir, entry["data"]))
+        return info
+
+    def model_path(self, name):
+        return self.info(name)["model_path"]
+
+    def data_path(self, name):
+        return self.info(name)["data_path"]
+
+    def get(self, name, state=None, market=None):
+        """Loaded model for a commodity (or one of its markets), loading (or reloading a changed file) on demand"""
+        info = self.info(name, state, market)
+        if info["market"] is not None:
+            return self.market_index.get(name, state, market)
+        path = info["model_path"]
+        fingerprint = model_fingerprint(path)
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                self._loaded.move_to_end(name)
+                self._stats["hits"] += 1
+                self._per_model[name]["hits"] += 1
+                return entry["model"]
+            self._stats["misses"] += 1
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Load outside the registry lock so other commodities stay available
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(name)
+                if entry is not None and entry["fingerprint"] == fingerprint:
+                    return entry["model"]
+                reload = entry is not None
+            model = self._load(info["model_paths"])
+            size = estimate_model_bytes(model)
+            with self._lock:
+                self._loaded.pop(name, None)
+                self._loaded[name] = {"model": model, "fingerprint": fingerprint, "bytes": size}
+                per_model = self._per_model.setdefault(name, {"loads": 0, "hits": 0})
+                per_model["loads"] += 1
+                self._stats["reloads" if reload else "loads"] += 1
+                self._evict(keep=name)
+            logger.info(f"📦 Loaded {name} price model ({size / 1024 / 1024:.1f} MB)")
+            return model
+
+    def clear(self):
+        with self._lock:
+            self._loaded.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            memory = sum(entry["bytes"] for entry in self._loaded.values())
+            return dict(
+                self._stats,
+                commodities=len(self._commodities),
+                loaded=len(self._loaded),
+                hit_rate=round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                memory_mb=round(memory / 1024 / 1024, 2),
+                max_memory_mb=round(self.max_bytes / 1024 / 1024, 2),
+                models={
+                    name: dict(
+                        values,
+                        loaded=name in self._loaded,
+                        memory_mb=round(self._loaded[name]["bytes"] / 1024 / 1024, 2) if name in self._loaded else 0.0,
+                    )
+                    for name, values in self._per_model.items()
+                },
+            )
+
+    def _load(self, paths):
+        """Load the first usable file: compiled, then native, then the pickle"""
+        if self.loader is not None:
+            return self.loader(paths[0])
+        error = None
+        for path in paths[:-1]:
+            try:
+                if path.endswith(COMPILED_SUFFIX):
+                    from compiled_trees import CompiledTreeModel
+                    return CompiledTreeModel(path)
+                from native_models import NativeBoosterModel
+                return NativeBoosterModel(path)
+            except Exception as e:
+                error = e
+                logger.warning(f"⚠️ Could not load {path} ({e}), trying the next format")
+        if error is not None and not os.path.exists(paths[-1]):
+            raise error
+        import joblib
+        return joblib.load(paths[-1])
+
+    def _evict(self, keep):
+        # Caller holds the lock
+        total = sum(entry["bytes"] for entry in self._loaded.values())
+        for name in list(self._loaded):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self._loaded[name]["bytes"]
+            self._loaded.pop(name, None)
+            self._stats["evictions"] += 1
+            logger.info(f"♻️ Evicted {name} price model (registry over {self.max_bytes / 1024 / 1024:.0f} MB)")
+
+    def _read_manifest(self):
+        path = os.path.join(self.models_dir, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable model manifest {path}: {e}")
+            return {}
+
+
+class MarketModelIndex:
+    """
+    (commodity, state, market) -> per-market model, through the index written by
+    train_market_models.py. Lookups are one dict access; the index file is re-read when
+    it changes and loaded models share an LRU bounded by ``max_memory_mb``.
+    """
+
+    def __init__(self, models_dir=MARKET_MODELS_DIR, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+        self.models_dir = models_dir
+        self.index_path = os.path.join(models_dir, MARKET_INDEX_NAME)
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._fingerprint = None
+        self._loaded = OrderedDict()
+        self._stats = {"loads": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    def lookup(self, commodity, state, market):
+        """Index entry (model path, data hash, rows, metrics) for a market, or None"""
+        self._refresh()
+        entry = self._entries.get(market_key(commodity, state, market))
+        return dict(entry) if entry is not None else None
+
+    def __contains__(self, key):
+        return self.lookup(*key) is not None
+
+    def __len__(self):
+        self._refresh()
+        return len(self._entries)
+
+    def markets(self, commodity=None):
+        """Partition keys in the index, optionally for one commodity"""
+        self._refresh()
+        prefix = f"{market_slug(commodity)}/" if commodity is not None else ""
+        return sorted(key for key in self._entries if key.startswith(prefix))
+
+    def get(self, commodity, state, market):
+        """Loaded model for a market (KeyError if it has none)"""
+        entry = self.lookup(commodity, state, market)
+        if entry is None:
+            raise KeyError(f"No market model for {market_key(commodity, state, market)}")
+        path = os.path.join(self.models_dir, entry["model"])
+        fingerprint = model_fingerprint(path)
+        with self._lock:
+            loaded = self._loaded.get(path)
+            if loaded is not None and loaded["fingerprint"] == fingerprint:
+                self._loaded.move_to_end(path)
+                self._stats["hits"] += 1
+                return loaded["model"]
+            self._stats["misses"] += 1
+
+        from compiled_trees import CompiledTreeModel
+        model = CompiledTreeModel(path)
+        with self._lock:
+            self._loaded.pop(path, None)
+            self._loaded[path] = {"model": model, "fingerprint": fingerprint, "bytes": estimate_model_bytes(model)}
+            self._stats["loads"] += 1
+            total = sum(item["bytes"] for item in self._loaded.values())
+            for name in list(self._loaded)[:-1]:
+                if total <= self.max_bytes:
+                    break
+                total -= self._loaded.pop(name)["bytes"]
+                self._stats["evictions"] += 1
+        return model
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, markets=len(self._entries), loaded=len(self._loaded))
+
+    def _refresh(self):
+        try:
+            fingerprint = model_fingerprint(self.index_path)
+        except OSError:
+            fingerprint = None
+        if fingerprint == self._fingerprint:
+            return
+        entries = {}
+        if fingerprint is not None:
+            try:
+                with open(self.index_path, "r") as f:
+                    entries = json.load(f).get("models", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable market model index {self.index_path}: {e}")
+        with self._lock:
+            self._entries = entries
+            self._fingerprint = fingerprint
@@ -0,0 +1,106 @@
+"""
+Native XGBoost Price Models
+Exports trained regressors as XGBoost UBJ boosters with a feature-schema sidecar and serves them without unpickling
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+NATIVE_SUFFIX = "_model.ubj"
+
+
+def schema_path_for(native_path):
+    """``<name>_model.ubj`` -> ``<name>_model.schema.json``"""
+    return os.path.splitext(native_path)[0] + ".schema.json"
+
+
+def export_native(model, models_dir, name, feature_names, target=None):
+    """
+    Save a fitted XGBRegressor as ``<name>_model.ubj`` plus ``<name>_model.schema.json``
+
+    Returns:
+        Path of the booster file
+    """
+    import xgboost
+
+    os.makedirs(models_dir, exist_ok=True)
+    native_path = os.path.join(models_dir, f"{name}{NATIVE_SUFFIX}")
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    booster.save_model(native_path)
+
+    schema = {
+        "name": name,
+        "format": "ubj",
+        "feature_names": list(feature_names),
+        "target": target,
+        "num_trees": booster.num_boosted_rounds(),
+        "xgboost_version": xgboost.__version__,
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(schema_path_for(native_path), "w") as f:
+        json.dump(schema, f, indent=2)
+    return native_path
+
+
+class NativeBoosterModel:
+    """
+    XGBoost booster loaded once from its native file. ``predict`` takes a NumPy matrix
+    in schema column order (or a DataFrame, which is reordered) and skips pandas entirely.
+    """
+
+    def __init__(self, native_path):
+        import xgboost
+
+        self.path = native_path
+        with open(schema_path_for(native_path), "r") as f:
+            self.schema = json.load(f)
+        self.feature_names = self.schema["feature_names"]
+        self.booster = xgboost.Booster()
+        self.booster.load_model(native_path)
+
+    def get_booster(self):
+        return self.booster
+
+    def predict(self, X, validate_features=False):
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy()
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got shape {X.shape}")
+        return self.booster.inplace_predict(X, validate_features=False)
+
+
+def export_pickles(models_dir, feature_names=None):
+    """Convert every ``*_model.pkl`` XGBoost regressor in ``models_dir`` to native format"""
+    import joblib
+
+    exported = []
+    for path in sorted(glob.glob(os.path.join(models_dir, "*_model.pkl"))):
+        name = os.path.basename(path)[:-len("_model.pkl")]
+        model = joblib.load(path)
+        if not hasattr(model, "get_booster"):
+            print(f"⏭️  {name}: not an XGBoost model, skipped")
+            continue
+        names = feature_names or model.get_booster().feature_names
+        exported.append(export_native(model, models_dir, name, names, target="Modal Price (Rs./Quintal)"))
+        print(f"✅ {name}: {exported[-1]}")
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export pickled XGBoost price models to native UBJ boosters")
+    parser.add_argument("--models-dir", default=os.path.join(os.path.dirname(__file__), "..", "models"))
+    args = parser.parse_args()
+    if not export_pickles(args.models_dir):
+        print("❌ No XGBoost pickles exported")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
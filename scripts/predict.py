@@ -1,16 +1,9 @@
-import joblib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-
-models = {
-    "banana": "models/banana_model.pkl",
-    "onion": "models/onion_model.pkl",
-    "tomato": "models/tomato_model.pkl",
-    "wheat": "models/wheat_model.pkl",
-    "carrot": "models/carrot_model.pkl"
-}
+# Shares the serving registry and its cached feature statistics
+from predict_with_graph import cached, feature_stats, registry
 
 FEATURE_NAMES = [
     "Days", "Month", "Arrivals (Tonnes)", "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)",
@@ -19,26 +12,26 @@ FEATURE_NAMES = [
 
 def predict_future_prices(crop, weeks_ahead=5):
     try:
-        model = joblib.load(models[crop])
-        data = pd.read_csv(f"processed_data/{crop}_processed.csv")
-        data["Reported Date"] = pd.to_datetime(data["Reported Date"])  # Convert to datetime
-        
-        last_date = data["Reported Date"].dropna().max()
-        last_day_num = (last_date - data["Reported Date"].min()).days
+        model = registry.get(crop)
+        # Materialized with the model by train_models.py / feature_store.py, reused until a source file changes
+        stats = cached(feature_stats, crop)
+
+        last_date = stats["last_date"]
+        last_day_num = stats["last_day"]
 
         future_dates = [last_date + timedelta(weeks=i) for i in range(1, weeks_ahead + 1)]
         future_days = np.array([last_day_num + (i * 7) for i in range(1, weeks_ahead + 1)])
 
-        arrivals_median = data["Arrivals (Tonnes)"].median()
-        min_price_median = data["Min Price (Rs./Quintal)"].median()
-        max_price_median = data["Max Price (Rs./Quintal)"].median()
+        arrivals_median = stats["arrivals"]
+        min_price_median = stats["min_price"]
+        max_price_median = stats["max_price"]
         price_range_median = max_price_median - min_price_median
         demand_indicator_median = arrivals_median / (min_price_median + 1)
 
-        rolling_price_median = data["Rolling_Modal_Price"].median()
-        lag_1_month_median = data["Lag_1_Month"].median()
-        lag_2_months_median = data["Lag_2_Months"].median()
-        price_change_rate_median = data["Price_Change_Rate"].median()
+        rolling_price_median = stats["rolling_price"]
+        lag_1_month_median = stats["lag_1_month"]
+        lag_2_months_median = stats["lag_2_months"]
+        price_change_rate_median = stats["price_change_rate"]
 
         demand_variation = np.linspace(0.95, 1.05, weeks_ahead)  
         price_change_variation = np.linspace(-0.02, 0.02, weeks_ahead)  
@@ -75,5 +68,5 @@ def predict_future_prices(crop, weeks_ahead=5):
     except Exception as e:
         print(f"❌ Error predicting prices for {crop}: {e}")
 
-for crop in models.keys():
+for crop in registry.commodities():
     predict_future_prices(crop, weeks_ahead=5)
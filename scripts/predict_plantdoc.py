@@ -1,10 +1,13 @@
-import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.preprocessing.image import img_to_array
 import os
 import json
 import logging
+import threading
+
+from inference_batcher import MicroBatcher
+from inference_executor import get_executor
+from image_io import decode_rgb
+from inference_backends import load_backend, tflite_path_for, warm_up
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,39 +22,56 @@ MODEL_PATHS = [
     os.path.join(os.path.dirname(__file__), "..", "models", "best_plantdoc_model.keras")
 ]
 
+# Model input size (width, height)
+IMG_SIZE = (224, 224)
+
 # Global model variable for lazy loading
 _model = None
+_model_version = None
+_model_lock = threading.Lock()
 
 def load_model():
     """Load the plant disease model lazily with fallback options"""
-    global _model
+    global _model, _model_version
     if _model is None:
-        last_error = None
+        # Background loading and a first request must not both load the model
+        with _model_lock:
+            if _model is not None:
+                return _model
+
+            last_error = None
         
-        for model_path in MODEL_PATHS:
-            if os.path.exists(model_path):
-                try:
-                    logger.info(f"Attempting to load plant disease model from: {model_path}")
-                    _model = tf.keras.models.load_model(model_path)
-                    logger.info(f"✅ Plant disease model loaded successfully from: {os.path.basename(model_path)}")
-                    return _model
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to load {os.path.basename(model_path)}: {str(e)}")
-                    last_error = e
-                    continue
-            else:
-                logger.info(f"Model not found: {os.path.basename(model_path)}")
+            for model_path in MODEL_PATHS:
+                if os.path.exists(model_path) or os.path.exists(tflite_path_for(model_path)):
+                    try:
+                        logger.info(f"Attempting to load plant disease model from: {model_path}")
+                        _model = load_backend(model_path)
+                        _model_version = _model.version
+                        logger.info(f"✅ Plant disease model loaded successfully from: {os.path.basename(_model.model_path)} ({_model.name})")
+                        return _model
+                    except Exception as e:
+                        logger.warning(f"⚠️ Failed to load {os.path.basename(model_path)}: {str(e)}")
+                        last_error = e
+                        continue
+                else:
+                    logger.info(f"Model not found: {os.path.basename(model_path)}")
         
-        # If all models failed to load
-        if last_error:
-            logger.error(f"Failed to load any plant disease model. Last error: {str(last_error)}")
-            raise last_error
-        else:
-            raise FileNotFoundError("No plant disease models found")
-    
+            # If all models failed to load
+            if last_error:
+                logger.error(f"Failed to load any plant disease model. Last error: {str(last_error)}")
+                raise last_error
+            else:
+                raise FileNotFoundError("No plant disease models found")
+
+    return _model
+
+def get_model_version():
+    """Version of the loaded model, or None if it has not been loaded yet"""
+    return _model_version
+
 # Global variables for lazy loading
-_model = None
 _class_names = None
+_batcher = None
 
 def load_class_names():
     """Load class names from JSON file"""
@@ -91,40 +111,78 @@ def get_healthy_classes():
         "Peach leaf", "Raspberry leaf", "Soyabean leaf", "Strawberry leaf", "Tomato leaf"
     }
 
-def predict_disease(image_path):
-    try:
-        # Load model and class names on first use
+def get_batcher():
+    """Micro-batcher that coalesces concurrent requests in front of the loaded model"""
+    global _batcher
+    if _batcher is None:
         model = load_model()
-        class_names = load_class_names()
-        healthy_classes = get_healthy_classes()
-        
-        image_path = os.path.normpath(image_path)
+        _batcher = MicroBatcher(lambda batch: model.predict(batch, verbose=0), name="plantdoc")
+    return _batcher
+
+def warm_up_model():
+    """Load the model and pre-trace every batch size the micro-batcher can produce"""
+    batch_sizes = list(range(1, get_batcher().max_batch_size + 1))
+    duration = warm_up(load_model(), batch_sizes)
+    logger.info(f"🔥 Plant disease model warmed up in {duration:.2f}s (batch sizes 1-{batch_sizes[-1]})")
+    return {"warmup_seconds": round(duration, 3), "batch_sizes": batch_sizes}
+
+def get_batching_stats():
+    """Batching statistics, or None if no request has been batched yet"""
+    return _batcher.stats() if _batcher is not None else None
+
+def preprocess_image(image):
+    """
+    Decode an image and return a normalized 224x224 RGB array
+
+    Args:
+        image: File path, raw bytes, or a binary file-like object
+    """
+    import cv2  # deferred so importing this module stays cheap
+
+    # Large JPEGs decode at reduced resolution; the resize then runs on uint8 data
+    img = decode_rgb(image, min_size=IMG_SIZE)
+    img = cv2.resize(img, IMG_SIZE)
+    return img.astype(np.float32) / 255.0
+
+def format_prediction(prediction):
+    """Turn one row of class probabilities into the API response"""
+    class_names = load_class_names()
+    predicted_class = class_names[np.argmax(prediction)]
+    confidence = float(np.max(prediction))
+
+    health_status = "HEALTHY" if predicted_class in get_healthy_classes() else "DISEASED"
 
-        if not os.path.exists(image_path):
-            return {"error": f"Image file not found -> {image_path}"}
-
-        img = cv2.imread(image_path)
-
-        if img is None:
-            return {"error": f"Could not load image -> {image_path}"}
-
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = cv2.resize(img, (224, 224))  
-        img = img_to_array(img) / 255.0    
-        img = np.expand_dims(img, axis=0)  
-        prediction = model.predict(img)
-        predicted_class = class_names[np.argmax(prediction)]
-        confidence = float(np.max(prediction))  
+    return {
+        "class": predicted_class,
+        "confidence": round(confidence, 4),
+        "status": health_status
+    }
 
-        
-        health_status = "HEALTHY" if predicted_class in healthy_classes else "DISEASED"
+def predict_disease(image):
+    """Predict the disease class for an image path, raw bytes, or file-like object"""
+    try:
+        img = preprocess_image(image)
+        prediction = get_batcher().predict(img)
+        return format_prediction(prediction)
 
-        return {
-            "class": predicted_class,
-            "confidence": round(confidence, 4),
-            "status": health_status
-        }
+    except (FileNotFoundError, ValueError) as e:
+        return {"error": str(e)}
+    except Exception as e:
+        logger.error(f"Plant disease prediction error: {str(e)}")
+        return {"error": str(e)}
 
+async def predict_disease_async(image):
+    """Same as predict_disease, but decodes on the inference executor and awaits the batched forward pass"""
+    try:
+        executor = get_executor()
+        # First request loads the model off the event loop
+        batcher = _batcher or await executor.run("plantdoc", get_batcher)
+        img = await executor.run("plantdoc", preprocess_image, image)
+        prediction = await batcher.predict_async(img)
+        return format_prediction(prediction)
+
+    except (FileNotFoundError, ValueError) as e:
+        return {"error": str(e)}
     except Exception as e:
         logger.error(f"Plant disease prediction error: {str(e)}")
         return {"error": str(e)}
@@ -1,8 +1,8 @@
-import tensorflow as tf
 import numpy as np
-from PIL import Image
 import os
 
+from image_io import open_image, describe_source
+
 # ✅ Path to the saved model
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "soil_classifier.keras")
 
@@ -52,9 +52,10 @@ SOIL_INFO = {
     }
 }
 
-def load_and_prepare_image(image_path):
+def load_and_prepare_image(image):
+    """Accepts a file path, raw bytes, or a binary file-like object"""
     try:
-        img = Image.open(image_path).convert("RGB")
+        img = open_image(image, min_size=IMG_SIZE).convert("RGB")
         print(f"🖼️ Original image size: {img.size}")
         img = img.resize(IMG_SIZE)
         print(f"📏 Resized to: {IMG_SIZE}")
@@ -66,10 +67,10 @@ def load_and_prepare_image(image_path):
         return None
 
 
-def predict_soil_type(image_path):
-    print(f"🔍 Predicting soil type for: {image_path}")
+def predict_soil_type(image):
+    print(f"🔍 Predicting soil type for: {describe_source(image)}")
 
-    img_tensor = load_and_prepare_image(image_path)
+    img_tensor = load_and_prepare_image(image)
     if img_tensor is None:
         print("❌ Image preprocessing failed.")
         return None
@@ -80,6 +81,7 @@ def predict_soil_type(image_path):
         return None
 
     try:
+        import tensorflow as tf
         model = tf.keras.models.load_model(MODEL_PATH)
         print("✅ Model loaded successfully.")
     except Exception as e:
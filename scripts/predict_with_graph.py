@@ -1,115 +1,208 @@
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-import joblib
-import pandas as pd
 import numpy as np
 import os
+import time
+
+from forecast_cache import ForecastCache
+from chart_store import ChartRenderer
+from forecast_executor import ForecastExecutor
+from model_registry import ModelRegistry
 
-MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
-DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "processed_data")
 GRAPH_DIR = os.path.join(os.path.dirname(__file__), "predicted_graphs")
 os.makedirs(GRAPH_DIR, exist_ok=True)
 
-models = {
-    "banana": os.path.join(MODEL_DIR, "banana_model.pkl"),
-    "onion": os.path.join(MODEL_DIR, "onion_model.pkl"),
-    "tomato": os.path.join(MODEL_DIR, "tomato_model.pkl"),
-    "wheat": os.path.join(MODEL_DIR, "wheat_model.pkl"),
-    "carrot": os.path.join(MODEL_DIR, "carrot_model.pkl")
-}
+chart_renderer = ChartRenderer(GRAPH_DIR)
+
+# Commodities discovered from models/*_model.pkl and models/model_manifest.json
+registry = ModelRegistry()
 
 FEATURE_NAMES = [
     "Days", "Month", "Arrivals (Tonnes)", "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)",
     "Price Range", "Demand Indicator", "Rolling_Modal_Price", "Lag_1_Month", "Lag_2_Months", "Price_Change_Rate"
 ]
 
+def crop_sources(crop):
+    """Files a crop forecast depends on"""
+    return [registry.model_path(crop), registry.data_path(crop)]
+
+# Default window for /market-predictions: weekly steps from the origin up to the end date
+DEFAULT_ORIGIN = datetime.strptime("2025-03-09", "%Y-%m-%d")
+DEFAULT_END_DATE = datetime.strptime("2025-04-12", "%Y-%m-%d")
+DEFAULT_WEEKS = (DEFAULT_END_DATE - DEFAULT_ORIGIN).days // 7
+MAX_WEEKS = int(os.environ.get("FORECAST_MAX_WEEKS", 52))
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+def key_info(key):
+    """registry.info for a crop name or a (crop, state, market) key"""
+    return registry.info(*key) if isinstance(key, tuple) else registry.info(key)
+
+def compute_feature_stats(key):
+    """
+    Statistics the forecast features are built from. For a crop: materialized with the model
+    (scripts/feature_store.py), or computed from the data the same way if they are missing or stale.
+    For a (crop, state, market) key with a market model: computed from the market's partition.
+    """
+    from feature_store import data_stats, serving_stats
+
+    info = key_info(key)
+    if info["market"] is not None:
+        return data_stats(info["data_path"])
+    crop = key[0] if isinstance(key, tuple) else key
+    return serving_stats(crop, registry.models_dir, info["data_path"], info["model_path"])
+
+def feature_sources(key):
+    """Files the feature statistics depend on: model, data and the materialized store or market index"""
+    from feature_store import features_path
+
+    if isinstance(key, tuple):
+        info = key_info(key)
+        return [info["model_path"], info["data_path"], registry.market_index.index_path]
+    return crop_sources(key) + [features_path(registry.models_dir, key)]
+
+# Feature statistics, reused until the model, data or feature store changes
+feature_stats = ForecastCache(compute_feature_stats, feature_sources, name="feature stats")
+
+def cached(cache, crop):
+    result = cache.get(crop)
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+def build_feature_matrix(stats, future_dates):
+    """Every horizon step as one row of a (weeks, len(FEATURE_NAMES)) matrix, columns in FEATURE_NAMES order"""
+    weeks = len(future_dates)
+    demand_variation = np.linspace(0.95, 1.05, weeks)
+    price_change_variation = np.linspace(-0.02, 0.02, weeks)
+
+    X = np.empty((weeks, len(FEATURE_NAMES)))
+    X[:, FEATURE_INDEX["Days"]] = [(d - stats["first_date"]).days for d in future_dates]
+    X[:, FEATURE_INDEX["Month"]] = [d.month for d in future_dates]
+    X[:, FEATURE_INDEX["Arrivals (Tonnes)"]] = stats["arrivals"] * demand_variation
+    X[:, FEATURE_INDEX["Min Price (Rs./Quintal)"]] = stats["min_price"] * demand_variation
+    X[:, FEATURE_INDEX["Max Price (Rs./Quintal)"]] = stats["max_price"] * demand_variation
+    X[:, FEATURE_INDEX["Price Range"]] = (stats["max_price"] - stats["min_price"]) * demand_variation
+    X[:, FEATURE_INDEX["Demand Indicator"]] = stats["arrivals"] / (stats["min_price"] + 1) * demand_variation
+    X[:, FEATURE_INDEX["Rolling_Modal_Price"]] = stats["rolling_price"] * demand_variation
+    X[:, FEATURE_INDEX["Lag_1_Month"]] = stats["lag_1_month"] * demand_variation
+    X[:, FEATURE_INDEX["Lag_2_Months"]] = stats["lag_2_months"] * demand_variation
+    X[:, FEATURE_INDEX["Price_Change_Rate"]] = stats["price_change_rate"] + price_change_variation
+    return X
+
+def to_unit_prices(crop, predicted_prices):
+    """Convert model output (Rs./Quintal) to the crop's retail unit from the manifest"""
+    info = registry.info(crop)
+    return info["unit"], (predicted_prices / 100) * info["unit_multiplier"]
+
+def parse_origin(origin):
+    """Forecast origin from a "YYYY-MM-DD" string (datetimes and None pass through)"""
+    if not isinstance(origin, str):
+        return origin
+    try:
+        return datetime.strptime(origin, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"origin must be a YYYY-MM-DD date, got {origin!r}")
+
+def forecast_prices(crop, origin=DEFAULT_ORIGIN, weeks=DEFAULT_WEEKS, state=None, market=None):
+    """
+    Weekly price forecast for ``weeks`` steps after ``origin``, scored in a single predict call
+
+    With ``state`` and ``market``, the market's own model and data are used when it has a model;
+    the result's "market" is then its key, or None when the crop model stood in.
+    """
+    served_market = registry.info(crop, state, market)["market"]
+    model = registry.get(crop, state, market)
+    stats = cached(feature_stats, (crop, state, market) if served_market is not None else crop)
+
+    future_dates = [origin + timedelta(weeks=i) for i in range(1, weeks + 1)]
+    # Columns are already in training order, so skip the name check numpy input would fail
+    predicted_prices = model.predict(build_feature_matrix(stats, future_dates), validate_features=False)
+    unit, prices = to_unit_prices(crop, predicted_prices)
+
+    prediction_list = [
+        {"date": future_dates[i].strftime("%Y-%m-%d"), "price": round(float(prices[i]), 2)}
+        for i in range(weeks)
+    ]
+
+    result = {
+        "crop": crop,
+        "unit": unit,
+        "origin": origin.strftime("%Y-%m-%d"),
+        "weeks": weeks,
+        "predictions": prediction_list,
+        # Turned into graph_url by attach_chart in the serving process
+        "chart": {"dates": future_dates, "values": [float(p) for p in predicted_prices]}
+    }
+    if market is not None:
+        result["market"] = served_market
+    return result
+
+def forecast_crop(crop):
+    """Default-window forecast for one crop (uncached); runs on a forecast worker thread or process"""
+    try:
+        return forecast_prices(crop)
+    except Exception as e:
+        return forecast_error(crop, e)
+
+def attach_chart(crop, result):
+    """Queue the forecast's chart and replace the plotted data with its URL"""
+    chart = result.pop("chart", None)
+    if chart is not None:
+        # Rendered off the request path; identical forecasts share one file
+        filename = chart_renderer.submit(crop, chart["dates"], chart["values"])
+        result["graph_url"] = f"http://localhost:8000/graphs/{filename}"
+    return result
+
+def forecast_error(crop, error):
+    return {"crop": crop, "error": str(error)}
+
+# Crops are independent, so they are forecast in parallel
+forecast_executor = ForecastExecutor()
+
+# Forecasts only change when a model or processed data file does
+forecast_cache = ForecastCache(
+    forecast_crop, crop_sources,
+    executor=forecast_executor, postprocess=attach_chart, on_error=forecast_error
+)
+
+def get_crop_forecast(crop, origin=None, weeks=None, state=None, market=None):
+    """
+    Forecast one crop for any origin date and horizon
+
+    Args:
+        crop: Crop name (KeyError if unknown)
+        origin: "YYYY-MM-DD" or datetime; defaults to DEFAULT_ORIGIN
+        weeks: Number of weekly steps (1..MAX_WEEKS); defaults to DEFAULT_WEEKS
+        state, market: Forecast with this market's model when one is trained (train_market_models.py),
+            else with the crop model; both or neither
+    """
+    if crop not in registry:
+        raise KeyError(crop)
+    if (state is None) != (market is None):
+        raise ValueError("state and market must be given together")
+    origin = parse_origin(origin)
+    weeks = DEFAULT_WEEKS if weeks is None else int(weeks)
+    if not 1 <= weeks <= MAX_WEEKS:
+        raise ValueError(f"weeks must be between 1 and {MAX_WEEKS}")
+
+    if market is None and origin in (None, DEFAULT_ORIGIN) and weeks == DEFAULT_WEEKS:
+        return forecast_cache.get(crop)
+    try:
+        return attach_chart(crop, forecast_prices(crop, origin or DEFAULT_ORIGIN, weeks, state, market))
+    except Exception as e:
+        return forecast_error(crop, e)
+
 def get_price_predictions():
-    all_results = []
-    today = datetime.strptime("2025-03-09", "%Y-%m-%d")
-    end_date = datetime.strptime("2025-04-12", "%Y-%m-%d")
-    weeks_ahead = (end_date - today).days // 7
-
-    for crop in models:
-        try:
-            model = joblib.load(models[crop])
-            data = pd.read_csv(os.path.join(DATA_DIR, f"{crop}_processed.csv"))
-            data["Reported Date"] = pd.to_datetime(data["Reported Date"])
-            data = data.sort_values(by="Reported Date")
-
-            future_dates = [today + timedelta(weeks=i) for i in range(1, weeks_ahead + 1)]
-            future_days = np.array([(d - data["Reported Date"].min()).days for d in future_dates])
-
-            arrivals_median = data["Arrivals (Tonnes)"].median()
-            min_price_median = data["Min Price (Rs./Quintal)"].median()
-            max_price_median = data["Max Price (Rs./Quintal)"].median()
-            price_range_median = max_price_median - min_price_median
-            demand_indicator_median = arrivals_median / (min_price_median + 1)
-            rolling_price_median = data["Rolling_Modal_Price"].median()
-            lag_1_month_median = data["Lag_1_Month"].median()
-            lag_2_months_median = data["Lag_2_Months"].median()
-            price_change_rate_median = data["Price_Change_Rate"].median()
-
-            demand_variation = np.linspace(0.95, 1.05, weeks_ahead)
-            price_change_variation = np.linspace(-0.02, 0.02, weeks_ahead)
-
-            input_data = pd.DataFrame({
-                "Days": future_days,
-                "Month": [d.month for d in future_dates],
-                "Arrivals (Tonnes)": arrivals_median * demand_variation,
-                "Min Price (Rs./Quintal)": min_price_median * demand_variation,
-                "Max Price (Rs./Quintal)": max_price_median * demand_variation,
-                "Price Range": price_range_median * demand_variation,
-                "Demand Indicator": demand_indicator_median * demand_variation,
-                "Rolling_Modal_Price": rolling_price_median * demand_variation,
-                "Lag_1_Month": lag_1_month_median * demand_variation,
-                "Lag_2_Months": lag_2_months_median * demand_variation,
-                "Price_Change_Rate": price_change_rate_median + price_change_variation
-            }, columns=FEATURE_NAMES)
-
-            predicted_prices = model.predict(input_data)
-
-            if crop == "banana":
-                unit = "Rs./Dozen"
-                prices = (predicted_prices / 100) * 1.5
-            else:
-                unit = "Rs./Kg"
-                prices = predicted_prices / 100
-
-            prediction_list = [
-                {"date": future_dates[i].strftime("%Y-%m-%d"), "price": round(prices[i], 2)}
-                for i in range(weeks_ahead)
-            ]
-
-
-            plt.figure(figsize=(10, 5))
-            plt.plot(future_dates, predicted_prices, linestyle="dotted", color="red", marker="x", label="Predicted Prices")
-            plt.xlabel("Date")
-            plt.ylabel("Modal Price (Rs./Quintal)")
-            plt.title(f"Prediction for {crop.capitalize()}")
-            plt.grid(True)
-            plt.legend()
-            plt.xticks(rotation=45)
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{crop}_prediction_{timestamp}.png"
-            filepath = os.path.join(GRAPH_DIR, filename)
-            plt.tight_layout()
-            plt.savefig(filepath)
-            plt.close()
-
-            print(f"✅ Saved plot for {crop} at {filepath}")
-
-            all_results.append({
-                "crop": crop,
-                "unit": unit,
-                "predictions": prediction_list,
-                "graph_url": f"http://localhost:8000/graphs/{filename}"  
-            })
-
-        except Exception as e:
-            all_results.append({
-                "crop": crop,
-                "error": str(e)
-            })
-
-    return all_results
+    """Forecasts for every crop, served from the forecast cache"""
+    return forecast_cache.get_many(registry.commodities())
+
+def warm_up_forecasts():
+    """Compute every forecast up front and start the background refresher"""
+    started = time.perf_counter()
+    results = get_price_predictions()
+    forecast_cache.start(registry.commodities())
+    return {
+        "warmup_seconds": round(time.perf_counter() - started, 3),
+        "crops": len(results),
+        "failed": [r["crop"] for r in results if "error" in r],
+    }
@@ -0,0 +1,183 @@
+"""
+Content-Addressed Prediction Cache
+In-process LRU (size + TTL eviction) with an optional on-disk store shared by all workers
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("PREDICTION_CACHE_SIZE", 1024))
+DEFAULT_TTL_SECONDS = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+DEFAULT_DISK_DIR = os.environ.get("PREDICTION_CACHE_DIR") or None
+
+
+def content_hash(contents):
+    """Hex digest identifying an upload by its bytes"""
+    return hashlib.blake2b(contents, digest_size=20).hexdigest()
+
+
+def model_fingerprint(model_path):
+    """Version string for a model file; changes whenever the file is replaced"""
+    stat = os.stat(model_path)
+    return f"{os.path.basename(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class PredictionCache:
+    """
+    Maps (upload content hash, model version) to a prediction result.
+    Seeing a new model version drops every in-memory entry, so results from a
+    previously loaded model are never served.
+    """
+
+    def __init__(self, name, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 disk_dir=DEFAULT_DISK_DIR):
+        """
+        Args:
+            name: Cache name (also the sub-directory of the disk store)
+            max_entries: Maximum in-memory entries before LRU eviction
+            ttl_seconds: Entry lifetime in memory and on disk
+            disk_dir: Optional shared directory for a second-level cache
+        """
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds)
+        self.disk_dir = os.path.join(disk_dir, name) if disk_dir else None
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version = None
+        self._stats = {
+            "hits": 0, "disk_hits": 0, "misses": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0,
+        }
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, digest, model_version):
+        """Cached result for an upload, or None"""
+        if model_version is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        key = self._key(digest, model_version)
+        now = time.time()
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return dict(result)
+                del self._entries[key]
+                self._stats["expirations"] += 1
+
+        result = self._read_disk(key, now)
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._store(key, result, now)
+        return dict(result)
+
+    def put(self, digest, model_version, result):
+        """Cache a successful result for an upload"""
+        if model_version is None:
+            return
+
+        key = self._key(digest, model_version)
+        now = time.time()
+        with self._lock:
+            self._check_version(model_version)
+            self._store(key, dict(result), now)
+        self._write_disk(key, model_version, result, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["hits"] + self._stats["disk_hits"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                ttl_seconds=self.ttl,
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+                model_version=self._model_version,
+                disk_dir=self.disk_dir,
+            )
+
+    def _key(self, digest, model_version):
+        return hashlib.blake2b(f"{model_version}|{digest}".encode(), digest_size=20).hexdigest()
+
+    def _check_version(self, model_version):
+        # Caller holds the lock
+        if model_version != self._model_version:
+            if self._model_version is not None:
+                logger.info(
+                    f"♻️ {self.name} model changed ({self._model_version} -> {model_version}), "
+                    f"dropping {len(self._entries)} cached predictions"
+                )
+                self._entries.clear()
+                self._stats["invalidations"] += 1
+            self._model_version = model_version
+
+    def _store(self, key, result, now):
+        # Caller holds the lock
+        self._entries[key] = (now + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("expires_at", 0) <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return record.get("result")
+
+    def _write_disk(self, key, model_version, result, now):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"model_version": model_version, "expires_at": now + self.ttl, "result": result}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not write {self.name} cache entry to disk: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
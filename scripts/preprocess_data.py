@@ -1,60 +1,317 @@
 import pandas as pd
+import numpy as np
 import os
+import io
+import json
+import hashlib
+import argparse
+
+import market_store
 
 file_paths = {
     "banana": "data/banana.csv",
-    "onion": "data/onion.csv",
+    "onion": "data/Onion.csv",
     "tomato": "data/tomato.csv",
     "wheat": "data/wheat.csv",
     "carrot": "data/carrot.csv"
 }
 
+DATE_FORMATS = ["%d %b %Y", "%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y"]
+MODAL_PRICE = "Modal Price (Rs./Quintal)"
+ROLLING_WINDOW = 30
+LAG_1_ROWS = 30
+LAG_2_ROWS = 60
 
-for crop, path in file_paths.items():
-    try:
+# Incremental state per crop, next to the processed CSV
+STATE_SUFFIX = "_state.json"
+STATE_VERSION = 2
+# Bytes hashed at the start of the raw file and just before the consumed offset to detect rewrites
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def processed_path_for(crop, processed_dir="processed_data"):
+    return os.path.join(processed_dir, f"{crop}_processed.csv")
+
+
+def state_path_for(crop, processed_dir="processed_data"):
+    return os.path.join(processed_dir, f"{crop}{STATE_SUFFIX}")
+
+
+def clean_dates(values):
+    """Date strings without padding or quotes ('"07 Oct 2024" ' -> "07 Oct 2024")"""
+    return values.astype(str).str.strip().str.replace('"', '')
+
+
+def detect_date_format(values, formats=DATE_FORMATS):
+    """First of ``formats`` that parses any of the (cleaned) values, or None"""
+    for fmt in formats:
+        if pd.to_datetime(values, format=fmt, errors="coerce").notna().any():
+            return fmt
+    return None
+
+
+def parse_dates(values, date_format=None):
+    """
+    Parse a whole column with one format: ``date_format``, or the first of DATE_FORMATS
+    that matches any value. Values in another format become NaT.
+    """
+    values = clean_dates(values)
+    date_format = date_format or detect_date_format(values)
+    if date_format is None:
+        return pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    return pd.to_datetime(values, format=date_format, errors="coerce")
+
+
+def rolling_mean(values, window=ROLLING_WINDOW):
+    """Mean of the last ``window`` non-missing values at each row (at least one). Each window is summed on
+    its own, so a row's value doesn't depend on how much history precedes it"""
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    counts = (~np.isnan(windows)).sum(axis=1)
+    sums = np.nansum(windows, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def add_features(data, min_date=None, modal_history=()):
+    """
+    Derived feature columns
+
+    Args:
+        data: Raw rows with parsed "Reported Date"
+        min_date: Date that Days counts from; defaults to the earliest date in ``data``
+        modal_history: Modal prices of the rows preceding ``data`` (incremental updates)
+    """
+    if min_date is None:
+        min_date = data["Reported Date"].min()
+    data["Days"] = (data["Reported Date"] - min_date).dt.days
+    data["Price Range"] = data["Max Price (Rs./Quintal)"] - data["Min Price (Rs./Quintal)"]
+    data["Demand Indicator"] = data["Arrivals (Tonnes)"] / (data[MODAL_PRICE] + 1)
+
+    history = len(modal_history)
+    modal = pd.Series(np.concatenate([np.asarray(modal_history, dtype=np.float64),
+                                      data[MODAL_PRICE].to_numpy(dtype=np.float64)]))
+    data["Rolling_Modal_Price"] = rolling_mean(modal.to_numpy())[history:]
+
+    data["Lag_1_Month"] = modal.shift(LAG_1_ROWS).bfill().to_numpy()[history:]
+    data["Lag_2_Months"] = modal.shift(LAG_2_ROWS).bfill().to_numpy()[history:]
+
+    data["Price_Change_Rate"] = (modal / modal.shift(1) - 1).fillna(0).to_numpy()[history:]
+    return data
 
-        data = pd.read_csv(path)
 
+def fill_missing(data):
+    """Fill missing numeric values with column medians; returns the number of cells that were missing"""
+    numeric_cols = data.select_dtypes(include=["number"]).columns
+    missing = int(data[numeric_cols].isna().sum().sum())
+    data[numeric_cols] = data[numeric_cols].fillna(data[numeric_cols].median())
+    return missing
 
-        data["Reported Date"] = data["Reported Date"].astype(str).str.strip().str.replace('"', '')
 
+def build_full(crop, raw_path, processed_dir="processed_data"):
+    """Rebuild the processed CSV for a crop from the whole raw file and reset its incremental state"""
+    data = pd.read_csv(raw_path)
+    raw_columns = list(data.columns)
 
-        date_formats = ["%d %b %Y", "%Y-%m-%d", "%m/%d/%Y", "%d-%m-%Y"]
-        for fmt in date_formats:
-            data["Reported Date"] = pd.to_datetime(data["Reported Date"], format=fmt, errors="coerce")
-            if data["Reported Date"].notna().sum() > 0:
-                print(f"✅ {crop.capitalize()} - Successfully converted dates using format: {fmt}")
-                break  
+    date_format = detect_date_format(clean_dates(data["Reported Date"]))
+    data["Reported Date"] = parse_dates(data["Reported Date"], date_format)
+    data = data.dropna(subset=["Reported Date"])
 
+    if len(data) == 0:
+        print(f"⚠️ Warning: No valid dates found for {crop}. Skipping processing.")
+        return None
 
-        data = data.dropna(subset=["Reported Date"])
+    data = add_features(data)
+    filled = fill_missing(data)
 
+    os.makedirs(processed_dir, exist_ok=True)
+    processed_file = processed_path_for(crop, processed_dir)
+    data.to_csv(processed_file, index=False)
+    market_store.write_dataset(data, processed_file)
 
-        if len(data) == 0:
-            print(f"⚠️ Warning: No valid dates found for {crop}. Skipping processing.")
-            continue  
+    state = {
+        "version": STATE_VERSION,
+        "crop": crop,
+        "raw_columns": raw_columns,
+        "date_format": date_format,
+        "dtypes": {column: str(dtype) for column, dtype in data.dtypes.items()},
+        "rows": len(data),
+        "min_date": data["Reported Date"].min().strftime("%Y-%m-%d"),
+        "modal_tail": data[MODAL_PRICE].to_numpy(dtype=np.float64)[-LAG_2_ROWS:].tolist(),
+        "filled_cells": filled,
+    }
+    _save_state(crop, state, raw_path, os.path.getsize(raw_path), processed_dir)
+    print(f"✅ Processed data saved: {processed_file} ({len(data)} rows, full rebuild)\n")
+    return data
 
-        data["Days"] = (data["Reported Date"] - data["Reported Date"].min()).dt.days
-        data["Price Range"] = data["Max Price (Rs./Quintal)"] - data["Min Price (Rs./Quintal)"]
-        data["Demand Indicator"] = data["Arrivals (Tonnes)"] / (data["Modal Price (Rs./Quintal)"] + 1)
 
-        data["Rolling_Modal_Price"] = data["Modal Price (Rs./Quintal)"].rolling(window=30, min_periods=1).mean()
+def update_incremental(crop, raw_path, processed_dir="processed_data"):
+    """
+    Append features for raw rows added since the last run
+
+    Rows are only appended when the result is identical to a full rebuild: the already
+    processed rows and their Days/lag/median values must not change. Anything else (a
+    rewritten raw or processed file, an earlier date, missing values, fewer than
+    LAG_2_ROWS rows of history, a column type change, dates in a format that a full
+    rebuild would pick over the saved one) falls back to ``build_full``.
+
+    Returns:
+        Number of rows appended, or None when a full rebuild was done instead
+    """
+    state, reason = _load_state(crop, raw_path, processed_dir)
+    if state is None:
+        print(f"🔄 {crop.capitalize()}: {reason}, rebuilding")
+        build_full(crop, raw_path, processed_dir)
+        return None
+
+    raw_size = os.path.getsize(raw_path)
+    with open(raw_path, "rb") as f:
+        f.seek(state["raw_offset"])
+        tail = f.read()
+    new = pd.read_csv(io.BytesIO(tail), header=None, names=state["raw_columns"]) if tail.strip() else None
+    if new is None or new.empty:
+        _save_state(crop, state, raw_path, raw_size, processed_dir)
+        print(f"✅ {crop.capitalize()}: no new rows")
+        return 0
+
+    raw_dates = clean_dates(new["Reported Date"])
+    new["Reported Date"] = parse_dates(raw_dates, state["date_format"])
+    new = new.dropna(subset=["Reported Date"])
+    reason = _incremental_blocker(state, new, raw_dates)
+    if reason is None and not new.empty:
+        new = add_features(new, pd.Timestamp(state["min_date"]), state["modal_tail"])
+        if new.select_dtypes(include=["number"]).isna().any().any():
+            reason = "new rows have missing feature values"
+        else:
+            new, reason = _cast_like(new, state["dtypes"])
+    if reason is not None:
+        print(f"🔄 {crop.capitalize()}: {reason}, rebuilding")
+        build_full(crop, raw_path, processed_dir)
+        return None
+
+    processed_file = processed_path_for(crop, processed_dir)
+    if not new.empty:
+        new.to_csv(processed_file, mode="a", header=False, index=False)
+        market_store.convert(processed_file)
+    state["rows"] += len(new)
+    state["modal_tail"] = (state["modal_tail"] + new[MODAL_PRICE].astype(np.float64).tolist())[-LAG_2_ROWS:]
+    _save_state(crop, state, raw_path, raw_size, processed_dir)
+    print(f"✅ {crop.capitalize()}: appended {len(new)} rows to {processed_file}")
+    return len(new)
+
+
+def _incremental_blocker(state, new, raw_dates):
+    """Why ``new`` can't simply be appended, or None"""
+    # The whole column is parsed with the first format any value matches
+    earlier_formats = DATE_FORMATS[:DATE_FORMATS.index(state["date_format"])]
+    if detect_date_format(raw_dates, earlier_formats) is not None:
+        return "new rows switch the date format"
+    if state["rows"] < LAG_2_ROWS:
+        return f"fewer than {LAG_2_ROWS} rows of history"
+    if state["filled_cells"]:
+        return "history has median-filled values"
+    if new.empty:
+        return None
+    if new["Reported Date"].min() < pd.Timestamp(state["min_date"]):
+        return "new rows predate the history"
+    for column in state["raw_columns"]:
+        if _is_numeric(state["dtypes"][column]) and \
+                (not pd.api.types.is_numeric_dtype(new[column]) or new[column].isna().any()):
+            return f"new rows have missing or non-numeric {column}"
+    return None
+
+
+def _is_numeric(dtype_name):
+    try:
+        return np.dtype(dtype_name).kind in "if"
+    except TypeError:  # pandas extension dtypes (strings)
+        return False
+
+
+def _cast_like(new, dtypes):
+    """Give appended rows the processed file's column types so they are written the same way"""
+    for column, name in dtypes.items():
+        if not _is_numeric(name) or new[column].dtype == np.dtype(name):
+            continue
+        values = new[column].to_numpy(dtype=np.float64)
+        if np.dtype(name).kind == "i" and not np.all(values == np.round(values)):
+            return new, f"{column} is no longer integral"
+        new[column] = values.astype(np.dtype(name))
+    return new, None
+
+
+def _file_fingerprint(path, offset):
+    with open(path, "rb") as f:
+        head = f.read(min(offset, FINGERPRINT_BYTES))
+        start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(start)
+        tail = f.read(offset - start)
+    return hashlib.sha1(head).hexdigest() + hashlib.sha1(tail).hexdigest()
+
+
+def _save_state(crop, state, raw_path, raw_offset, processed_dir):
+    processed_stat = os.stat(processed_path_for(crop, processed_dir))
+    state.update(
+        raw_path=os.path.abspath(raw_path),
+        raw_offset=raw_offset,
+        raw_fingerprint=_file_fingerprint(raw_path, raw_offset),
+        processed_size=processed_stat.st_size,
+        processed_mtime_ns=processed_stat.st_mtime_ns,
+    )
+    state_path = state_path_for(crop, processed_dir)
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def _load_state(crop, raw_path, processed_dir):
+    """(state, None) when the saved state still describes both files, else (None, reason)"""
+    try:
+        with open(state_path_for(crop, processed_dir), "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None, "no incremental state"
+    if state.get("version") != STATE_VERSION or state.get("raw_path") != os.path.abspath(raw_path):
+        return None, "incremental state is for another version or file"
+    try:
+        processed_stat = os.stat(processed_path_for(crop, processed_dir))
+    except OSError:
+        return None, "processed file is missing"
+    if (processed_stat.st_size, processed_stat.st_mtime_ns) != (state["processed_size"], state["processed_mtime_ns"]):
+        return None, "processed file changed since the last run"
+    if os.path.getsize(raw_path) < state["raw_offset"] or \
+            _file_fingerprint(raw_path, state["raw_offset"]) != state["raw_fingerprint"]:
+        return None, "raw file was rewritten"
+    return state, None
 
-        data["Lag_1_Month"] = data["Modal Price (Rs./Quintal)"].shift(30).bfill()
-        data["Lag_2_Months"] = data["Modal Price (Rs./Quintal)"].shift(60).bfill()
 
+def process_crop(crop, raw_path, processed_dir="processed_data", full=False, models_dir="models"):
+    if full:
+        result = build_full(crop, raw_path, processed_dir)
+    else:
+        result = update_incremental(crop, raw_path, processed_dir)
+    # New data changes the serving features even before the model is retrained
+    if any(os.path.exists(os.path.join(models_dir, f"{crop}{suffix}")) for suffix in ("_model.npz", "_model.ubj", "_model.pkl")):
+        from feature_store import file_sha1, materialize, materialized_data_sha1
 
-        data["Price_Change_Rate"] = data["Modal Price (Rs./Quintal)"].pct_change().fillna(0)
+        data_path = processed_path_for(crop, processed_dir)
+        if materialized_data_sha1(crop, models_dir) != file_sha1(data_path):
+            print(f"✅ Feature store saved: {materialize(crop, data_path, models_dir)}")
+    return result
 
-        numeric_cols = data.select_dtypes(include=["number"]).columns
-        data[numeric_cols] = data[numeric_cols].fillna(data[numeric_cols].median())
 
+def main():
+    parser = argparse.ArgumentParser(description="Build processed crop price data with model features")
+    parser.add_argument("--full", action="store_true", help="Rebuild every crop from scratch")
+    parser.add_argument("--crops", nargs="*", default=list(file_paths))
+    args = parser.parse_args()
 
-        os.makedirs("processed_data", exist_ok=True)
-        processed_file = f"processed_data/{crop}_processed.csv"
-        data.to_csv(processed_file, index=False)
+    for crop in args.crops:
+        try:
+            process_crop(crop, file_paths[crop], full=args.full)
+        except Exception as e:
+            print(f"❌ Error processing {crop}: {e}")
 
-        print(f"✅ Processed data saved: {processed_file}\n")
 
-    except Exception as e:
-        print(f"❌ Error processing {crop}: {e}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Bulk What-If Scenario Pricing
+Scores grids of arrival / demand / price-change scenarios for a crop with one vectorized model call
+"""
+
+import os
+import json
+import itertools
+from datetime import timedelta
+
+import numpy as np
+
+from predict_with_graph import (
+    FEATURE_INDEX, FEATURE_NAMES, DEFAULT_ORIGIN, MAX_WEEKS,
+    registry, feature_stats, cached, to_unit_prices, parse_origin,
+)
+
+# Upper bound on scenarios x weeks scored per request
+MAX_SCENARIO_ROWS = int(os.environ.get("SCENARIO_MAX_ROWS", 1_000_000))
+NDJSON_CHUNK_ROWS = int(os.environ.get("SCENARIO_NDJSON_CHUNK_ROWS", 10_000))
+
+# Scenario parameters and their neutral values (which reproduce the baseline forecast)
+#   arrival_shock: multiplier on market arrivals (and the demand indicator derived from them)
+#   demand: multiplier on arrivals and every price-level feature
+#   price_change: added to the price change rate
+SCENARIO_PARAMETERS = {"arrival_shock": 1.0, "demand": 1.0, "price_change": 0.0}
+
+
+def expand_scenarios(grid=None, scenarios=None):
+    """
+    Scenario parameters as equal-length arrays
+
+    Args:
+        grid: Dict of parameter -> list of values; every combination becomes a scenario
+        scenarios: List of dicts, one per scenario (missing parameters take neutral values)
+
+    Returns:
+        (params, axes): parameter arrays, and for a grid the value list of each axis
+        in SCENARIO_PARAMETERS order (None for explicit scenarios)
+    """
+    if (grid is None) == (scenarios is None):
+        raise ValueError("Provide exactly one of grid or scenarios")
+
+    if grid is not None:
+        unknown = set(grid) - set(SCENARIO_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+        axes = [np.asarray(grid.get(name, [neutral]), dtype=np.float64)
+                for name, neutral in SCENARIO_PARAMETERS.items()]
+        if any(axis.ndim != 1 or axis.size == 0 for axis in axes):
+            raise ValueError("Every grid parameter needs a non-empty list of values")
+        count = int(np.prod([axis.size for axis in axes]))
+        if count > MAX_SCENARIO_ROWS:
+            raise ValueError(f"Grid has {count} scenarios, the limit is {MAX_SCENARIO_ROWS}")
+        mesh = np.meshgrid(*axes, indexing="ij")
+        return {name: values.ravel() for name, values in zip(SCENARIO_PARAMETERS, mesh)}, dict(
+            zip(SCENARIO_PARAMETERS, axes)
+        )
+
+    if not scenarios:
+        raise ValueError("scenarios must not be empty")
+    if len(scenarios) > MAX_SCENARIO_ROWS:
+        raise ValueError(f"{len(scenarios)} scenarios requested, the limit is {MAX_SCENARIO_ROWS}")
+    unknown = set(itertools.chain.from_iterable(scenarios)) - set(SCENARIO_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+    return {
+        name: np.fromiter((s.get(name, neutral) for s in scenarios), dtype=np.float64, count=len(scenarios))
+        for name, neutral in SCENARIO_PARAMETERS.items()
+    }, None
+
+
+def build_scenario_matrix(stats, future_dates, params):
+    """
+    Feature matrix for every (week, scenario) pair, week-major, columns in FEATURE_NAMES order
+
+    Args:
+        stats: Per-crop feature statistics (see compute_feature_stats)
+        future_dates: One date per forecast week
+        params: Equal-length scenario parameter arrays (see expand_scenarios)
+    """
+    weeks, count = len(future_dates), len(params["demand"])
+    # Same weekly drift as the baseline forecast
+    demand_variation = np.repeat(np.linspace(0.95, 1.05, weeks), count)
+    price_change_variation = np.repeat(np.linspace(-0.02, 0.02, weeks), count)
+    demand = np.tile(params["demand"], weeks) * demand_variation
+    arrivals = demand * np.tile(params["arrival_shock"], weeks)
+
+    X = np.empty((weeks * count, len(FEATURE_NAMES)), dtype=np.float32)
+    X[:, FEATURE_INDEX["Days"]] = np.repeat([(d - stats["first_date"]).days for d in future_dates], count)
+    X[:, FEATURE_INDEX["Month"]] = np.repeat([d.month for d in future_dates], count)
+    X[:, FEATURE_INDEX["Arrivals (Tonnes)"]] = stats["arrivals"] * arrivals
+    X[:, FEATURE_INDEX["Min Price (Rs./Quintal)"]] = stats["min_price"] * demand
+    X[:, FEATURE_INDEX["Max Price (Rs./Quintal)"]] = stats["max_price"] * demand
+    X[:, FEATURE_INDEX["Price Range"]] = (stats["max_price"] - stats["min_price"]) * demand
+    X[:, FEATURE_INDEX["Demand Indicator"]] = stats["arrivals"] / (stats["min_price"] + 1) * arrivals
+    X[:, FEATURE_INDEX["Rolling_Modal_Price"]] = stats["rolling_price"] * demand
+    X[:, FEATURE_INDEX["Lag_1_Month"]] = stats["lag_1_month"] * demand
+    X[:, FEATURE_INDEX["Lag_2_Months"]] = stats["lag_2_months"] * demand
+    X[:, FEATURE_INDEX["Price_Change_Rate"]] = (
+        stats["price_change_rate"] + price_change_variation + np.tile(params["price_change"], weeks)
+    )
+    return X
+
+
+def score_scenarios(crop, grid=None, scenarios=None, origin=None, weeks=1):
+    """
+    Price every scenario for each of ``weeks`` weekly steps after ``origin``
+
+    Returns:
+        Dict with crop, unit, origin, weeks, count and ``columns``: NumPy arrays
+        week, arrival_shock, demand, price_change and price (in ``unit``), week-major.
+        Grid requests also carry ``axes`` (week first), whose C-order product matches the rows.
+    """
+    if crop not in registry:
+        raise KeyError(crop)
+    origin = parse_origin(origin) or DEFAULT_ORIGIN
+    weeks = int(weeks)
+    if not 1 <= weeks <= MAX_WEEKS:
+        raise ValueError(f"weeks must be between 1 and {MAX_WEEKS}")
+
+    params, axes = expand_scenarios(grid, scenarios)
+    count = len(params["demand"])
+    if count * weeks > MAX_SCENARIO_ROWS:
+        raise ValueError(f"{count} scenarios x {weeks} weeks exceeds the limit of {MAX_SCENARIO_ROWS} rows")
+
+    model = registry.get(crop)
+    stats = cached(feature_stats, crop)
+    future_dates = [origin + timedelta(weeks=i) for i in range(1, weeks + 1)]
+
+    X = build_scenario_matrix(stats, future_dates, params)
+    unit, prices = to_unit_prices(crop, model.predict(X, validate_features=False))
+
+    columns = {"week": np.repeat(np.arange(1, weeks + 1), count)}
+    columns.update({name: np.tile(values, weeks) for name, values in params.items()})
+    columns["price"] = np.round(prices.astype(np.float64), 2)
+    result = {
+        "crop": crop,
+        "unit": unit,
+        "origin": origin.strftime("%Y-%m-%d"),
+        "weeks": weeks,
+        "count": weeks * count,
+        "columns": columns,
+    }
+    if axes is not None:
+        result["axes"] = dict(week=np.arange(1, weeks + 1), **axes)
+    return result
+
+
+def _header(result):
+    return {key: value for key, value in result.items() if key not in ("columns", "axes")}
+
+
+def to_compact_json(result):
+    """
+    Compact JSON. Grids send their axes and a flat price array (row i is the i-th
+    C-order combination of the axes); explicit scenarios send one array per column.
+    """
+    payload = _header(result)
+    if "axes" in result:
+        payload["axes"] = {name: values.tolist() for name, values in result["axes"].items()}
+        payload["shape"] = [len(values) for values in result["axes"].values()]
+        payload["price"] = result["columns"]["price"].tolist()
+    else:
+        payload["columns"] = {name: values.tolist() for name, values in result["columns"].items()}
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def iter_ndjson(result, chunk_rows=NDJSON_CHUNK_ROWS):
+    """Newline-delimited JSON: a header line, then one line per scenario, yielded in chunks"""
+    yield json.dumps(_header(result), separators=(",", ":")) + "\n"
+
+    columns = result["columns"]
+    names = list(columns)
+    template = "{{" + ",".join(f'"{name}":{{}}' for name in names) + "}}"
+    for start in range(0, result["count"], chunk_rows):
+        rows = zip(*(columns[name][start:start + chunk_rows].tolist() for name in names))
+        yield "\n".join(template.format(*row) for row in rows) + "\n"
@@ -0,0 +1,181 @@
+"""
+Per-Market Price Model Training
+Trains one model per commodity/state/market partition across a process pool, skips partitions whose data hash
+is unchanged since their model was trained and writes the index MarketModelIndex serves from
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from model_registry import MARKET_INDEX_NAME, MARKET_MODELS_DIR
+from market_partitions import DEFAULT_ROOT, load_catalog
+from backtest_price_models import START_METHOD, walk_forward_folds
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("MARKET_TRAIN_MAX_WORKERS", os.cpu_count() or 1))
+# Partitions with fewer rows get no model (serving falls back to the commodity model)
+MIN_PARTITION_ROWS = int(os.environ.get("MARKET_TRAIN_MIN_ROWS", 30))
+INDEX_VERSION = 1
+
+
+def load_index(models_dir=MARKET_MODELS_DIR):
+    try:
+        with open(os.path.join(models_dir, MARKET_INDEX_NAME), "r") as f:
+            return json.load(f).get("models", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(models, models_dir=MARKET_MODELS_DIR):
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, MARKET_INDEX_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"version": INDEX_VERSION, "models": dict(sorted(models.items()))}, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def plan(catalog, index, models_dir=MARKET_MODELS_DIR, force=False, min_rows=MIN_PARTITION_ROWS):
+    """
+    Split the catalog into partitions to train, up-to-date ones and ones too small
+
+    A partition is up to date when the index holds a model trained on the same data hash,
+    that model file still exists and the entry records the data file serving reads.
+
+    Returns:
+        (to_train, unchanged, too_small): lists of partition keys, to_train largest first
+    """
+    to_train, unchanged, too_small = [], [], []
+    for key, partition in catalog.items():
+        if partition["rows"] < min_rows:
+            too_small.append(key)
+            continue
+        entry = index.get(key)
+        if not force and entry is not None and entry["data_hash"] == partition["data_hash"] and "data" in entry and \
+                os.path.exists(os.path.join(models_dir, entry["model"])):
+            unchanged.append(key)
+        else:
+            to_train.append(key)
+    to_train.sort(key=lambda key: -catalog[key]["rows"])
+    return to_train, unchanged, too_small
+
+
+def _train_partition(task):
+    """Fit and compile one partition's model; runs in a worker"""
+    from xgboost import XGBRegressor
+
+    from compiled_trees import compile_model
+    from train_models import FEATURES, load_training_data, model_params, training_matrix
+
+    key, partition, data_root, models_dir, commodity_models_dir = task
+    started = time.perf_counter()
+    data_path = os.path.join(data_root, partition["path"])
+    data = load_training_data(data_path)
+    X, y, _ = training_matrix(data)
+
+    # Score the last walk-forward fold, as train_models.py does for the commodity models
+    folds = walk_forward_folds(len(X))
+    train_end, test_start, test_end = folds[-1] if folds else (len(X), len(X), len(X))
+    model = XGBRegressor(**dict(model_params(partition["commodity"], commodity_models_dir), n_jobs=1))
+    model.fit(X[:train_end], y[:train_end])
+    mae = None
+    if test_end > test_start:
+        mae = float(np.mean(np.abs(model.predict(X[test_start:test_end]) - y[test_start:test_end])))
+
+    model_dir = os.path.join(models_dir, *os.path.dirname(key).split("/"))
+    path = compile_model(model, model_dir, os.path.basename(key), FEATURES)
+    return key, {
+        "model": os.path.relpath(path, models_dir),
+        # Serving builds the market's forecast features from it
+        "data": os.path.relpath(data_path, models_dir),
+        "commodity": partition["commodity"],
+        "state": partition["state"],
+        "market": partition["market"],
+        "data_hash": partition["data_hash"],
+        "rows": partition["rows"],
+        "last_date": partition["last_date"],
+        "mae": mae,
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "fit_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def train_partitions(data_root=DEFAULT_ROOT, models_dir=MARKET_MODELS_DIR, max_workers=DEFAULT_MAX_WORKERS,
+                     force=False, min_rows=MIN_PARTITION_ROWS, commodity_models_dir=None):
+    """
+    Train every partition whose data changed and rewrite the index
+
+    Index entries of partitions that left the catalog are dropped; a partition whose
+    training fails keeps its previous entry (if any) and is reported in ``failed``.
+
+    Returns:
+        Dict with the index and the trained / unchanged / too_small / failed keys
+    """
+    commodity_models_dir = commodity_models_dir or os.path.join(REPO_ROOT, "models")
+    catalog = load_catalog(data_root)
+    index = {key: entry for key, entry in load_index(models_dir).items() if key in catalog}
+    to_train, unchanged, too_small = plan(catalog, index, models_dir, force, min_rows)
+    tasks = [(key, catalog[key], data_root, models_dir, commodity_models_dir) for key in to_train]
+
+    trained, failed = [], {}
+    try:
+        if max_workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                try:
+                    key, entry = _train_partition(task)
+                    index[key] = entry
+                    trained.append(key)
+                except Exception as e:
+                    failed[task[0]] = str(e)
+        else:
+            context = multiprocessing.get_context(START_METHOD)
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)), mp_context=context) as pool:
+                futures = {pool.submit(_train_partition, task): task[0] for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        key, entry = future.result()
+                        index[key] = entry
+                        trained.append(key)
+                    except Exception as e:
+                        failed[futures[future]] = str(e)
+    finally:
+        # Whatever finished is kept, so an interrupted run doesn't retrain it
+        save_index(index, models_dir)
+    return {"index": index, "trained": trained, "unchanged": unchanged, "too_small": too_small, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train one price model per commodity/state/market partition")
+    parser.add_argument("--data-root", default=DEFAULT_ROOT)
+    parser.add_argument("--models-dir", default=MARKET_MODELS_DIR)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--min-rows", type=int, default=MIN_PARTITION_ROWS)
+    parser.add_argument("--force", action="store_true", help="Retrain partitions whose data is unchanged")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = train_partitions(args.data_root, args.models_dir, args.workers, args.force, args.min_rows)
+    for key in sorted(result["trained"]):
+        entry = result["index"][key]
+        mae = f"MAE {entry['mae']:.2f}" if entry["mae"] is not None else "no holdout"
+        print(f"✅ {key}: {entry['rows']} rows, {mae}")
+    for key, error in result["failed"].items():
+        print(f"❌ {key}: {error}")
+    print(f"\n⏱️ {len(result['trained'])} trained, {len(result['unchanged'])} unchanged, "
+          f"{len(result['too_small'])} below {args.min_rows} rows, {len(result['failed'])} failed "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
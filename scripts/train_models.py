@@ -1,64 +1,118 @@
 import pandas as pd
+import numpy as np
 import joblib
 import os
+import json
 from sklearn.model_selection import TimeSeriesSplit
 from xgboost import XGBRegressor
 from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
 
+from native_models import export_native
+from compiled_trees import compile_model
+from feature_store import load_feature_data, materialize
+
 processed_files = {
     "banana": "processed_data/banana_processed.csv",
-    "onion": "processed_data/onioacn_processed.csv",
+    "onion": "processed_data/onion_processed.csv",
     "tomato": "processed_data/tomato_processed.csv",
     "wheat": "processed_data/wheat_processed.csv",
     "carrot": "processed_data/carrot_processed.csv"
 }
 
-for crop, path in processed_files.items():
-    try:
-        data = pd.read_csv(path)
-
-        if data.empty:
-            print(f"⚠️ Warning: {crop.capitalize()} dataset is empty. Skipping training.")
-            continue
-
-        data["Reported Date"] = pd.to_datetime(data["Reported Date"])
-        data["Days"] = (data["Reported Date"] - data["Reported Date"].min()).dt.days
-        data["Month"] = data["Reported Date"].dt.month
-
-        features = ["Days", "Month", "Arrivals (Tonnes)", "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)", 
-                    "Price Range", "Demand Indicator", "Rolling_Modal_Price", "Lag_1_Month", "Lag_2_Months", "Price_Change_Rate"]
-        target = "Modal Price (Rs./Quintal)"
-
-        X = data[features]
-        y = data[target]
-
-        n_splits = min(6, len(X) - 1)  
-        if n_splits < 2:
-            print(f"⚠️ Warning: Not enough data for time-series split in {crop}. Using simple train-test split.")
-            X_train, X_test = X.iloc[:-1], X.iloc[-1:]
-            y_train, y_test = y.iloc[:-1], y.iloc[-1:]
-        else:
-            tscv = TimeSeriesSplit(n_splits=n_splits)
-            for train_index, test_index in tscv.split(X):
-                X_train, X_test = X.iloc[train_index], X.iloc[test_index]
-                y_train, y_test = y.iloc[train_index], y.iloc[test_index]
-
-        model = XGBRegressor(n_estimators=300, learning_rate=0.03, objective="reg:squarederror", random_state=42)
-        model.fit(X_train, y_train)
-
-        y_pred = model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        mape = mean_absolute_percentage_error(y_test, y_pred)
-        accuracy = 100 - (mape * 100)
-
-        print(f"✅ {crop.upper()} Model Trained!")
-        print(f"📉 MAE: {mae:.2f}")
-        print(f"📈 Approx Accuracy: {accuracy:.2f}%")
-
-        os.makedirs("models", exist_ok=True)
-        model_file = f"models/{crop}_model.pkl"
-        joblib.dump(model, model_file)
-        print(f"✅ Model saved: {model_file}")
-
-    except Exception as e:
-        print(f"❌ Error training model for {crop}: {e}")
+FEATURES = ["Days", "Month", "Arrivals (Tonnes)", "Min Price (Rs./Quintal)", "Max Price (Rs./Quintal)",
+            "Price Range", "Demand Indicator", "Rolling_Modal_Price", "Lag_1_Month", "Lag_2_Months", "Price_Change_Rate"]
+TARGET = "Modal Price (Rs./Quintal)"
+
+MODEL_PARAMS = {"n_estimators": 300, "learning_rate": 0.03, "objective": "reg:squarederror", "random_state": 42}
+
+# Tuned parameters written by tune_price_models.py, next to the model
+PARAMS_SUFFIX = "_params.json"
+
+
+def model_params(crop, models_dir="models"):
+    """Tuned parameters for a crop if a sweep saved them, else MODEL_PARAMS"""
+    path = os.path.join(models_dir, f"{crop}{PARAMS_SUFFIX}")
+    if not os.path.exists(path):
+        return dict(MODEL_PARAMS)
+    with open(path, "r") as f:
+        return dict(MODEL_PARAMS, **json.load(f)["params"])
+
+
+# Stored columns training reads; Days and Month are derived from the date
+TRAINING_COLUMNS = ["Reported Date", TARGET] + [name for name in FEATURES if name not in ("Days", "Month")]
+
+
+def load_training_data(path, columns=TRAINING_COLUMNS):
+    """Processed crop data with the date-derived features (Days since the first report, Month)"""
+    return load_feature_data(path, columns)
+
+
+def training_matrix(data, features=FEATURES):
+    """(X, y, dates) as NumPy arrays: float32 features in ``features`` order, float64 target"""
+    X = data[features].to_numpy(dtype=np.float32)
+    y = data[TARGET].to_numpy(dtype=np.float64)
+    return X, y, data["Reported Date"].to_numpy()
+
+
+def train_crop(crop, path, models_dir="models"):
+    data = load_training_data(path)
+
+    if data.empty:
+        print(f"⚠️ Warning: {crop.capitalize()} dataset is empty. Skipping training.")
+        return None
+
+    X = data[FEATURES]
+    y = data[TARGET]
+
+    n_splits = min(6, len(X) - 1)
+    if n_splits < 2:
+        print(f"⚠️ Warning: Not enough data for time-series split in {crop}. Using simple train-test split.")
+        X_train, X_test = X.iloc[:-1], X.iloc[-1:]
+        y_train, y_test = y.iloc[:-1], y.iloc[-1:]
+    else:
+        tscv = TimeSeriesSplit(n_splits=n_splits)
+        for train_index, test_index in tscv.split(X):
+            X_train, X_test = X.iloc[train_index], X.iloc[test_index]
+            y_train, y_test = y.iloc[train_index], y.iloc[test_index]
+
+    model = XGBRegressor(**model_params(crop, models_dir))
+    model.fit(X_train, y_train)
+
+    y_pred = model.predict(X_test)
+    mae = mean_absolute_error(y_test, y_pred)
+    mape = mean_absolute_percentage_error(y_test, y_pred)
+    accuracy = 100 - (mape * 100)
+
+    print(f"✅ {crop.upper()} Model Trained!")
+    print(f"📉 MAE: {mae:.2f}")
+    print(f"📈 Approx Accuracy: {accuracy:.2f}%")
+
+    os.makedirs(models_dir, exist_ok=True)
+    model_file = f"{models_dir}/{crop}_model.pkl"
+    joblib.dump(model, model_file)
+    print(f"✅ Model saved: {model_file}")
+
+    # Native booster + feature schema: loads without unpickling and stays readable by newer XGBoost releases
+    native_file = export_native(model, models_dir, crop, FEATURES, TARGET)
+    print(f"✅ Native model saved: {native_file}")
+
+    # Flat NumPy tree arrays: what the API serves, without xgboost or pandas
+    compiled_file = compile_model(model, models_dir, crop, FEATURES)
+    print(f"✅ Compiled model saved: {compiled_file}")
+
+    # Forecast inputs computed from this same data, versioned with the files just written
+    features_file = materialize(crop, path, models_dir, data=data)
+    print(f"✅ Feature store saved: {features_file}")
+    return model
+
+
+def main():
+    for crop, path in processed_files.items():
+        try:
+            train_crop(crop, path)
+        except Exception as e:
+            print(f"❌ Error training model for {crop}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Price Model Hyperparameter Sweep
+Searches per-crop XGBoost parameters over a process pool with successive halving and early stopping on walk-forward
+validation folds; feature matrices live in shared memory so workers never copy them
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from train_models import MODEL_PARAMS, PARAMS_SUFFIX, processed_files
+from backtest_price_models import START_METHOD, load_crop_matrices, walk_forward_folds
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_CONFIGS = int(os.environ.get("TUNE_CONFIGS", 27))
+DEFAULT_MAX_ROUNDS = int(os.environ.get("TUNE_MAX_ROUNDS", 900))
+DEFAULT_MIN_ROUNDS = int(os.environ.get("TUNE_MIN_ROUNDS", 50))
+DEFAULT_ETA = int(os.environ.get("TUNE_ETA", 3))
+DEFAULT_FOLDS = int(os.environ.get("TUNE_FOLDS", 3))
+DEFAULT_EARLY_STOPPING = int(os.environ.get("TUNE_EARLY_STOPPING_ROUNDS", 30))
+DEFAULT_MAX_WORKERS = int(os.environ.get("TUNE_MAX_WORKERS", os.cpu_count() or 1))
+
+# Values sampled for each configuration (the training defaults are always evaluated as well)
+SEARCH_SPACE = {
+    "learning_rate": [0.01, 0.03, 0.05, 0.1, 0.2],
+    "max_depth": [2, 3, 4, 6, 8],
+    "min_child_weight": [1, 2, 4, 8],
+    "subsample": [0.6, 0.8, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0],
+    "reg_lambda": [0.1, 1.0, 5.0, 20.0],
+}
+
+# Worker-side views onto the shared matrices: crop -> (X, y); the SharedMemory handles stay referenced
+_arrays = {}
+_handles = []
+
+
+def sample_configs(count, seed=42):
+    """``count`` distinct configurations: the training defaults first, then random draws from SEARCH_SPACE"""
+    rng = np.random.default_rng(seed)
+    configs = [{}]
+    seen = {()}
+    attempts = 0
+    while len(configs) < count and attempts < count * 50:
+        attempts += 1
+        config = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        config = {name: value.item() if hasattr(value, "item") else value for name, value in config.items()}
+        key = tuple(sorted(config.items()))
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def rung_budgets(n_configs, min_rounds=DEFAULT_MIN_ROUNDS, max_rounds=DEFAULT_MAX_ROUNDS, eta=DEFAULT_ETA):
+    """Boosting-round budget per successive-halving rung, ending at ``max_rounds``"""
+    rungs = max(1, min(int(math.log(max(n_configs, 1), eta)) + 1,
+                       int(math.log(max_rounds / min_rounds, eta)) + 1))
+    return [int(round(max_rounds / eta ** (rungs - 1 - r))) for r in range(rungs)]
+
+
+def share_matrices(matrices):
+    """
+    Copy each crop's X and y into shared memory once
+
+    Returns:
+        (specs, handles): specs map crop -> {"X": (name, shape, dtype), "y": ...} for workers
+        to attach; the caller closes and unlinks the handles when done
+    """
+    specs, handles = {}, []
+    try:
+        for crop, (X, y, _) in matrices.items():
+            specs[crop] = {}
+            for key, array in (("X", X), ("y", y)):
+                handle = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                handles.append(handle)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=handle.buf)[...] = array
+                specs[crop][key] = (handle.name, array.shape, array.dtype.str)
+    except Exception:
+        release_shared(handles)
+        raise
+    return specs, handles
+
+
+def release_shared(handles):
+    for handle in handles:
+        handle.close()
+        try:
+            handle.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Older Pythons register the block again, but with the parent's resource tracker
+        # (spawned workers share it), so the parent's unlink still releases it exactly once
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(specs):
+    _arrays.clear()
+    for crop, spec in specs.items():
+        views = []
+        for key in ("X", "y"):
+            name, shape, dtype = spec[key]
+            handle = _attach(name)
+            _handles.append(handle)
+            views.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=handle.buf))
+        _arrays[crop] = tuple(views)
+
+
+def _evaluate(task):
+    """Fit one configuration on one fold with early stopping; returns the best validation MAE and round"""
+    from xgboost import XGBRegressor
+
+    crop, config_id, params, rounds, (train_end, test_start, test_end), early_stopping = task
+    X, y = _arrays[crop]
+    model = XGBRegressor(**dict(params, n_estimators=rounds, n_jobs=1, eval_metric="mae",
+                                early_stopping_rounds=early_stopping))
+    model.fit(X[:train_end], y[:train_end], eval_set=[(X[test_start:test_end], y[test_start:test_end])],
+              verbose=False)
+    history = model.evals_result()["validation_0"]["mae"]
+    best = int(np.argmin(history))
+    return crop, config_id, float(history[best]), best + 1
+
+
+def _run_tasks(pool, tasks, max_workers):
+    if pool is None:
+        return [_evaluate(task) for task in tasks]
+    return list(pool.map(_evaluate, tasks, chunksize=max(1, len(tasks) // (max_workers * 4))))
+
+
+def sweep(matrices, n_configs=DEFAULT_CONFIGS, n_folds=DEFAULT_FOLDS, min_rounds=DEFAULT_MIN_ROUNDS,
+          max_rounds=DEFAULT_MAX_ROUNDS, eta=DEFAULT_ETA, early_stopping=DEFAULT_EARLY_STOPPING,
+          max_workers=DEFAULT_MAX_WORKERS, seed=42):
+    """
+    Successive halving per crop: every configuration gets the smallest round budget on the
+    last ``n_folds`` walk-forward folds, the best 1/eta move on to ``eta`` times the budget,
+    and so on up to ``max_rounds``. Every rung of every crop runs as one parallel batch.
+
+    Returns:
+        crop -> result dict with params (best, ready for XGBRegressor), cv_mae,
+        baseline_cv_mae, n_estimators and the rung history
+    """
+    configs = sample_configs(n_configs, seed)
+    budgets = rung_budgets(len(configs), min_rounds, max_rounds, eta)
+    folds = {crop: walk_forward_folds(len(X))[-n_folds:] for crop, (X, _, _) in matrices.items()}
+    alive = {crop: list(range(len(configs))) for crop in matrices if folds[crop]}
+    history = {crop: [] for crop in alive}
+    scores = {}
+
+    specs, handles = share_matrices({crop: matrices[crop] for crop in alive})
+    pool = None
+    try:
+        if max_workers > 1:
+            # One pool for every rung: workers attach to the shared matrices once
+            pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(START_METHOD),
+                                       initializer=_init_worker, initargs=(specs,))
+        else:
+            _arrays.clear()
+            _arrays.update({crop: (X, y) for crop, (X, y, _) in matrices.items()})
+        for rung, rounds in enumerate(budgets):
+            tasks = [
+                (crop, config_id, dict(MODEL_PARAMS, **configs[config_id]), rounds, window, early_stopping)
+                for crop, config_ids in alive.items()
+                for config_id in config_ids
+                for window in folds[crop]
+            ]
+            started = time.perf_counter()
+            fold_results = {}
+            for crop, config_id, mae, best_rounds in _run_tasks(pool, tasks, max_workers):
+                fold_results.setdefault((crop, config_id), []).append((mae, best_rounds))
+
+            for crop, config_ids in alive.items():
+                ranked = sorted(config_ids, key=lambda c: np.mean([m for m, _ in fold_results[(crop, c)]]))
+                for config_id in config_ids:
+                    results = fold_results[(crop, config_id)]
+                    scores[(crop, config_id)] = (
+                        float(np.mean([m for m, _ in results])),
+                        int(np.median([r for _, r in results])),
+                        rounds,
+                    )
+                history_row = {"rung": rung, "rounds": rounds, "configs": len(config_ids),
+                               "best_cv_mae": scores[(crop, ranked[0])][0]}
+                history[crop].append(history_row)
+                if rung < len(budgets) - 1:
+                    alive[crop] = ranked[:max(1, len(ranked) // eta)]
+            print(f"🔎 Rung {rung}: {len(tasks)} fits at {rounds} rounds in {time.perf_counter() - started:.1f}s")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        release_shared(handles)
+
+    results = {}
+    for crop, config_ids in alive.items():
+        best = min(config_ids, key=lambda c: scores[(crop, c)][0])
+        cv_mae, best_rounds, _ = scores[(crop, best)]
+        baseline = scores[(crop, 0)]
+        results[crop] = {
+            "params": dict(MODEL_PARAMS, **configs[best], n_estimators=max(best_rounds, 1)),
+            "cv_mae": cv_mae,
+            # The defaults may have been halved out early; their score is at the budget they reached
+            "baseline_cv_mae": baseline[0],
+            "baseline_rounds": baseline[2],
+            "folds": len(folds[crop]),
+            "configs_searched": len(configs),
+            "rungs": history[crop],
+        }
+    return results
+
+
+def save_params(crop, result, models_dir):
+    """Write ``<models_dir>/<crop>_params.json`` next to the crop's model"""
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, f"{crop}{PARAMS_SUFFIX}")
+    with open(path, "w") as f:
+        json.dump(dict(result, crop=crop, tuned_at=datetime.now().isoformat(timespec="seconds")), f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune per-crop XGBoost price model parameters")
+    parser.add_argument("--crops", nargs="*", default=list(processed_files))
+    parser.add_argument("--configs", type=int, default=DEFAULT_CONFIGS)
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS, help="Most recent walk-forward folds to validate on")
+    parser.add_argument("--min-rounds", type=int, default=DEFAULT_MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS)
+    parser.add_argument("--eta", type=int, default=DEFAULT_ETA, help="Halving rate")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--models-dir", default=os.path.join(REPO_ROOT, "models"))
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing parameter files")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    matrices = load_crop_matrices(args.crops)
+    if not matrices:
+        print("❌ No crop data to tune")
+        sys.exit(1)
+    results = sweep(matrices, args.configs, args.folds, args.min_rounds, args.max_rounds, args.eta,
+                    max_workers=args.workers, seed=args.seed)
+
+    for crop, result in results.items():
+        tuned = {k: v for k, v in result["params"].items() if k in SEARCH_SPACE or k == "n_estimators"}
+        print(f"✅ {crop}: CV MAE {result['cv_mae']:.2f} (defaults {result['baseline_cv_mae']:.2f}) {tuned}")
+        if not args.dry_run:
+            print(f"   📄 {save_params(crop, result, args.models_dir)}")
+    print(f"\n⏱️ Sweep finished in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script to verify price charts are content-addressed and kept within the store budget
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from chart_store import ChartRenderer
+
+
+def test_identical_forecasts_share_one_chart():
+    """Same forecast data -> same file name, rendered once; different data -> new file"""
+    print("🧪 Testing content-addressed chart rendering...")
+
+    dates = [datetime(2025, 3, 9) + timedelta(weeks=i) for i in range(1, 5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        renderer = ChartRenderer(tmp)
+
+        first = renderer.submit("onion", dates, [2100.0, 2150.0, 2200.0, 2250.0])
+        assert renderer.ensure(first), "Chart was not rendered"
+        second = renderer.submit("onion", dates, [2100.0, 2150.0, 2200.0, 2250.0])
+        assert second == first
+        assert renderer.stats()["rendered"] == 1
+        print(f"✅ Identical forecast reused {first}")
+
+        changed = renderer.submit("onion", dates, [2100.0, 2150.0, 2200.0, 2300.0])
+        assert changed != first and renderer.ensure(changed)
+        print("✅ Changed forecast rendered to a new file")
+
+
+def test_store_is_evicted_to_budget():
+    """Old charts are evicted once the directory exceeds its size budget; evicted charts re-render on demand"""
+    print("🧪 Testing chart store eviction...")
+
+    dates = [datetime(2025, 3, 9) + timedelta(weeks=i) for i in range(1, 5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        renderer = ChartRenderer(tmp, max_bytes=1)
+
+        names = [renderer.submit("wheat", dates, [2000.0 + i] * 4) for i in range(3)]
+        for name in names:
+            renderer.ensure(name)
+        renderer.evict()
+        remaining = [name for name in names if os.path.exists(os.path.join(tmp, name))]
+        assert len(remaining) <= 1, f"Expected the store to be evicted, found {remaining}"
+        print(f"✅ Evicted {renderer.stats()['evicted']} chart(s)")
+
+        assert renderer.ensure(names[0]), "Evicted chart was not re-rendered"
+        print("✅ Evicted chart re-rendered on demand")
+
+
+if __name__ == "__main__":
+    test_identical_forecasts_share_one_chart()
+    test_store_is_evicted_to_budget()
+    print("\n✅ All chart store tests passed!")
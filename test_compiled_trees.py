@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script to verify compiled NumPy tree ensembles reproduce the XGBoost price models
+"""
+
+import os
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from compiled_trees import CompiledTreeModel, compile_model
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def random_features(model, rows, seed=0):
+    """Feature rows spanning each feature's split thresholds, with some missing values and exact ties"""
+    rng = np.random.default_rng(seed)
+    X = np.empty((rows, model.num_features), dtype=np.float32)
+    for f in range(model.num_features):
+        thresholds = model.threshold[(model.feature == f) & np.isfinite(model.threshold)]
+        low, high = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+        X[:, f] = rng.uniform(low - 1, high + 1, rows)
+        if len(thresholds):
+            ties = rng.random(rows) < 0.05
+            X[ties, f] = rng.choice(thresholds, ties.sum())
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X
+
+
+def test_compiled_models_match_xgboost():
+    """Both evaluators agree with XGBoost on every price model, including NaNs and threshold ties"""
+    print("🧪 Testing compiled tree ensembles...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for crop in ("banana", "onion", "tomato", "wheat", "carrot"):
+            pickled = joblib.load(os.path.join(MODELS_DIR, f"{crop}_model.pkl"))
+            compiled = CompiledTreeModel(compile_model(pickled, tmp, crop))
+            assert compiled.bitvector, f"{crop}: bitvector tables missing"
+
+            X = random_features(compiled, 2000)
+            expected = pickled.get_booster().inplace_predict(X)
+            np.testing.assert_allclose(compiled.predict(X), expected, rtol=1e-5)
+
+            compiled.bitvector = False
+            np.testing.assert_allclose(compiled.predict(X), expected, rtol=1e-5)
+            print(f"✅ {crop}: {compiled.num_trees} trees match XGBoost")
+
+
+def test_repository_artifacts_are_current():
+    """The committed .npz files are compiled from the committed pickles"""
+    print("🧪 Testing committed compiled models...")
+    for crop in ("banana", "onion", "tomato", "wheat", "carrot"):
+        pickled = joblib.load(os.path.join(MODELS_DIR, f"{crop}_model.pkl"))
+        compiled = CompiledTreeModel(os.path.join(MODELS_DIR, f"{crop}_model.npz"))
+        X = random_features(compiled, 200, seed=1)
+        np.testing.assert_allclose(compiled.predict(X), pickled.get_booster().inplace_predict(X), rtol=1e-5)
+        assert compiled.feature_names == pickled.get_booster().feature_names
+    print("✅ Committed compiled models are current")
+
+
+if __name__ == "__main__":
+    test_compiled_models_match_xgboost()
+    test_repository_artifacts_are_current()
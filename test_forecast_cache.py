@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script to verify market forecasts are cached and refreshed when their files change
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from forecast_cache import ForecastCache
+
+
+def test_forecasts_computed_once_and_refreshed_in_background():
+    """Requests hit memory; a changed source file is recomputed off the request path"""
+    print("🧪 Testing forecast cache...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "onion_processed.csv")
+        with open(data_path, "w") as f:
+            f.write("v1")
+
+        calls = []
+
+        def compute(crop):
+            calls.append(crop)
+            with open(data_path) as f:
+                return {"crop": crop, "data": f.read()}
+
+        cache = ForecastCache(compute, lambda crop: [data_path], refresh_interval=0.05)
+
+        assert cache.get("onion")["data"] == "v1"
+        assert cache.get("onion")["data"] == "v1"
+        assert calls == ["onion"], f"Expected a single computation, got {calls}"
+        print("✅ Repeated requests served from memory")
+
+        cache.start(["onion"])
+        try:
+            with open(data_path, "w") as f:
+                f.write("v2 with a different size")
+            # The stale forecast is served until the refresher replaces it
+            assert cache.get("onion")["data"] in ("v1", "v2 with a different size")
+
+            deadline = time.time() + 5
+            while cache.get("onion")["data"] != "v2 with a different size" and time.time() < deadline:
+                time.sleep(0.02)
+            assert cache.get("onion")["data"] == "v2 with a different size"
+            assert calls == ["onion", "onion"], f"Expected one refresh, got {calls}"
+            print("✅ Changed data file refreshed in the background")
+        finally:
+            cache.stop()
+
+        stats = cache.stats()
+        assert stats["misses"] == 1 and stats["refreshes"] == 1
+        print(f"📊 Stats: hits={stats['hits']}, stale_hits={stats['stale_hits']}, refreshes={stats['refreshes']}")
+
+
+def test_failed_recompute_without_refresher():
+    """Without a refresher a failing recompute runs once per request and keeps the last good result"""
+    print("🧪 Testing inline refresh failures...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "onion_processed.csv")
+        with open(data_path, "w") as f:
+            f.write("v1")
+
+        calls = []
+
+        def compute(crop):
+            calls.append(crop)
+            with open(data_path) as f:
+                data = f.read()
+            if data != "v1":
+                raise ValueError(f"cannot parse {data!r}")
+            return {"crop": crop, "data": data}
+
+        cache = ForecastCache(compute, lambda crop: [data_path])
+        assert cache.get("onion")["data"] == "v1"
+
+        with open(data_path, "w") as f:
+            f.write("corrupt rows")
+        assert cache.get("onion")["data"] == "v1"
+        assert cache.get("onion")["data"] == "v1"
+        assert len(calls) == 3, f"Expected one recompute per request, got {len(calls)}"
+        assert cache.stats()["refresh_errors"] == 2
+        print("✅ Failed recompute served the previous forecast without looping")
+
+        # A key that never succeeded is retried even though its files are unchanged
+        attempts = []
+
+        def flaky(crop):
+            attempts.append(crop)
+            if len(attempts) == 1:
+                raise OSError("model still being copied")
+            return {"crop": crop}
+
+        broken = ForecastCache(flaky, lambda crop: [data_path])
+        assert "error" in broken.get("onion")
+        assert broken.get("onion") == {"crop": "onion"} and len(attempts) == 2
+        assert broken.get("onion") == {"crop": "onion"} and len(attempts) == 2
+        print("✅ Failed entry retried on the next request")
+
+
+if __name__ == "__main__":
+    test_forecasts_computed_once_and_refreshed_in_background()
+    test_failed_recompute_without_refresher()
+    print("\n✅ All forecast cache tests passed!")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-crop forecasts run in parallel with isolated failures and timeouts
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import multiprocessing
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from forecast_executor import ForecastExecutor
+
+
+def fake_forecast(crop):
+    if crop == "onion":
+        raise ValueError("corrupt model")
+    if crop == "wheat":
+        time.sleep(2)
+    time.sleep(0.2)
+    return {"crop": crop}
+
+
+def test_results_keep_order_and_failures_are_isolated():
+    """A failing or slow crop yields an error entry; the others still succeed, in input order"""
+    print("🧪 Testing parallel forecasting...")
+
+    crops = ["banana", "onion", "tomato", "wheat", "carrot"]
+    executor = ForecastExecutor(max_workers=5, timeout=1, kind="thread")
+    try:
+        started = time.perf_counter()
+        results = executor.map(fake_forecast, crops, on_error=lambda crop, e: {"crop": crop, "error": str(e)})
+        elapsed = time.perf_counter() - started
+    finally:
+        executor.shutdown(wait=False)
+
+    assert [r["crop"] for r in results] == crops, "Results are not in input order"
+    assert results[1]["error"] == "corrupt model"
+    assert "timed out" in results[3]["error"]
+    assert all("error" not in results[i] for i in (0, 2, 4))
+    # Three 0.2 s crops ran side by side, and the slow crop was cut off at the 1 s timeout
+    assert elapsed < 1.8, f"Forecasts did not run in parallel ({elapsed:.2f}s)"
+    print(f"✅ {len(crops)} crops in {elapsed:.2f}s with 1 failure and 1 timeout isolated")
+
+    stats = executor.stats()
+    assert stats["errors"] == 2 and stats["timeouts"] == 1
+
+
+HANG = threading.Event()
+
+
+def hanging_forecast(crop):
+    """Never returns before HANG is set for crops named "hang*"; 0.3 s for the others"""
+    if crop.startswith("hang"):
+        HANG.wait(30)
+    time.sleep(0.3)
+    return {"crop": crop}
+
+
+def pid_forecast(crop):
+    """"hang:<path>" writes the worker's pid to <path> and sleeps for a minute; "sleep:<s>" sleeps s seconds"""
+    if crop.startswith("hang:"):
+        with open(crop[len("hang:"):], "w") as f:
+            f.write(str(os.getpid()))
+        time.sleep(60)
+    if crop.startswith("sleep:"):
+        time.sleep(float(crop[len("sleep:"):]))
+    return {"crop": crop}
+
+
+def test_stuck_threads_are_capped():
+    """Overrunning threads don't eat the pool, and their number is bounded"""
+    print("🧪 Testing timed-out forecast threads...")
+    HANG.clear()
+    executor = ForecastExecutor(max_workers=2, timeout=0.5, kind="thread", max_stuck=3)
+    try:
+        results = executor.map(hanging_forecast, ["hang-1", "banana"])
+        assert "timed out" in results[0]["error"] and "error" not in results[1]
+        assert executor.stats()["stuck_workers"] == 1
+
+        # A fresh pool: both 0.3 s forecasts run side by side inside the 0.5 s timeout
+        results = executor.map(hanging_forecast, ["tomato", "carrot"])
+        assert all("error" not in r for r in results), results
+
+        executor.map(hanging_forecast, ["hang-2", "hang-3"])
+        assert executor.stats()["stuck_workers"] == 3
+        started = time.perf_counter()
+        results = executor.map(hanging_forecast, ["onion"])
+        assert "still running" in results[0]["error"] and time.perf_counter() - started < 0.1
+        print("✅ New work refused at 3 stuck threads")
+
+        HANG.set()
+        deadline = time.time() + 5
+        while executor.stats()["stuck_workers"] and time.time() < deadline:
+            time.sleep(0.05)
+        assert "error" not in executor.map(hanging_forecast, ["onion"])[0]
+    finally:
+        HANG.set()
+        executor.shutdown(wait=False)
+    print("✅ Forecasts resumed once the stuck threads finished")
+
+
+def test_process_timeout_terminates_worker():
+    print("🧪 Testing timed-out forecast processes...")
+    executor = ForecastExecutor(max_workers=2, timeout=3, kind="process")
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_path = os.path.join(tmp, "pid")
+        try:
+            results = executor.map(pid_forecast, [f"hang:{pid_path}", "onion"])
+            assert "timed out" in results[0]["error"] and "error" not in results[1]
+            with open(pid_path) as f:
+                pid = int(f.read())
+
+            def alive():
+                return pid in {p.pid for p in multiprocessing.active_children()}
+
+            deadline = time.time() + 5
+            while alive() and time.time() < deadline:
+                time.sleep(0.05)
+            assert not alive(), "hung worker kept running"
+            assert "error" not in executor.map(pid_forecast, ["onion"])[0]
+        finally:
+            executor.shutdown(wait=False)
+    print("✅ Hung worker process terminated; a new pool served the next batch")
+
+
+def test_process_timeout_spares_concurrent_batches():
+    """A batch that times out doesn't kill the workers of another batch sharing the pool"""
+    print("🧪 Testing a process timeout next to another batch...")
+    executor = ForecastExecutor(max_workers=2, timeout=4, kind="process")
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_path = os.path.join(tmp, "pid")
+        try:
+            executor.map(pid_forecast, ["warm-1", "warm-2"])  # spawn both workers up front
+            hung = {}
+            hanging = threading.Thread(target=lambda: hung.update(
+                result=executor.map(pid_forecast, [f"hang:{pid_path}"])[0]))
+            hanging.start()
+            deadline = time.time() + 5
+            while not os.path.exists(pid_path) and time.time() < deadline:
+                time.sleep(0.05)
+            time.sleep(2)
+
+            # Still running when the other batch times out at 4 s
+            started = time.perf_counter()
+            result = executor.map(pid_forecast, ["sleep:3"])[0]
+            hanging.join()
+            assert "error" not in result, result
+            assert time.perf_counter() - started >= 2.5
+            assert "timed out" in hung["result"]["error"]
+
+            with open(pid_path) as f:
+                pid = int(f.read())
+            deadline = time.time() + 5
+            while pid in {p.pid for p in multiprocessing.active_children()} and time.time() < deadline:
+                time.sleep(0.05)
+            assert pid not in {p.pid for p in multiprocessing.active_children()}, "hung worker kept running"
+            assert "error" not in executor.map(pid_forecast, ["onion"])[0]
+        finally:
+            executor.shutdown(wait=False)
+    print("✅ Concurrent batch finished; hung worker terminated once it returned")
+
+
+if __name__ == "__main__":
+    test_results_keep_order_and_failures_are_isolated()
+    test_stuck_threads_are_capped()
+    test_process_timeout_terminates_worker()
+    test_process_timeout_spares_concurrent_batches()
+    print("\n✅ All forecast executor tests passed!")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script to verify uploads decode from memory like files, and reduced-resolution JPEG decoding keeps phone photos upright
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from image_io import EXIF_ORIENTATION, decode_rgb, open_image
+
+
+def test_memory_sources_match_file():
+    """Bytes, buffers and file objects decode to the same pixels as the file on disk"""
+    print("🧪 Testing in-memory image decoding...")
+    pixels = np.random.default_rng(0).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "PNG")
+    data = buffer.getvalue()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leaf.png")
+        with open(path, "wb") as f:
+            f.write(data)
+
+        for source in (path, data, bytearray(data), memoryview(data), io.BytesIO(data)):
+            assert np.array_equal(decode_rgb(source), pixels), type(source).__name__
+        assert np.array_equal(np.asarray(open_image(data).convert("RGB")), pixels)
+        assert os.listdir(tmp) == ["leaf.png"]
+
+        for source, error in ((os.path.join(tmp, "missing.png"), FileNotFoundError), (b"not an image", ValueError),
+                              (12345, TypeError)):
+            try:
+                decode_rgb(source)
+            except error:
+                pass
+            else:
+                raise AssertionError(f"{source!r} did not raise {error.__name__}")
+    print("✅ Path, bytes, buffers and file objects decoded identically")
+
+
+def rotated_jpeg(orientation=6):
+    """A 1200x600 landscape JPEG, left half white, tagged to be shown rotated (6: 90° clockwise)"""
+    pixels = np.zeros((600, 1200, 3), dtype=np.uint8)
+    pixels[:, :600] = 255
+    img = Image.fromarray(pixels)
+    exif = img.getexif()
+    exif[EXIF_ORIENTATION] = orientation
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def test_reduced_decode_applies_exif_orientation():
+    print("🧪 Testing EXIF orientation in reduced JPEG decode...")
+    data = rotated_jpeg()
+    full = decode_rgb(data)
+    reduced = decode_rgb(data, min_size=(224, 224))
+
+    assert full.shape == (1200, 600, 3)
+    assert reduced.shape == (600, 300, 3)
+    # Same picture as OpenCV's full decode, only smaller: the white half is on top
+    assert np.abs(full[::2, ::2].astype(int) - reduced.astype(int)).mean() < 2
+    assert reduced[:280].mean() > 250 and reduced[320:].mean() < 5
+    print(f"✅ Reduced decode {reduced.shape} matches the upright full decode {full.shape}")
+
+
+if __name__ == "__main__":
+    test_memory_sources_match_file()
+    test_reduced_decode_applies_exif_orientation()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test that the API imports quickly and defers heavy dependencies to first use
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "scripts"))
+
+from import_time_report import DEFAULT_BUDGET_MS, run_report
+
+
+def test_main_import_within_budget():
+    """Cold `import main` must stay under IMPORT_TIME_BUDGET_MS"""
+    print("🧪 Measuring cold import time for main...")
+    report = run_report("main", runs=3)
+    print(f"⏱️  {report['median_ms']:.1f} ms median (budget {DEFAULT_BUDGET_MS:.0f} ms)")
+    assert report["median_ms"] <= DEFAULT_BUDGET_MS, (
+        f"import main took {report['median_ms']:.1f} ms, budget is {DEFAULT_BUDGET_MS:.0f} ms; "
+        f"slowest: {report['slowest'][:5]}"
+    )
+    print("✅ Import time within budget")
+
+
+def test_heavy_dependencies_are_lazy():
+    """TensorFlow, OpenCV, matplotlib, pandas, ... load only when an endpoint needs them"""
+    print("🧪 Checking heavy dependencies are not imported at startup...")
+    report = run_report("main", runs=1)
+    assert report["heavy_modules"] == [], f"Imported at startup: {report['heavy_modules']}"
+    print("✅ No heavy dependencies imported at startup")
+
+
+if __name__ == "__main__":
+    test_main_import_within_budget()
+    test_heavy_dependencies_are_lazy()
+    print("\n✅ All import-time tests passed!")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the TensorFlow Lite backend against the Keras one on a tiny converted model
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from inference_backends import KerasBackend, TFLiteBackend, warm_up
+
+INPUT_SHAPE = (8, 8, 3)
+
+
+def tiny_models(directory):
+    """A small Keras classifier saved as .keras plus its float TFLite conversion; returns both paths"""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(INPUT_SHAPE),
+        tf.keras.layers.Conv2D(4, 3, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(3, activation="softmax"),
+    ])
+    keras_path = os.path.join(directory, "tiny.keras")
+    model.save(keras_path)
+
+    tflite_path = os.path.join(directory, "tiny.tflite")
+    with open(tflite_path, "wb") as f:
+        f.write(tf.lite.TFLiteConverter.from_keras_model(model).convert())
+    return keras_path, tflite_path
+
+
+def tiny_int8_model(keras_path, directory):
+    """Full-integer (int8 input and output) conversion, as ModelCompatibilityOptimizer.quantize_int8 makes"""
+    import tensorflow as tf
+
+    def representative_dataset():
+        rng = np.random.default_rng(1)
+        for _ in range(32):
+            yield [rng.random((1, *INPUT_SHAPE), dtype=np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(tf.keras.models.load_model(keras_path))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    path = os.path.join(directory, "tiny_int8.tflite")
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+def test_warm_up_prepares_interpreters_for_serving_threads():
+    """Interpreters built during warm-up are reused by other threads, one per batch size"""
+    print("🧪 Testing TFLite warm-up...")
+    with tempfile.TemporaryDirectory() as tmp:
+        _, tflite_path = tiny_models(tmp)
+        backend = TFLiteBackend(tflite_path)
+        warm_up(backend, [1, 2, 3])
+        built = backend.interpreters_built
+
+        outputs = []
+
+        def serve():
+            # Like the micro-batcher's worker: another thread, mixed batch sizes
+            for size in (3, 1, 2, 3, 1):
+                outputs.append(backend.predict(np.random.rand(size, *INPUT_SHAPE).astype(np.float32)))
+
+        worker = threading.Thread(target=serve)
+        worker.start()
+        worker.join()
+        assert [len(o) for o in outputs] == [3, 1, 2, 3, 1]
+        assert backend.interpreters_built == built == 3, backend.interpreters_built
+    print(f"✅ {built} interpreters built at warm-up, none on the serving thread")
+
+
+def test_tflite_matches_keras():
+    """Float and int8 artifacts agree with the Keras model, also when several threads predict at once"""
+    print("🧪 Testing TFLite parity with Keras...")
+    with tempfile.TemporaryDirectory() as tmp:
+        keras_path, tflite_path = tiny_models(tmp)
+        keras = KerasBackend(keras_path)
+        float_backend = TFLiteBackend(tflite_path)
+        int8_backend = TFLiteBackend(tiny_int8_model(keras_path, tmp))
+        assert float_backend.input_shape == int8_backend.input_shape == keras.input_shape
+        assert int8_backend._input["dtype"] == np.int8 and int8_backend._output["dtype"] == np.int8
+
+        batches = [np.random.default_rng(seed).random((size, *INPUT_SHAPE), dtype=np.float32)
+                   for seed, size in enumerate((1, 4, 2, 4, 1, 3))]
+        expected = [keras.predict(batch) for batch in batches]
+        for backend, atol in ((float_backend, 1e-5), (int8_backend, 0.02)):
+            results = [None] * len(batches)
+
+            def predict(i):
+                results[i] = backend.predict(batches[i])
+
+            threads = [threading.Thread(target=predict, args=(i,)) for i in range(len(batches))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            for got, want in zip(results, expected):
+                assert got.dtype == np.float32 and got.shape == want.shape
+                np.testing.assert_allclose(got, want, rtol=0, atol=atol)
+            print(f"✅ {os.path.basename(backend.model_path)} within {atol} of Keras")
+
+
+if __name__ == "__main__":
+    test_warm_up_prepares_interpreters_for_serving_threads()
+    test_tflite_matches_keras()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script to verify concurrent inference requests are micro-batched
+"""
+
+import os
+import sys
+import time
+import asyncio
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from inference_batcher import MicroBatcher
+
+
+def test_concurrent_requests_are_batched():
+    """Concurrent submissions share forward passes and get their own results back"""
+    print("🧪 Testing micro-batching of concurrent requests...")
+
+    batch_sizes = []
+
+    def fake_predict(batch):
+        batch_sizes.append(len(batch))
+        time.sleep(0.01)
+        return batch.reshape(len(batch), -1).sum(axis=1)
+
+    batcher = MicroBatcher(fake_predict, max_batch_size=4, max_wait_ms=50, name="test")
+
+    async def run_requests():
+        samples = [np.full((2, 2), i, dtype=np.float32) for i in range(10)]
+        return await asyncio.gather(*[batcher.predict_async(s) for s in samples])
+
+    results = asyncio.run(run_requests())
+    stats = batcher.stats()
+    batcher.close()
+
+    print(f"✅ Batch sizes: {batch_sizes}")
+    print(f"✅ Stats: {stats}")
+
+    assert [float(r) for r in results] == [4.0 * i for i in range(10)]
+    assert max(batch_sizes) <= 4
+    assert len(batch_sizes) < 10
+    assert stats["samples"] == 10
+    assert stats["batches"] == len(batch_sizes)
+
+
+def test_batch_errors_reach_every_caller():
+    """A failing forward pass is reported to each request in the batch"""
+    print("🧪 Testing error propagation...")
+
+    def failing_predict(batch):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(failing_predict, max_batch_size=2, max_wait_ms=5, name="failing")
+    try:
+        batcher.predict(np.zeros((2, 2)))
+        raised = False
+    except RuntimeError:
+        raised = True
+    stats = batcher.stats()
+    batcher.close()
+
+    assert raised
+    assert stats["errors"] == 1
+    print("✅ Error propagated to caller")
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_are_batched()
+    test_batch_errors_reach_every_caller()
+    print("\n✅ All batching tests passed!")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-model concurrency limits and queueing in the inference executor
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from inference_executor import InferenceExecutor, parse_model_limits
+
+
+class Probe:
+    """Blocking work that records how many calls run at once"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if not self.release.wait(5):
+                raise TimeoutError("probe was never released")
+            return value * 2
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+async def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+def test_model_limit_caps_concurrency_and_queues_the_rest():
+    print("🧪 Testing per-model limits...")
+    executor = InferenceExecutor(max_workers=4, model_limits={"soil": 1, "plantdoc": 2})
+    soil, plantdoc = Probe(), Probe()
+
+    async def scenario():
+        soil_calls = [asyncio.ensure_future(executor.run("soil", soil, i)) for i in range(5)]
+        plantdoc_calls = [asyncio.ensure_future(executor.run("plantdoc", plantdoc, i)) for i in range(6)]
+        await wait_for(lambda: soil.active == 1 and plantdoc.active == 2)
+
+        stats = executor.stats()["models"]
+        # Requests beyond the cap wait as coroutines, not as pool threads
+        assert stats["soil"]["active"] == 1 and stats["soil"]["waiting"] == 4, stats["soil"]
+        assert stats["plantdoc"]["active"] == 2 and stats["plantdoc"]["waiting"] == 4, stats["plantdoc"]
+
+        # A backed-up model doesn't starve others: the free pool thread serves a third one
+        assert await executor.run("hashing", lambda: "free") == "free"
+
+        soil.release.set()
+        plantdoc.release.set()
+        return await asyncio.gather(*soil_calls), await asyncio.gather(*plantdoc_calls)
+
+    try:
+        soil_results, plantdoc_results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert soil_results == [0, 2, 4, 6, 8] and plantdoc_results == [0, 2, 4, 6, 8, 10]
+    assert soil.peak == 1 and plantdoc.peak == 2
+    stats = executor.stats()["models"]
+    assert stats["soil"] == {"active": 0, "waiting": 0, "completed": 5, "failed": 0, "limit": 1}
+    assert stats["plantdoc"]["completed"] == 6 and stats["plantdoc"]["limit"] == 2
+    print(f"✅ Peak concurrency soil={soil.peak}, plantdoc={plantdoc.peak}")
+
+
+def test_pool_bounds_total_concurrency_and_counts_failures():
+    print("🧪 Testing the pool bound...")
+    executor = InferenceExecutor(max_workers=2, default_limit=4)
+    probe = Probe()
+
+    def fail():
+        raise ValueError("bad image")
+
+    async def scenario():
+        calls = [asyncio.ensure_future(executor.run("plantdoc", probe, i)) for i in range(6)]
+        await wait_for(lambda: probe.active == 2)
+        await asyncio.sleep(0.05)
+        assert probe.active == 2  # the other two admitted calls queue inside the pool
+        assert executor.stats()["models"]["plantdoc"]["waiting"] == 2
+        probe.release.set()
+        await asyncio.gather(*calls)
+        try:
+            await executor.run("plantdoc", fail)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("failure was swallowed")
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()["models"]["plantdoc"]
+    assert probe.peak == 2 and stats["failed"] == 1 and stats["completed"] == 7 and stats["active"] == 0
+    print("✅ Pool never ran more than max_workers calls; failure recorded")
+
+
+def test_parse_model_limits():
+    assert parse_model_limits("soil=1, plantdoc=4,bad=x,junk,zero=0") == {"soil": 1, "plantdoc": 4, "zero": 1}
+    assert parse_model_limits(None) == {}
+
+
+if __name__ == "__main__":
+    test_model_limit_caps_concurrency_and_queues_the_rest()
+    test_pool_bounds_total_concurrency_and_counts_failures()
+    test_parse_model_limits()
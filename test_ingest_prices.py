@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script to verify chunked price export ingestion: date detection, deduplication and routing
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+from ingest_prices import AmbiguousDateFormat, KeySet, detect_date_format, ingest, ingested_paths
+
+EXPORT = """State,District,Market,Commodity,Variety,Grade,Arrival_Date,Min_x0020_Price,Max_x0020_Price,Modal_x0020_Price
+Maharashtra,Pune,Pune ,Onion,Local,FAQ,21/03/2025,1000,1400,1200
+Maharashtra,Pune,Pune,Tomato,Local,FAQ,21/03/2025,600,900,800
+Maharashtra,Nashik,Lasalgaon,Onion,Red,FAQ,22/03/2025,900,1300,1100
+Karnataka,Kolar,Kolar,Tomato,Hybrid,FAQ,22/03/2025,500,800,700
+Maharashtra,Pune, Pune,Onion,Local,FAQ,21/03/2025,1000,1500,1250
+Maharashtra,Pune,Pune,Onion,Local,FAQ,2025-03-23,1050,1450,1300
+Karnataka,Kolar,Kolar,Tomato,Hybrid,FAQ,not a date,500,800,700
+Maharashtra,Pune,Pune,Tomato,Local,FAQ,23/03/2025,650,950,NR
+"""
+
+
+def test_export_is_deduplicated_and_routed():
+    """Aliased columns, padded names, a duplicate in a later chunk, a stray ISO date and a bad one"""
+    print("🧪 Testing streaming ingestion...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.csv")
+        with open(path, "w") as f:
+            f.write(EXPORT)
+        manifest = ingest(path, os.path.join(tmp, "out"), chunk_rows=3)
+
+        assert manifest["date_format"] == "%d/%m/%Y"
+        assert manifest["rows_read"] == 8 and manifest["duplicates"] == 1 and manifest["bad_dates"] == 1
+        assert manifest["fallback_date_values"] == 1
+        assert {slug: p["rows"] for slug, p in manifest["partitions"].items()} == {"onion": 3, "tomato": 3}
+
+        onion = pd.read_csv(ingested_paths(os.path.join(tmp, "out"))["onion"])
+        assert list(onion["Market Name"]) == ["Pune", "Lasalgaon", "Pune"]
+        assert list(onion["Reported Date"]) == ["2025-03-21", "2025-03-22", "2025-03-23"]
+        assert list(onion["Modal Price (Rs./Quintal)"]) == [1200, 1100, 1300]  # first report wins
+        tomato = pd.read_csv(ingested_paths(os.path.join(tmp, "out"))["tomato"])
+        assert np.isnan(tomato["Modal Price (Rs./Quintal)"].iloc[-1])
+    print("✅ Export deduplicated and routed per commodity")
+
+
+def test_bundled_export_matches_in_memory_dedup():
+    """Chunk size doesn't change the result, which equals deduplicating the whole file at once"""
+    print("🧪 Testing chunk-size independence...")
+    raw_path = os.path.join(REPO_ROOT, "data", "Onion.csv")
+    expected = pd.read_csv(raw_path, skipinitialspace=True)
+    expected["Reported Date"] = pd.to_datetime(expected["Reported Date"].str.strip(), format="%d %b %Y")
+    expected = expected.drop_duplicates(["State Name", "Market Name", "Variety", "Reported Date"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = []
+        for chunk_rows in (7, 1000):
+            manifest = ingest(raw_path, os.path.join(tmp, str(chunk_rows)), commodity="Onion", chunk_rows=chunk_rows)
+            assert manifest["date_format"] == detect_date_format(expected["Reported Date"].dt.strftime("%d %b %Y"))
+            with open(ingested_paths(os.path.join(tmp, str(chunk_rows)))["onion"]) as f:
+                outputs.append(f.read())
+        assert outputs[0] == outputs[1]
+
+        got = pd.read_csv(ingested_paths(os.path.join(tmp, "7"))["onion"])
+        assert len(got) == len(expected)
+        assert (got["Modal Price (Rs./Quintal)"].to_numpy() == expected["Modal Price (Rs./Quintal)"].to_numpy()).all()
+    print(f"✅ {len(expected)} onion rows regardless of chunk size")
+
+
+def daily_export(path, date_column, days=range(1, 29), markets=150):
+    """Agmarknet-style export for March 2025, dd/mm/yyyy, ``markets`` reports per day"""
+    with open(path, "w") as f:
+        f.write(f"State,District,Market,Commodity,Variety,Grade,{date_column},Modal_x0020_Price\n")
+        for day in days:
+            for market in range(markets):
+                f.write(f"Maharashtra,Pune,Market {market},Onion,Local,FAQ,{day:02d}/03/2025,{1000 + day}\n")
+
+
+def test_ambiguous_day_first_dates():
+    """The first rows all fall on days 1-12, where dd/mm and mm/dd both parse"""
+    print("🧪 Testing ambiguous date detection...")
+    assert detect_date_format(["01/03/2025", "13/03/2025"]) == "%d/%m/%Y"
+    assert detect_date_format(["01/03/2025", "02/03/2025"], dayfirst=True) == "%d/%m/%Y"
+    try:
+        detect_date_format(["01/03/2025", "02/03/2025"])
+        raise AssertionError("dd/mm vs mm/dd should be ambiguous")
+    except AmbiguousDateFormat:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.csv")
+        daily_export(path, "Arrival_Date")
+        manifest = ingest(path, os.path.join(tmp, "out"), chunk_rows=1000)
+        assert manifest["date_format"] == "%d/%m/%Y"
+        assert manifest["bad_dates"] == 0 and manifest["rows_written"] == 28 * 150
+        onion = pd.read_csv(ingested_paths(os.path.join(tmp, "out"))["onion"])
+        assert onion["Reported Date"].min() == "2025-03-01" and onion["Reported Date"].max() == "2025-03-28"
+
+        # Not the API's day-first column: refuse to guess
+        daily_export(path, "Reported Date", days=range(1, 13))
+        try:
+            ingest(path, os.path.join(tmp, "out"), chunk_rows=1000)
+            raise AssertionError("ambiguous dates should need --date-format")
+        except AmbiguousDateFormat:
+            pass
+
+        # A wrong format stops the run instead of dropping half the rows
+        daily_export(path, "Arrival_Date")
+        try:
+            ingest(path, os.path.join(tmp, "out"), chunk_rows=1000, date_format="%m/%d/%Y")
+            raise AssertionError("a burst of bad dates should stop ingestion")
+        except ValueError as e:
+            assert "--date-format" in str(e)
+    print("✅ Day-first dates detected; ambiguous and wrong formats refused")
+
+
+def test_key_set_matches_python_set():
+    rng = np.random.default_rng(0)
+    keys, reference = KeySet(), set()
+    for _ in range(50):
+        batch = rng.integers(0, 5000, rng.integers(1, 400)).astype(np.uint64)
+        new = keys.add_new(batch)
+        expected = []
+        for key in batch.tolist():
+            expected.append(key not in reference)
+            reference.add(key)
+        assert new.tolist() == expected
+    assert len(keys) == len(reference)
+
+
+if __name__ == "__main__":
+    test_export_is_deduplicated_and_routed()
+    test_bundled_export_matches_in_memory_dedup()
+    test_ambiguous_day_first_dates()
+    test_key_set_matches_python_set()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-crop, multi-horizon market forecasts
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+import predict_with_graph
+from chart_store import ChartRenderer
+from predict_with_graph import FEATURE_NAMES, build_feature_matrix, get_crop_forecast
+from scenario_pricing import score_scenarios
+
+# Forecast charts go to a scratch directory, not the tracked scripts/predicted_graphs
+CHART_DIR = tempfile.TemporaryDirectory()
+predict_with_graph.chart_renderer = ChartRenderer(CHART_DIR.name)
+
+
+def test_feature_matrix_layout():
+    """One row per horizon step, columns in FEATURE_NAMES order"""
+    print("🧪 Testing forecast feature matrix...")
+    stats = {
+        "first_date": datetime(2024, 1, 1), "arrivals": 1000.0, "min_price": 800.0, "max_price": 1600.0,
+        "rolling_price": 1200.0, "lag_1_month": 1100.0, "lag_2_months": 1000.0, "price_change_rate": 0.01,
+    }
+    dates = [datetime(2024, 1, 8), datetime(2024, 2, 5)]
+    X = build_feature_matrix(stats, dates)
+
+    assert X.shape == (2, len(FEATURE_NAMES))
+    assert list(X[:, FEATURE_NAMES.index("Days")]) == [7, 35]
+    assert list(X[:, FEATURE_NAMES.index("Month")]) == [1, 2]
+    assert X[0, FEATURE_NAMES.index("Price Range")] == 800.0 * 0.95
+    print("✅ Feature matrix built in training column order")
+
+
+def test_custom_origin_and_horizon():
+    """Any origin and horizon can be requested for a single crop"""
+    print("🧪 Testing custom forecast window...")
+    result = get_crop_forecast("onion", origin="2025-06-01", weeks=6)
+    assert "error" not in result, result.get("error")
+    assert result["weeks"] == 6 and len(result["predictions"]) == 6
+    assert result["predictions"][0]["date"] == "2025-06-08"
+    print(f"✅ {len(result['predictions'])} weekly onion prices from 2025-06-01")
+
+    for bad in ({"weeks": 0}, {"origin": "06/01/2025"}):
+        try:
+            get_crop_forecast("onion", **bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Invalid window accepted: {bad}")
+    print("✅ Invalid windows rejected")
+
+
+def test_scenario_grid_matches_baseline():
+    """The neutral scenario reproduces the baseline forecast; grids are scored in one call, week-major"""
+    print("🧪 Testing bulk scenario pricing...")
+    baseline = get_crop_forecast("onion", origin="2025-06-01", weeks=3)
+    result = score_scenarios(
+        "onion", grid={"arrival_shock": [0.8, 1.0, 1.2], "demand": [1.0, 1.1]}, origin="2025-06-01", weeks=3
+    )
+    columns = result["columns"]
+    assert result["count"] == 3 * 3 * 2 and len(columns["price"]) == result["count"]
+    assert list(columns["week"][:6]) == [1] * 6
+
+    neutral = (columns["arrival_shock"] == 1.0) & (columns["demand"] == 1.0)
+    assert list(columns["price"][neutral]) == [p["price"] for p in baseline["predictions"]]
+    print(f"✅ {result['count']} scenarios scored; neutral scenario matches the baseline forecast")
+
+
+if __name__ == "__main__":
+    test_feature_matrix_layout()
+    test_custom_origin_and_horizon()
+    test_scenario_grid_matches_baseline()
+    print("\n✅ All market forecast tests passed!")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-market partitions, incremental per-market training and the serving index
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+import predict_with_graph
+from chart_store import ChartRenderer
+from market_partitions import build_from_raw, load_catalog, write_partitions
+from model_registry import MarketModelIndex
+from train_market_models import train_partitions
+
+# Forecast charts go to a scratch directory, not the tracked scripts/predicted_graphs
+CHART_DIR = tempfile.TemporaryDirectory()
+predict_with_graph.chart_renderer = ChartRenderer(CHART_DIR.name)
+
+
+def two_market_export(directory, nashik_shift=0):
+    """Tomato export with a second, made-up market so the crop splits into two partitions"""
+    data = pd.read_csv(os.path.join(REPO_ROOT, "data", "tomato.csv"))
+    nashik = data.copy()
+    nashik["District Name"] = " Nashik"
+    nashik["Market Name"] = " Nashik "
+    nashik["Modal Price (Rs./Quintal)"] += nashik_shift
+    path = os.path.join(directory, "tomato.csv")
+    pd.concat([data, nashik]).to_csv(path, index=False)
+    return path
+
+
+def test_partitions_train_once_and_serve_from_index():
+    print("🧪 Testing per-market training...")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = os.path.join(tmp, "market_data")
+        models_dir = os.path.join(tmp, "markets")
+
+        catalog, written = build_from_raw({"tomato": two_market_export(tmp)}, data_root)
+        assert sorted(written) == ["tomato/maharashtra/nashik", "tomato/maharashtra/pune"]
+        assert catalog["tomato/maharashtra/nashik"]["market"] == "Nashik"
+
+        result = train_partitions(data_root, models_dir, max_workers=2)
+        assert sorted(result["trained"]) == sorted(written) and not result["failed"], result["failed"]
+
+        index = MarketModelIndex(models_dir)
+        entry = index.lookup("Tomato", "Maharashtra", " Pune")
+        assert entry is not None and entry["rows"] == catalog["tomato/maharashtra/pune"]["rows"]
+        assert index.lookup("tomato", "maharashtra", "mumbai") is None
+        assert index.markets("tomato") == sorted(written)
+
+        X = np.full((3, 11), 1500.0, dtype=np.float32)
+        pune = index.get("tomato", "maharashtra", "pune")
+        assert pune is index.get("tomato", "maharashtra", "pune")
+        assert np.isfinite(pune.predict(X)).all()
+
+        # Nothing changed: nothing retrains
+        build_from_raw({"tomato": two_market_export(tmp)}, data_root)
+        result = train_partitions(data_root, models_dir, max_workers=1)
+        assert result["trained"] == [] and len(result["unchanged"]) == 2
+
+        # Only the market whose rows changed is rewritten and retrained
+        _, written = build_from_raw({"tomato": two_market_export(tmp, nashik_shift=100)}, data_root)
+        assert written == ["tomato/maharashtra/nashik"]
+        result = train_partitions(data_root, models_dir, max_workers=1)
+        assert result["trained"] == ["tomato/maharashtra/nashik"]
+        assert index.lookup("tomato", "maharashtra", "nashik")["data_hash"] == \
+            load_catalog(data_root)["tomato/maharashtra/nashik"]["data_hash"]
+    print("✅ Partitions trained once and served from the index")
+
+
+def test_market_spellings_share_one_partition():
+    """Names that slug the same are one partition; markets that disappear are removed"""
+    print("🧪 Testing market name variants...")
+    data = pd.read_csv(os.path.join(REPO_ROOT, "data", "tomato.csv"), skipinitialspace=True)
+    variants = data.copy()
+    variants.loc[::3, "Market Name"] = "PUNE"
+    lasalgaon = data.copy()
+    lasalgaon["Market Name"] = "Lasalgaon(Niphad)"
+    lasalgaon.loc[:100, "Market Name"] = "Lasalgaon Niphad"
+    export = pd.concat([variants, lasalgaon])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog, written = write_partitions("tomato", export, tmp, {})
+        assert sorted(written) == ["tomato/maharashtra/lasalgaon-niphad", "tomato/maharashtra/pune"]
+        assert catalog["tomato/maharashtra/pune"]["market"] == "Pune"
+        assert catalog["tomato/maharashtra/lasalgaon-niphad"]["market"] == "Lasalgaon(Niphad)"
+        assert sum(entry["rows"] for entry in catalog.values()) == len(export)
+
+        catalog, written = write_partitions("tomato", export, tmp, catalog)
+        assert written == []
+
+        catalog, written = write_partitions("tomato", variants, tmp, catalog)
+        assert written == [] and list(catalog) == ["tomato/maharashtra/pune"]
+        assert not os.path.exists(os.path.join(tmp, "commodity=tomato", "state=maharashtra",
+                                               "market=lasalgaon-niphad"))
+    print("✅ Variants merged; vanished market removed")
+
+
+def test_forecast_serves_market_model():
+    """get_crop_forecast uses a market's own model when one is indexed, else the crop model"""
+    print("🧪 Testing market model serving...")
+    registry = predict_with_graph.registry
+    with tempfile.TemporaryDirectory() as tmp:
+        data_root = os.path.join(tmp, "market_data")
+        models_dir = os.path.join(tmp, "markets")
+        build_from_raw({"tomato": two_market_export(tmp, nashik_shift=3000)}, data_root)
+        result = train_partitions(data_root, models_dir, max_workers=1)
+        assert not result["failed"], result["failed"]
+
+        original, registry.market_index = registry.market_index, MarketModelIndex(models_dir)
+        try:
+            crop = predict_with_graph.get_crop_forecast("tomato", weeks=4)
+            nashik = predict_with_graph.get_crop_forecast("tomato", weeks=4, state="Maharashtra", market=" Nashik")
+            pune = predict_with_graph.get_crop_forecast("tomato", weeks=4, state="maharashtra", market="pune")
+            mumbai = predict_with_graph.get_crop_forecast("tomato", weeks=4, state="maharashtra", market="mumbai")
+        finally:
+            registry.market_index = original
+
+    assert "error" not in nashik, nashik
+    assert nashik["market"] == "tomato/maharashtra/nashik" and pune["market"] == "tomato/maharashtra/pune"
+    prices = {name: [p["price"] for p in result["predictions"]]
+              for name, result in (("crop", crop), ("nashik", nashik), ("pune", pune), ("mumbai", mumbai))}
+    # Nashik was trained on prices 3000 Rs./Quintal (30 Rs./Kg) above Pune's
+    assert min(prices["nashik"]) > max(prices["pune"]) + 15, prices
+    # No model for Mumbai: the crop model answers
+    assert mumbai["market"] is None and prices["mumbai"] == prices["crop"]
+    print("✅ Market models served; unknown market fell back to the crop model")
+
+
+if __name__ == "__main__":
+    test_partitions_train_once_and_serve_from_index()
+    test_market_spellings_share_one_partition()
+    test_forecast_serves_market_model()
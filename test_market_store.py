@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the columnar market data store reads back what the processed CSVs hold
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+import market_store
+
+
+def test_columnar_copy_matches_csv():
+    """Typed columns, projection and values agree exactly with the CSV for every crop and format"""
+    print("🧪 Testing columnar market data...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for crop in ("banana", "onion", "tomato", "wheat", "carrot"):
+            csv_path = os.path.join(tmp, f"{crop}_processed.csv")
+            shutil.copy(os.path.join(REPO_ROOT, "processed_data", f"{crop}_processed.csv"), csv_path)
+            expected = pd.read_csv(csv_path)
+            for fmt in ("parquet", "feather"):
+                path = market_store.convert(csv_path, fmt)
+                data = market_store.read_market_data(csv_path, fmt=fmt)
+                assert list(data.columns) == list(expected.columns)
+                assert data["Reported Date"].dtype.kind == "M"
+                assert isinstance(data["Market Name"].dtype, pd.CategoricalDtype)
+                assert data["Rolling_Modal_Price"].dtype == np.float64
+                assert (data["Reported Date"] == pd.to_datetime(expected["Reported Date"])).all()
+                assert (data["Variety"].astype(str) == expected["Variety"].astype(str)).all()
+                for column in expected.select_dtypes(include=["number"]).columns:
+                    np.testing.assert_array_equal(data[column].astype(np.float64), expected[column], err_msg=column)
+
+                columns = ["Lag_1_Month", "Reported Date"]
+                projected = market_store.read_market_data(csv_path, columns, fmt=fmt)
+                assert list(projected.columns) == columns
+                assert data.memory_usage(deep=True).sum() < expected.memory_usage(deep=True).sum()
+                print(f"✅ {crop}: {os.path.getsize(path)} bytes of {fmt}")
+
+
+def test_float32_only_when_exact():
+    data = pd.DataFrame({"whole": [1550.0, 3000.0, np.nan], "third": [1223.3333333, 1.0, 2.0]})
+    stored = market_store.to_columnar(data)
+    assert stored["whole"].dtype == np.float32 and stored["third"].dtype == np.float64
+
+
+def test_stale_copy_falls_back_to_csv():
+    """A CSV changed after its columnar copy is read directly"""
+    print("🧪 Testing stale columnar copies...")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "onion_processed.csv")
+        shutil.copy(os.path.join(REPO_ROOT, "processed_data", "onion_processed.csv"), csv_path)
+        path = market_store.convert(csv_path)
+
+        data = pd.read_csv(csv_path).head(10)
+        data.to_csv(csv_path, index=False)
+        os.utime(path, ns=(0, 0))
+        assert len(market_store.read_market_data(csv_path)) == 10
+    print("✅ Stale copy was bypassed")
+
+
+if __name__ == "__main__":
+    test_columnar_copy_matches_csv()
+    test_float32_only_when_exact()
+    test_stale_copy_falls_back_to_csv()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the int8 quantization report, its accuracy gate and how the TFLite backend selects the result
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from inference_backends import tflite_path_for
+from model_compatibility_optimizer import ModelCompatibilityOptimizer
+from test_inference_backends import tiny_models
+
+
+def fake_stats(predictions, latency_ms=2.0):
+    return {"predictions": predictions, "latencies_ms": [latency_ms] * 10, "peak_rss_mb": 300.0,
+            "baseline_rss_mb": 250.0}
+
+
+def test_report_and_accuracy_gate():
+    print("🧪 Testing the quantization report...")
+    with tempfile.TemporaryDirectory() as tmp:
+        float_path, int8_path = os.path.join(tmp, "m.keras"), os.path.join(tmp, "m_int8.tflite")
+        for path, size in ((float_path, 4096), (int8_path, 1024)):
+            with open(path, "wb") as f:
+                f.write(b"\0" * size)
+
+        def report(budget, float_predictions, int8_predictions, labels):
+            optimizer = ModelCompatibilityOptimizer(models_dir=tmp, accuracy_drop_budget=budget)
+            return optimizer._build_report("m", float_path, int8_path, fake_stats(float_predictions),
+                                           fake_stats(int8_predictions, 1.0), labels)
+
+        # Labelled: float 4/4, int8 3/4 correct
+        labelled = report(0.01, [0, 1, 2, 1], [0, 1, 2, 2], [0, 1, 2, 1])
+        assert labelled["float_accuracy"] == 1.0 and labelled["int8_accuracy"] == 0.75
+        assert labelled["accuracy_drop"] == 0.25 and labelled["top1_agreement"] == 0.75
+        assert labelled["labelled_images"] == 4 and not labelled["accepted"]
+        assert report(0.25, [0, 1, 2, 1], [0, 1, 2, 2], [0, 1, 2, 1])["accepted"]  # drop == budget passes
+        assert labelled["int8"]["latency_p50_ms"] == 1.0 and labelled["int8"]["model_rss_mb"] == 50.0
+        assert labelled["float"]["file_size_mb"] == round(4096 / 1024 / 1024, 3)
+
+        # Only images without a label: disagreement with the float model stands in for the drop
+        unlabelled = report(0.2, [0, 1, 2, 1, 0], [0, 1, 2, 1, 1], [None] * 5)
+        assert unlabelled["float_accuracy"] is None and unlabelled["accuracy_drop"] == 0.2
+        assert unlabelled["accepted"]
+        # Unlabelled images don't count towards accuracy when some are labelled
+        mixed = report(0.0, [0, 1, 2], [0, 1, 0], [0, 1, None])
+        assert mixed["accuracy_drop"] == 0.0 and mixed["accepted"] and mixed["top1_agreement"] == round(2 / 3, 4)
+    print("✅ Accuracy drop measured against labels when present, agreement otherwise")
+
+
+def test_int8_model_sits_next_to_float_model():
+    print("🧪 Testing int8 artifact selection...")
+    with tempfile.TemporaryDirectory() as tmp:
+        keras_path, float_path = tiny_models(tmp)
+        with open(float_path, "rb") as f:
+            float_bytes = f.read()
+        images = os.path.join(tmp, "images")
+        os.makedirs(images)
+        rng = np.random.default_rng(0)
+        for i in range(6):
+            Image.fromarray(rng.integers(0, 255, (8, 8, 3), dtype=np.uint8)).save(os.path.join(images, f"{i}.png"))
+
+        for budget, int8_predictions, accepted in ((0.0, [1, 1, 1], True), (0.1, [1, 0, 0], False)):
+            optimizer = ModelCompatibilityOptimizer(models_dir=tmp, accuracy_drop_budget=budget)
+            # Benchmarks spawn TensorFlow processes; their predictions are what the gate looks at
+            optimizer._benchmark = lambda kind, path, samples, runs, p=int8_predictions: \
+                fake_stats([1, 1, 1] if kind == "keras" else p)
+            report = optimizer.quantize_int8(keras_path, "tiny", calibration_dirs=[images])
+
+            assert report["accepted"] is accepted
+            assert report["int8"]["path"] == os.path.join(tmp, "tiny_int8.tflite")
+            with open(float_path, "rb") as f:
+                assert f.read() == float_bytes, "float TFLite model was overwritten"
+            with open(os.path.join(tmp, "tiny_int8_report.json")) as f:
+                assert json.load(f)["accepted"] is accepted
+            expected = report["int8"]["path"] if accepted else float_path
+            assert report["deployed_path"] == (expected if accepted else None)
+            assert tflite_path_for(keras_path) == expected
+    print("✅ Accepted int8 model served explicitly; float model kept and served after a rejection")
+
+
+if __name__ == "__main__":
+    test_report_and_accuracy_gate()
+    test_int8_model_sits_next_to_float_model()
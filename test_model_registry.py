@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script to verify price models are discovered, loaded lazily and kept within a memory budget
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from model_registry import ModelRegistry
+from native_models import NativeBoosterModel, export_native, export_pickles, schema_path_for
+
+
+def test_repository_models_are_discovered():
+    """models/*_model.pkl minus non-commodity models, in manifest order"""
+    print("🧪 Testing commodity discovery...")
+    registry = ModelRegistry()
+    assert registry.commodities()[:5] == ["banana", "onion", "tomato", "wheat", "carrot"]
+    assert "crop_demand" not in registry
+    assert registry.info("banana")["unit"] == "Rs./Dozen"
+    assert registry.info("onion")["unit"] == "Rs./Kg"
+    print(f"✅ Discovered: {', '.join(registry.commodities())}")
+
+
+def test_lazy_loading_and_lru_eviction():
+    """Models load on first use, are reused, and the least recently used is evicted over budget"""
+    print("🧪 Testing lazy loading and LRU eviction...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("apple", "mango", "guava"):
+            # ~0.4 MB each when pickled
+            joblib.dump(np.full(50_000, len(name), dtype=np.float64), os.path.join(tmp, f"{name}_model.pkl"))
+        with open(os.path.join(tmp, "model_manifest.json"), "w") as f:
+            json.dump({"commodities": {"mango": {"unit": "Rs./Dozen"}}}, f)
+
+        registry = ModelRegistry(models_dir=tmp, data_dir=tmp, max_memory_mb=1.0)
+        assert registry.commodities() == ["mango", "apple", "guava"]
+        assert registry.stats()["loaded"] == 0
+
+        registry.get("apple")
+        registry.get("mango")
+        registry.get("apple")
+        registry.get("guava")  # over budget: mango is least recently used
+
+        stats = registry.stats()
+        assert stats["loads"] == 3 and stats["hits"] == 1
+        assert stats["evictions"] == 1 and not stats["models"]["mango"]["loaded"]
+        assert stats["memory_mb"] <= 1.0
+        print(f"✅ loads={stats['loads']}, hits={stats['hits']}, evictions={stats['evictions']}, "
+              f"memory={stats['memory_mb']} MB")
+
+
+def test_native_boosters_are_preferred():
+    """A *_model.ubj export is served instead of the pickle and predicts the same from NumPy"""
+    print("🧪 Testing native booster serving...")
+    repo_models = ModelRegistry()
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(repo_models.info("onion")["pickle_path"], tmp)
+        pickled = joblib.load(os.path.join(tmp, "onion_model.pkl"))
+        feature_names = pickled.get_booster().feature_names
+        export_native(pickled, tmp, "onion", feature_names)
+
+        model = ModelRegistry(models_dir=tmp, data_dir=tmp).get("onion")
+        assert isinstance(model, NativeBoosterModel)
+
+        X = np.random.default_rng(0).random((8, len(feature_names))).astype(np.float32) * 1000
+        np.testing.assert_allclose(model.predict(X), pickled.predict(X, validate_features=False), rtol=1e-6)
+        print("✅ Native booster matches the pickled model")
+
+
+def test_shipped_models_export_and_serve_natively():
+    """Every shipped pickle exports to a booster that the registry serves, after .npz and before .pkl"""
+    print("🧪 Testing native exports of the shipped models...")
+    repo_models = ModelRegistry()
+    crops = repo_models.commodities()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in crops:
+            for path in repo_models.info(name)["model_paths"]:
+                shutil.copy(path, tmp)
+        exported = export_pickles(tmp)
+        assert sorted(os.path.basename(path) for path in exported) == sorted(f"{name}_model.ubj" for name in crops)
+
+        registry = ModelRegistry(models_dir=tmp, data_dir=tmp)
+        for name in crops:
+            native_path = os.path.join(tmp, f"{name}_model.ubj")
+            with open(schema_path_for(native_path)) as f:
+                schema = json.load(f)
+            assert schema["format"] == "ubj" and len(schema["feature_names"]) == 11
+            assert [os.path.basename(path) for path in registry.info(name)["model_paths"]] == \
+                [f"{name}_model.npz", f"{name}_model.ubj", f"{name}_model.pkl"]
+
+            # An unreadable compiled model falls back to the booster, not the pickle
+            with open(os.path.join(tmp, f"{name}_model.npz"), "wb") as f:
+                f.write(b"truncated")
+            model = registry.get(name)
+            assert isinstance(model, NativeBoosterModel), type(model)
+
+            pickled = joblib.load(os.path.join(tmp, f"{name}_model.pkl"))
+            X = np.random.default_rng(1).random((16, 11)).astype(np.float32) * 2000
+            np.testing.assert_allclose(model.predict(X), pickled.predict(X, validate_features=False), rtol=1e-6)
+    print(f"✅ {len(crops)} shipped models exported and served from .ubj")
+
+
+if __name__ == "__main__":
+    test_repository_models_are_discovered()
+    test_lazy_loading_and_lru_eviction()
+    test_native_boosters_are_preferred()
+    test_shipped_models_export_and_serve_natively()
+    print("\n✅ All model registry tests passed!")
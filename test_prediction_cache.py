@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the prediction cache: LRU and TTL eviction, the shared disk layer and model changes
+"""
+
+import os
+import sys
+import time
+import json
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from prediction_cache import PredictionCache, content_hash, model_fingerprint
+
+RESULT = {"class": "Tomato leaf", "confidence": 0.97, "status": "HEALTHY"}
+
+
+def test_lru_and_ttl_eviction():
+    print("🧪 Testing in-memory eviction...")
+    cache = PredictionCache("test", max_entries=2, ttl_seconds=3600, disk_dir=None)
+    a, b, c = (content_hash(name.encode()) for name in ("a", "b", "c"))
+    cache.put(a, "v1", RESULT)
+    cache.put(b, "v1", RESULT)
+    assert cache.get(a, "v1") == RESULT  # a is now the most recently used
+    cache.put(c, "v1", RESULT)
+    assert cache.get(b, "v1") is None
+    assert cache.get(a, "v1") == RESULT and cache.get(c, "v1") == RESULT
+    assert cache.stats()["evictions"] == 1 and cache.stats()["entries"] == 2
+
+    # Callers get copies: mutating one doesn't change the cached result
+    cache.get(a, "v1")["class"] = "changed"
+    assert cache.get(a, "v1") == RESULT
+
+    cache = PredictionCache("test", ttl_seconds=0.05, disk_dir=None)
+    cache.put(a, "v1", RESULT)
+    time.sleep(0.1)
+    assert cache.get(a, "v1") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 0
+    print("✅ Least recently used and expired entries dropped")
+
+
+def test_disk_layer_is_shared_between_workers():
+    print("🧪 Testing the disk cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        digest = content_hash(b"upload")
+        writer = PredictionCache("plantdoc", disk_dir=tmp)
+        writer.put(digest, "v1", RESULT)
+
+        files = [os.path.join(root, name) for root, _, names in os.walk(tmp) for name in names]
+        assert len(files) == 1 and files[0].endswith(".json"), files  # renamed into place, no .tmp left
+        with open(files[0]) as f:
+            assert json.load(f)["result"] == RESULT
+
+        # A second worker (fresh process memory) reads it from disk, then from memory
+        reader = PredictionCache("plantdoc", disk_dir=tmp)
+        assert reader.get(digest, "v1") == RESULT
+        assert reader.get(digest, "v1") == RESULT
+        stats = reader.stats()
+        assert stats["disk_hits"] == 1 and stats["hits"] == 1
+        assert reader.get(digest, "v2") is None
+
+        # Expired disk entries are removed on read
+        short = PredictionCache("soil", ttl_seconds=0.05, disk_dir=tmp)
+        short.put(digest, "v1", RESULT)
+        time.sleep(0.1)
+        assert PredictionCache("soil", ttl_seconds=0.05, disk_dir=tmp).get(digest, "v1") is None
+        assert not any(files for _, _, files in os.walk(os.path.join(tmp, "soil")))
+    print("✅ Disk entries shared, reloaded and expired")
+
+
+def test_model_change_clears_cache():
+    print("🧪 Testing model version changes...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "model.keras")
+        with open(model_path, "wb") as f:
+            f.write(b"weights v1")
+        v1 = model_fingerprint(model_path)
+
+        cache = PredictionCache("plantdoc", disk_dir=None)
+        digest = content_hash(b"upload")
+        cache.put(digest, v1, RESULT)
+        cache.put(content_hash(b"other"), v1, RESULT)
+
+        with open(model_path, "wb") as f:
+            f.write(b"retrained weights v2")
+        v2 = model_fingerprint(model_path)
+        assert v2 != v1
+
+        assert cache.get(digest, v2) is None
+        stats = cache.stats()
+        assert stats["invalidations"] == 1 and stats["entries"] == 0 and stats["model_version"] == v2
+        assert cache.get(digest, v1) is None  # old results are gone, not just hidden
+        assert cache.get(digest, None) is None
+    print("✅ New model version dropped every cached prediction")
+
+
+if __name__ == "__main__":
+    test_lru_and_ttl_eviction()
+    test_disk_layer_is_shared_between_workers()
+    test_model_change_clears_cache()
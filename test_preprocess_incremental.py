@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script to verify incremental feature processing matches a full rebuild
+"""
+
+import os
+import sys
+import shutil
+import filecmp
+import tempfile
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(REPO_ROOT, "scripts"))
+
+import preprocess_data as pp
+
+
+def split_raw(crop, directory, fraction):
+    """Write the first ``fraction`` of a crop's raw rows to ``directory``; returns (path, remaining lines)"""
+    with open(os.path.join(REPO_ROOT, pp.file_paths[crop]), "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    cut = int(len(lines) * fraction)
+    path = os.path.join(directory, f"{crop}.csv")
+    with open(path, "wb") as f:
+        f.writelines(lines[:cut])
+    return path, lines[cut:]
+
+
+def test_full_rebuild_matches_committed_data():
+    """Rebuilding from the raw exports reproduces processed_data/ exactly"""
+    print("🧪 Testing full rebuild...")
+    with tempfile.TemporaryDirectory() as tmp:
+        for crop, raw in pp.file_paths.items():
+            pp.build_full(crop, os.path.join(REPO_ROOT, raw), tmp)
+            assert filecmp.cmp(pp.processed_path_for(crop, tmp),
+                               pp.processed_path_for(crop, os.path.join(REPO_ROOT, "processed_data")), shallow=False), crop
+    print("✅ Full rebuild matches processed_data/")
+
+
+def test_incremental_appends_match_full_rebuild():
+    """Appending raw rows in batches yields the same file as rebuilding everything"""
+    print("🧪 Testing incremental updates...")
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path, remaining = split_raw("tomato", tmp, 0.6)
+        pp.build_full("tomato", raw_path, tmp)
+
+        half = len(remaining) // 2
+        for batch in (remaining[:half], remaining[half:]):
+            with open(raw_path, "ab") as f:
+                f.writelines(batch)
+            assert pp.update_incremental("tomato", raw_path, tmp) == sum(1 for line in batch if line.strip())
+        assert pp.update_incremental("tomato", raw_path, tmp) == 0
+
+        full_dir = os.path.join(tmp, "full")
+        pp.build_full("tomato", raw_path, full_dir)
+        assert filecmp.cmp(pp.processed_path_for("tomato", tmp), pp.processed_path_for("tomato", full_dir), shallow=False)
+    print("✅ Incremental output is identical to a full rebuild")
+
+
+def test_rewritten_raw_file_triggers_rebuild():
+    """Edits to rows that were already processed fall back to a full rebuild"""
+    print("🧪 Testing rebuild fallback...")
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path, _ = split_raw("onion", tmp, 1.0)
+        pp.build_full("onion", raw_path, tmp)
+        with open(raw_path, "rb") as f:
+            content = f.read()
+        with open(raw_path, "wb") as f:
+            f.write(content.replace(b"1103", b"1104", 1))
+        assert pp.update_incremental("onion", raw_path, tmp) is None
+
+        rebuilt = os.path.join(tmp, "rebuilt")
+        pp.build_full("onion", raw_path, rebuilt)
+        assert filecmp.cmp(pp.processed_path_for("onion", tmp), pp.processed_path_for("onion", rebuilt), shallow=False)
+    print("✅ Rewritten raw data was rebuilt")
+
+
+def test_one_date_format_per_column():
+    """The first format any value matches parses the whole column; values in other formats are dropped"""
+    print("🧪 Testing date format selection...")
+    dates = pp.parse_dates(pd.Series(['"03/04/2025"', "13/04/2025", " 04/05/2025 "]))
+    assert list(dates[[0, 2]]) == [pd.Timestamp(2025, 3, 4), pd.Timestamp(2025, 4, 5)] and pd.isna(dates[1])
+    # An ISO date comes earlier in DATE_FORMATS, so it decides the format for the column
+    dates = pp.parse_dates(pd.Series(["03/04/2025", "2025-04-13"]))
+    assert pd.isna(dates[0]) and dates[1] == pd.Timestamp(2025, 4, 13)
+
+    def append_row(raw_path, date):
+        with open(raw_path, "ab") as f:
+            f.write(f'Maharashtra,Pune,Pune,Local,Vegetables,331.9,600,2000,1300,"{date}"\n'.encode())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A date in a later format of DATE_FORMATS is dropped, by a full rebuild as well
+        raw_path, _ = split_raw("tomato", tmp, 1.0)
+        pp.build_full("tomato", raw_path, tmp)
+        append_row(raw_path, "2024-10-28")
+        assert pp.update_incremental("tomato", raw_path, tmp) == 0
+        rebuilt = os.path.join(tmp, "rebuilt")
+        pp.build_full("tomato", raw_path, rebuilt)
+        assert filecmp.cmp(pp.processed_path_for("tomato", tmp), pp.processed_path_for("tomato", rebuilt), shallow=False)
+
+        # A date in an earlier format changes the format a full rebuild picks, so the crop is rebuilt
+        data = pd.read_csv(os.path.join(REPO_ROOT, pp.file_paths["tomato"]), skipinitialspace=True)
+        data["Reported Date"] = pd.to_datetime(data["Reported Date"], format="%d %b %Y").dt.strftime("%m/%d/%Y")
+        us_path = os.path.join(tmp, "tomato_us.csv")
+        data.to_csv(us_path, index=False)
+        pp.build_full("tomato", us_path, tmp)
+        append_row(us_path, "2024-10-28")
+        assert pp.update_incremental("tomato", us_path, tmp) is None
+        # ...to the ISO format, which reads only that row
+        assert len(pd.read_csv(pp.processed_path_for("tomato", tmp))) == 1
+    print("✅ One format per column; a format switch in new rows rebuilt the crop")
+
+
+def test_feature_store_follows_data_changes():
+    """Preprocessing rewrites models/<crop>_features.json only when the processed data changed"""
+    print("🧪 Testing feature store refresh...")
+    from feature_store import features_path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = os.path.join(tmp, "models")
+        os.makedirs(models_dir)
+        shutil.copy(os.path.join(REPO_ROOT, "models", "tomato_model.npz"), models_dir)
+        raw_path, remaining = split_raw("tomato", tmp, 0.6)
+        store = features_path(models_dir, "tomato")
+
+        pp.process_crop("tomato", raw_path, tmp, full=True, models_dir=models_dir)
+        with open(store, "rb") as f:
+            first = f.read()
+        os.utime(store, ns=(0, 0))
+        pp.process_crop("tomato", raw_path, tmp, models_dir=models_dir)
+        pp.process_crop("tomato", raw_path, tmp, full=True, models_dir=models_dir)
+        assert os.stat(store).st_mtime_ns == 0, "unchanged data re-materialized the feature store"
+
+        with open(raw_path, "ab") as f:
+            f.writelines(remaining)
+        pp.process_crop("tomato", raw_path, tmp, models_dir=models_dir)
+        with open(store, "rb") as f:
+            assert f.read() != first
+    print("✅ Feature store rewritten for new data only")
+
+
+if __name__ == "__main__":
+    test_full_rebuild_matches_committed_data()
+    test_incremental_appends_match_full_rebuild()
+    test_rewritten_raw_file_triggers_rebuild()
+    test_one_date_format_per_column()
+    test_feature_store_follows_data_changes()
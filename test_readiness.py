@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script to verify /ready reports loading models with 503 + Retry-After while /health stays live
+"""
+
+import os
+import sys
+import time
+import threading
+
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+import main
+from model_readiness import ModelLoadTracker
+
+MODELS = ["soil_model", "plantdoc_predictor", "price_predictor"]
+
+
+def test_ready_while_loading_and_after():
+    print("🧪 Testing liveness and readiness during model loading...")
+    tracker = ModelLoadTracker(MODELS)
+    tracker.background_started = True
+    original, main.model_tracker = main.model_tracker, tracker
+    release = threading.Event()
+
+    def slow_loader():
+        # Stands in for load_models_in_background: one model loads, then blocks mid-warm-up
+        tracker.mark("price_predictor", "loading")
+        tracker.mark("price_predictor", "ready")
+        tracker.mark("soil_model", "loading")
+        tracker.mark("soil_model", "warming")
+        release.wait(10)
+        tracker.mark("soil_model", "ready", warmup_seconds=0.1)
+        tracker.mark("plantdoc_predictor", "loading")
+        tracker.mark("plantdoc_predictor", "failed", error="no model file")
+
+    loader = threading.Thread(target=slow_loader)
+    try:
+        client = TestClient(main.app)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == main.RETRY_AFTER_SECONDS
+        assert response.json()["progress"] == 0.0
+
+        loader.start()
+        deadline = time.time() + 5
+        while tracker.snapshot()["models"]["soil_model"]["state"] != "warming" and time.time() < deadline:
+            time.sleep(0.01)
+
+        # Liveness answers straight away while a model is still warming up
+        started = time.perf_counter()
+        assert client.get("/health").status_code == 200
+        assert time.perf_counter() - started < 1.0
+        healthz = client.get("/healthz")
+        assert healthz.status_code == 200 and healthz.json()["ready"] is False
+
+        response = client.get("/ready")
+        assert response.status_code == 503 and "Retry-After" in response.headers
+        snapshot = response.json()
+        assert snapshot["models"]["soil_model"]["state"] == "warming"
+        assert snapshot["models"]["price_predictor"]["state"] == "ready"
+        assert 0 < snapshot["progress"] < 1
+
+        release.set()
+        loader.join(5)
+        response = client.get("/ready")
+        assert response.status_code == 200 and "Retry-After" not in response.headers
+        snapshot = response.json()
+        # A failed model falls back to lazy loading: ready, but degraded
+        assert snapshot["ready"] and snapshot["degraded"] == ["plantdoc_predictor"]
+        assert client.get("/healthz").json()["ready"] is True
+    finally:
+        release.set()
+        main.model_tracker = original
+    print("✅ /ready: 503 with Retry-After while loading, 200 after; /health live throughout")
+
+
+if __name__ == "__main__":
+    test_ready_while_loading_and_after()
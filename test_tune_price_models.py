@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the price model hyperparameter sweep
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+from backtest_price_models import load_crop_matrices
+from train_models import MODEL_PARAMS, model_params
+from tune_price_models import rung_budgets, sample_configs, save_params, sweep
+
+
+def test_search_schedule():
+    """Configurations are distinct and start with the defaults; budgets grow by eta up to the maximum"""
+    print("🧪 Testing sweep schedule...")
+    configs = sample_configs(20, seed=1)
+    assert configs[0] == {} and len(configs) == 20
+    assert len({tuple(sorted(c.items())) for c in configs}) == 20
+    assert rung_budgets(27, min_rounds=50, max_rounds=900, eta=3) == [100, 300, 900]
+    assert rung_budgets(2, min_rounds=50, max_rounds=900, eta=3) == [900]
+    print("✅ Schedule looks right")
+
+
+def test_sweep_persists_best_params():
+    """A pooled sweep over shared-memory matrices picks a configuration at least as good as the defaults"""
+    print("🧪 Testing hyperparameter sweep...")
+    matrices = load_crop_matrices(["wheat", "banana"])
+    results = sweep(matrices, n_configs=4, n_folds=2, min_rounds=20, max_rounds=60, eta=2, max_workers=2)
+    assert set(results) == {"wheat", "banana"}
+    for crop, result in results.items():
+        assert result["cv_mae"] <= result["baseline_cv_mae"]
+        assert 1 <= result["params"]["n_estimators"] <= 60
+        assert [rung["rounds"] for rung in result["rungs"]] == [30, 60]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert model_params("wheat", tmp) == MODEL_PARAMS
+        save_params("wheat", results["wheat"], tmp)
+        assert model_params("wheat", tmp) == results["wheat"]["params"]
+    print(f"✅ wheat CV MAE {results['wheat']['cv_mae']:.2f} (defaults {results['wheat']['baseline_cv_mae']:.2f})")
+
+
+if __name__ == "__main__":
+    test_search_schedule()
+    test_sweep_persists_best_params()